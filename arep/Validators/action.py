@@ -1,4 +1,7 @@
-from arep.utils import (comparison_evaluator, ast_operation_symbols)
+from arep.utils import (
+    comparison_evaluator, ast_operation_types, parent, scope,
+    subtree_summary
+)
 from arep.Validators.forms import ValidationForm, ValidatorForm
 from arep.Validators.kind import Classes
 import ast
@@ -23,6 +26,10 @@ The validations for Grepping of all Action constraint types are in this file.
 
 - `knowledge` argument would be the updated knowledge template.
 
+- A constraint type whose methods read the per-file part of the knowledge
+  lists those keys in `_knowledge_keys` e.g. `{'Class'}`. Only the listed
+  keys are learned before a search. Subtypes don't inherit it.
+
 - All of the methods whose name are not `__new__` should ideally be
   returning a ValidationForm whose first argument is `consideration` property
   and second argument is a predicate that evaluates to `True` if the given node
@@ -54,6 +61,8 @@ class Call(object):
 
 
 class Instantiation(object):
+    _knowledge_keys = {'Class'}
+
     def basic(node, consideration, knowledge):
         return ValidationForm(
             consideration,
@@ -158,8 +167,7 @@ class Assignment(object):
                 return ValidationForm(
                     operation_symbol,
                     condition=bool(
-                        ast_operation_symbols()[
-                            type(node.op)] == operation_symbol
+                        type(node.op) in ast_operation_types(operation_symbol)
                     )
                 )
             return not operation_symbol
@@ -173,32 +181,34 @@ class Unpacking(object):
     def _single(node):
         return (type(node) is ast.Starred)
 
-    def _double(node):
-        return (type(node) is ast.Name) and (type(node._parent) is ast.keyword)
+    def _double(node, knowledge):
+        return ((type(node) is ast.Name) and
+                (type(parent(node, knowledge)) is ast.keyword))
 
-    def basic(node, consideration):
+    def basic(node, consideration, knowledge):
         return ValidationForm(
             consideration,
-            condition=bool(Unpacking._single(node) or Unpacking._double(node))
+            condition=bool(Unpacking._single(node) or
+                           Unpacking._double(node, knowledge))
         )
 
-    def one_dimensional(one_dimensional, node):
+    def one_dimensional(one_dimensional, node, knowledge):
         if one_dimensional is None:
             return True
-        if Unpacking.basic(node, True):
+        if Unpacking.basic(node, True, knowledge):
             return ValidationForm(
                 one_dimensional,
                 condition=bool(Unpacking._single(node))
             )
         return not one_dimensional
 
-    def two_dimensional(two_dimensional, node):
+    def two_dimensional(two_dimensional, node, knowledge):
         if two_dimensional is None:
             return True
-        if Unpacking.basic(node, True):
+        if Unpacking.basic(node, True, knowledge):
             return ValidationForm(
                 two_dimensional,
-                condition=bool(Unpacking._double(node))
+                condition=bool(Unpacking._double(node, knowledge))
             )
         return not two_dimensional
 
@@ -238,6 +248,8 @@ class Assertion(object):
 
 
 class Looping(object):
+    _knowledge_keys = {'summaries'}
+
     def _regular(node):
         return bool(type(node) in {ast.For, ast.While})
 
@@ -281,20 +293,10 @@ class Looping(object):
             except AttributeError:
                 return True
 
-    def with_break(with_break, node):
+    def with_break(with_break, node, knowledge):
         break_presence = False
         if Looping._regular(node=node):
-            non_looping_body = filter(
-                lambda body_element: not Looping._regular(node=body_element),
-                node.body
-            )
-            for node in non_looping_body:
-                for sub_node in ast.walk(node):
-                    if type(sub_node) is ast.Break:
-                        break_presence = True
-                        break
-                if break_presence:
-                    break
+            break_presence = subtree_summary(node, knowledge).with_break
         return ValidationForm(
             with_break,
             bool(break_presence)
@@ -336,6 +338,8 @@ class Looping(object):
 
 
 class Conditional(object):
+    _knowledge_keys = {'summaries'}
+
     def _regular(node):
         return bool(type(node) is ast.If)
 
@@ -352,9 +356,9 @@ class Conditional(object):
                     return True
         return False
 
-    def _parent_child_both_ifs(node):
+    def _parent_child_both_ifs(node, knowledge):
         is_if_itself = Conditional._regular(node=node)
-        parent_is_if = Conditional._regular(node=node._parent)
+        parent_is_if = Conditional._regular(node=parent(node, knowledge))
         return (is_if_itself and parent_is_if)
 
     def basic(node, knowledge, consideration):
@@ -362,7 +366,8 @@ class Conditional(object):
             consideration,
             condition=(
                 (Conditional._regular(node=node) and
-                    not Conditional._parent_child_both_ifs(node=node)) or
+                    not Conditional._parent_child_both_ifs(
+                        node=node, knowledge=knowledge)) or
                 Conditional._expression(node=node) or
                 Conditional._comprehension(node=node, knowledge=knowledge)
             )
@@ -384,18 +389,9 @@ class Conditional(object):
         if else_ is None:
             return True
         if Conditional._regular(node=node):
-            current_node = node
-            last_else_test_is_if = False
-            while Conditional._regular(node=current_node):
-                if type(current_node.orelse) is list:
-                    if len(current_node.orelse) == 0:
-                        last_else_test_is_if = True
-                        break
-                    else:
-                        current_node = current_node.orelse[0]
-                else:
-                    current_node = current_node.orelse
-            return bool(else_ is not last_else_test_is_if)
+            return bool(
+                bool(else_) is subtree_summary(node, knowledge).terminal_else
+            )
         elif Conditional._expression(node=node):
             if else_:
                 return bool(node.orelse is not None)
@@ -718,19 +714,33 @@ class Passing(object):
 
 
 class Returning(object):
+    _knowledge_keys = {'scopes'}
+
     def _regular(node):
         return bool(type(node) is ast.Return)
 
-    def _in_lambda(node):
-        return False
-        raise NotImplemented
+    def _in_lambda(node, knowledge):
+        # The body of a lambda is what it returns.
+        enclosing_function = scope(node, knowledge).function
+        return bool(type(enclosing_function) is ast.Lambda and
+                    enclosing_function.body is node)
 
-    def basic(node, consideration):
+    def in_lambda(in_lambda, node, knowledge):
+        return ValidationForm(
+            in_lambda,
+            condition=Returning._in_lambda(node, knowledge)
+        )
+
+    def basic(node, consideration, in_lambda, knowledge):
+        # The bodies of lambdas are only looked at when `in_lambda` is set,
+        # since they may be any expression.
         return ValidationForm(
             consideration,
-            condition=bool(Returning._regular(node) or
-                           Returning._in_lambda(node))
-            )
+            condition=bool(Returning._regular(node) or (
+                in_lambda is not None and
+                Returning._in_lambda(node, knowledge)
+            ))
+        )
 
     def __new__(self, **kwargs):
         return ValidatorForm(self, **kwargs)
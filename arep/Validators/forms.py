@@ -1,3 +1,4 @@
+from functools import partial
 from inspect import getfullargspec as spec
 
 
@@ -28,6 +29,72 @@ def ValidatorForm(cls, **kwargs):
         )
 
 
+def CompiledValidatorForm(cls, **kwargs):
+    """
+    Does what `ValidatorForm` does, except that the argument lists of `basic`
+    and of every kwarg method are resolved once. The returned predicate only
+    receives what changes from one node to the next.
+
+    Returns
+    -------
+    (node, knowledge) -> {True, False}
+    """
+    def bind(f):
+        arguments = spec(f).args
+        bound = partial(f, **{
+            key: (kwargs[key] if key in kwargs else None)
+            for key in arguments
+            if key not in {'node', 'knowledge'}
+        })
+        if 'node' in arguments and 'knowledge' in arguments:
+            return (lambda node, knowledge:
+                    bound(node=node, knowledge=knowledge))
+        if 'node' in arguments:
+            return lambda node, knowledge: bound(node=node)
+        if 'knowledge' in arguments:
+            return lambda node, knowledge: bound(knowledge=knowledge)
+        return lambda node, knowledge: bound()
+
+    on_attribute_error = ValidationForm(
+        (kwargs['consideration'] if 'consideration' in kwargs else None),
+        condition=False
+    )
+    try:
+        methods = [cls.basic] + [
+            getattr(cls, kwarg)
+            for kwarg in kwargs
+            if kwarg not in {'node', 'consideration', 'knowledge'}
+        ]
+    except AttributeError:
+        return lambda node, knowledge: on_attribute_error
+    bound_methods = [bind(method) for method in methods]
+
+    def predicate(node, knowledge):
+        try:
+            return all([
+                bound_method(node, knowledge)
+                for bound_method in bound_methods
+            ])
+        except AttributeError:
+            return on_attribute_error
+
+    def short_circuiting_predicate(node, knowledge):
+        try:
+            for bound_method in bound_methods:
+                if not bound_method(node, knowledge):
+                    return False
+            return True
+        except AttributeError:
+            return False
+
+    # An AttributeError raised by a later method would overturn an earlier
+    # `False` unless the fallback is `False` as well. Only then is it safe to
+    # stop at the first failing method.
+    if on_attribute_error:
+        return predicate
+    return short_circuiting_predicate
+
+
 def ValidationForm(consideration, condition, consideration_types={}):
     """
     The basic structure of all the validator methods.
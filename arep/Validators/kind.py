@@ -1,6 +1,6 @@
 from arep.Validators.forms import ValidationForm, ValidatorForm
 from arep.Validators import action
-from arep.utils import ast_operation_symbols
+from arep.utils import ast_operation_types, parent, scope
 import ast
 
 """
@@ -23,6 +23,10 @@ The validations for Grepping of all Kind constraint types are in this file.
 
 - `knowledge` argument would be the updated knowledge template.
 
+- A constraint type whose methods read the per-file part of the knowledge
+  lists those keys in `_knowledge_keys` e.g. `{'Class'}`. Only the listed
+  keys are learned before a search. Subtypes don't inherit it.
+
 - All of the methods whose name are not `__new__` should ideally be
   returning a ValidationForm whose first argument is `consideration` property
   and second argument is a predicate that evaluates to `True` if the given node
@@ -43,6 +47,7 @@ The validations for Grepping of all Kind constraint types are in this file.
 
 
 class Variables(object):
+    _knowledge_keys = {'Function'}
 
     def _regular(node):
         return bool(type(node) is ast.Name)
@@ -50,43 +55,45 @@ class Variables(object):
     def _argument(node):
         return bool(type(node) is ast.arg)
 
-    def _attribute(node):
+    def _attribute(node, knowledge):
         return (Variables._regular(node) and
-                bool(type(node._parent) is ast.Attribute))
+                bool(type(parent(node, knowledge)) is ast.Attribute))
 
-    def _calling_filter(node):
-        if action.Call.basic(node._parent, True):
-            if node._parent.func == node:
+    def _calling_filter(node, knowledge):
+        node_parent = parent(node, knowledge)
+        if action.Call.basic(node_parent, True):
+            if node_parent.func == node:
                 return False
-            if type(node._parent) is ast.arguments:
+            if type(node_parent) is ast.arguments:
                 return ValidationForm(
                     True,
-                    condition=bool(node in node._parent.args)
+                    condition=bool(node in node_parent.args)
                 )
         return True
 
-    def _class_base_filter(node):
-        return bool(type(node._parent) is not ast.ClassDef)
+    def _class_base_filter(node, knowledge):
+        return bool(type(parent(node, knowledge)) is not ast.ClassDef)
 
     def basic(node, consideration, knowledge):
         return ValidationForm(
             consideration,
             condition=bool(
                 any([Variables._regular(node),
-                     Variables._attribute(node),
+                     Variables._attribute(node, knowledge),
                      Variables._argument(node)]) and
-                Variables._calling_filter(node) and
-                Variables._class_base_filter(node)
+                Variables._calling_filter(node, knowledge) and
+                Variables._class_base_filter(node, knowledge)
             )
         )
 
     def is_attribute(is_attribute, node, knowledge):
         if Variables.basic(node, True, knowledge):
-            if Variables._attribute(node):
+            if Variables._attribute(node, knowledge):
                 return ValidationForm(
                     is_attribute,
                     condition=bool(
-                        node._parent.attr not in knowledge['Function']
+                        parent(node, knowledge).attr not in
+                        knowledge['Function']
                     )
                 )
         return not is_attribute
@@ -111,7 +118,7 @@ class Variables(object):
         if Variables.is_attribute(name, node, knowledge):
             return ValidationForm(
                 name,
-                condition=(bool(node._parent.attr == name) or
+                condition=(bool(parent(node, knowledge).attr == name) or
                            bool(node.id == name))
             )
         try:
@@ -131,10 +138,7 @@ class STD_Types(object):
             return ValidationForm(
                 consideration,
                 condition=bool(
-                    node.id in [
-                        builtin_type.__name__
-                        for builtin_type in knowledge['builtins']['types']
-                    ]
+                    node.id in knowledge['builtins']['type_names']
                 )
             )
         return not consideration
@@ -154,21 +158,24 @@ class STD_Types(object):
 
 
 class Functions(object):
+    _knowledge_keys = {'Class', 'Decorator', 'Method', 'scopes'}
 
     def _regular_def(node, knowledge):
         if bool(type(node) is ast.FunctionDef):
-            return bool(node.name not in knowledge['Method'])
+            return bool(type(scope(node, knowledge).innermost) is not
+                        ast.ClassDef)
         return False
 
     def _regular_call(node, knowledge):
         # Can't check for ast.Call directly. Since a called lambda occupies
         # the same spot and messes up if one tries to put additional
         # constraints like is_builtin etc.
-        if bool(type(node._parent) is ast.Call):
+        node_parent = parent(node, knowledge)
+        if bool(type(node_parent) is ast.Call):
             # Lambdas won't have id
             if hasattr(node, "id"):
-                if hasattr(node._parent, "func"):
-                    if node._parent.func == node:
+                if hasattr(node_parent, "func"):
+                    if node_parent.func == node:
                         return (bool(node.id not in knowledge['Method']) and
                                 bool(node.id not in knowledge['Class']))
         return False
@@ -179,7 +186,7 @@ class Functions(object):
 
     def _lambda(node, knowledge):
         return (bool(type(node) is ast.Lambda) and
-                bool(node not in knowledge['Method'][ast.Lambda]))
+                bool(node not in knowledge['Method'].get(ast.Lambda, ())))
 
     def _decorator(node, knowledge):
         if type(node) is ast.Name:
@@ -248,12 +255,12 @@ class Functions(object):
         if (
                 Functions.Lambda.basic(node, True, knowledge) and
                 Functions.Lambda.immediately_called(False, node, knowledge) and
-                bool(type(node._parent) is ast.Assign)
+                bool(type(parent(node, knowledge)) is ast.Assign)
         ):
             return ValidationForm(
                 name,
                 condition=bool(name in [
-                    target.id for target in node._parent.targets
+                    target.id for target in parent(node, knowledge).targets
                 ])
             )
         return not name
@@ -262,6 +269,8 @@ class Functions(object):
         return ValidatorForm(self, **kwargs)
 
     class Lambda(object):
+        _knowledge_keys = {'Method'}
+
         def basic(node, consideration, knowledge):
             return ValidationForm(
                 consideration,
@@ -275,9 +284,10 @@ class Functions(object):
                 return ValidationForm(
                     immediately_called,
                     condition=(
-                        bool(type(node._parent) is ast.Call) and
-                        bool(node.lineno == node._parent.lineno) and
-                        bool(node.col_offset == node._parent.col_offset)
+                        bool(type(parent(node, knowledge)) is ast.Call) and
+                        bool(node.lineno == parent(node, knowledge).lineno) and
+                        bool(node.col_offset ==
+                             parent(node, knowledge).col_offset)
                     )
                 )
             return not immediately_called
@@ -286,6 +296,8 @@ class Functions(object):
             return ValidatorForm(self, **kwargs)
 
     class Decorators(object):
+        _knowledge_keys = {'Class', 'Decorator', 'Method', 'scopes'}
+
         def basic(node, consideration, knowledge):
             return ValidationForm(
                 consideration,
@@ -308,6 +320,7 @@ class Functions(object):
             return ValidatorForm(self, **kwargs)
 
     class Parameters(object):
+        _knowledge_keys = {'Class', 'Decorator', 'Method', 'scopes'}
 
         def _has_fixed_arguments(node, knowledge):
             if node.lineno == 29 and node.col_offset == 16:
@@ -316,8 +329,9 @@ class Functions(object):
                     Functions._regular_def, Functions._lambda}]):
                 return bool(len(node.args.args) > 0)
             if Functions._regular_call(node, knowledge):
-                return bool(len(node._parent.args) > 0
-                            if hasattr(node._parent, "args")
+                node_parent = parent(node, knowledge)
+                return bool(len(node_parent.args) > 0
+                            if hasattr(node_parent, "args")
                             else False)
 
         def _has_variadic_arguments(node, knowledge):
@@ -330,8 +344,9 @@ class Functions(object):
                     Functions._regular_def, Functions._lambda}]):
                 return bool(len(node.args.defaults) > 0)
             if Functions._regular_call(node, knowledge):
-                return bool(len(node._parent.keywords) > 0
-                            if hasattr(node._parent, "keywords")
+                node_parent = parent(node, knowledge)
+                return bool(len(node_parent.keywords) > 0
+                            if hasattr(node_parent, "keywords")
                             else False)
 
         def _has_variadic_keywords(node, knowledge):
@@ -372,6 +387,8 @@ class Functions(object):
             return ValidatorForm(self, **kwargs)
 
         class Arguments(object):
+            _knowledge_keys = {'Class', 'Decorator', 'Method', 'scopes'}
+
             def basic(node, consideration, knowledge):
                 if consideration is None:
                     return True
@@ -403,6 +420,8 @@ class Functions(object):
                 return ValidatorForm(self, **kwargs)
 
         class Keywords(object):
+            _knowledge_keys = {'Class', 'Decorator', 'Method', 'scopes'}
+
             def basic(node, consideration, knowledge):
                 if consideration is None:
                     return True
@@ -435,11 +454,13 @@ class Functions(object):
 
 
 class Classes(object):
+    _knowledge_keys = {'Class'}
+
     def _regular_def(node):
         return bool(type(node) is ast.ClassDef)
 
     def _regular_call(node, knowledge):
-        if bool(type(node._parent) is ast.Call):
+        if bool(type(parent(node, knowledge)) is ast.Call):
             return bool(
                 getattr(node, "id") in knowledge['Class']
                 if hasattr(node, "id") else False
@@ -534,16 +555,14 @@ class Operations(object):
                           'is_boolean'}]):
             return ValidationForm(
                 symbol,
-                condition=bool(
-                    ast_operation_symbols()[type(node.op)] == symbol
-                )
+                condition=bool(type(node.op) in ast_operation_types(symbol))
             )
         elif Operations.is_comparative(True, node):
+            operation_types = ast_operation_types(symbol)
             return ValidationForm(
                 symbol,
-                condition=bool(
-                    symbol in {ast_operation_symbols()[type(op)]
-                               for op in node.ops}
+                condition=any(
+                    type(op) in operation_types for op in node.ops
                 )
             )
         return not symbol
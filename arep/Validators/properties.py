@@ -80,3 +80,26 @@ class Positional(object):
 
         def __new__(self, **kwargs):
             return ValidatorForm(self, **kwargs)
+
+
+class Structural(object):
+    # The constraints of every specification are compiled into an
+    # `arep.structure.Structural_relation`, which is what the methods receive.
+    _knowledge_keys = {'tours'}
+
+    def basic(consideration):
+        return ValidationForm(consideration, condition=True)
+
+    def inside(inside, node, knowledge):
+        return ValidationForm(True, condition=inside(node, knowledge))
+
+    def contains(contains, node, knowledge):
+        return ValidationForm(True, condition=contains(node, knowledge))
+
+    def direct_child_of(direct_child_of, node, knowledge):
+        return ValidationForm(
+            True, condition=direct_child_of(node, knowledge)
+        )
+
+    def __new__(self, **kwargs):
+        return ValidatorForm(self, **kwargs)
@@ -1,6 +1,12 @@
 from __future__ import absolute_import, division, print_function
-from arep.constraints import Action, Kind, Properties
+from arep.cache import Parse_cache
+from arep.constraints import (
+    Action, Kind, Properties, Constraint_expression
+)
 from arep.grepper import Grepper
+from arep.grepper_set import GrepperSet, scan
+from arep.index import Inverted_index
+from arep.query import load_query, QueryError
 from .__about__ import (
     __author__,
     __email__,
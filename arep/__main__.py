@@ -0,0 +1,226 @@
+from arep.grepper_set import GrepperSet
+from arep.index import DEFAULT_INDEX_NAME, Inverted_index
+from arep.query import load_query, QueryError
+import argparse
+import json
+import os
+import sys
+
+"""
+The command line interface of arep.
+
+    arep [search] QUERY [PATH ...] [-j N] [--format {grep,jsonl,null}]
+    arep index build [PATH ...] [--root ROOT] [--output INDEX] [-j N]
+
+The results are written as soon as each file is searched, so it can be the
+start of a pipeline over a large tree. It exits with 0 if anything was
+found, 1 if nothing was and 2 on errors, like grep, including files that
+couldn't be read or parsed.
+"""
+
+_COMMANDS = {'search', 'index'}
+
+# How the results are written. `null` is for `xargs -0` and the like.
+_FORMATS = {
+    'grep': lambda result: '{}:{}:{}\n'.format(
+        result.name, result.line, result.column
+    ),
+    'jsonl': lambda result: json.dumps({
+        'name': result.name, 'line': result.line, 'column': result.column
+    }) + '\n',
+    'null': lambda result: '{}:{}:{}\0'.format(
+        result.name, result.line, result.column
+    ),
+}
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='arep',
+        description="semantic/syntactic source code searching for Python."
+    )
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    search = commands.add_parser(
+        'search', help="Search the python files of the paths. This is the "
+                       "default command."
+    )
+    search.add_argument(
+        'query',
+        help="A JSON or YAML file of the query, the query itself or - to "
+             "read it from the standard input e.g. "
+             "'{\"Action\": {\"Import\": {\"name\": \"os\"}}}'"
+    )
+    search.add_argument(
+        'paths', nargs='*', default=['.'],
+        help="Python files and directories. Default is the current directory."
+    )
+    search.add_argument(
+        '--root', default=None,
+        help="The results are relative to it. Default is the current "
+             "directory."
+    )
+    search.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help="Number of worker processes. Default is the number of CPUs."
+    )
+    search.add_argument(
+        '--chunksize', type=int, default=16,
+        help="Number of files that are sent to a worker at a time."
+    )
+    search.add_argument(
+        '-f', '--format', choices=sorted(_FORMATS), default='grep',
+        help="grep is NAME:LINE:COLUMN per line, jsonl is a JSON object per "
+             "line and null is NAME:LINE:COLUMN ended by a null character. "
+             "Default is grep."
+    )
+    search.add_argument(
+        '--cache', default=None,
+        help="A directory to cache the parsed files in."
+    )
+    search.add_argument(
+        '--index', default=None,
+        help="An index made by `arep index build` to only search the files "
+             "that may have results. The paths are ignored."
+    )
+    search.set_defaults(handler=_search)
+
+    index = commands.add_parser(
+        'index', help="Manage the inverted index of a repository."
+    )
+    index_commands = index.add_subparsers(dest='index_command')
+    index_commands.required = True
+    build = index_commands.add_parser(
+        'build', help="Index the python files of the paths."
+    )
+    build.add_argument(
+        'paths', nargs='*', default=['.'],
+        help="Python files and directories. Default is the current directory."
+    )
+    build.add_argument(
+        '--root', default=None,
+        help="The files are kept relative to it. Default is the current "
+             "directory."
+    )
+    build.add_argument(
+        '-o', '--output', default=None,
+        help="Where the index is saved. Default is {} in the root.".format(
+            DEFAULT_INDEX_NAME
+        )
+    )
+    build.add_argument(
+        '-j', '--jobs', type=int, default=None,
+        help="Number of worker processes. Default is the number of CPUs."
+    )
+    build.add_argument(
+        '--chunksize', type=int, default=16,
+        help="Number of files that are sent to a worker at a time."
+    )
+    build.set_defaults(handler=_build_index)
+    return parser
+
+
+def _search(arguments):
+    try:
+        if arguments.query == '-':
+            query = sys.stdin.read()
+        else:
+            query = arguments.query
+        constraint_list = load_query(query)
+    except (QueryError, OSError) as error:
+        print("arep: {}".format(error), file=sys.stderr)
+        return 2
+    if arguments.index is not None:
+        try:
+            index = Inverted_index.load(arguments.index)
+        except (OSError, ValueError) as error:
+            print("arep: {}".format(error), file=sys.stderr)
+            return 2
+        paths = [
+            os.path.join(index.root, relative_path)
+            for relative_path in index.candidate_files(constraint_list)
+        ]
+        root = index.root
+    else:
+        paths, root = arguments.paths, arguments.root
+    grepper_set = GrepperSet(
+        paths, root=root, workers=arguments.jobs,
+        chunksize=arguments.chunksize, cache=arguments.cache
+    )
+    grepper_set.constraint_list.extend(constraint_list)
+    as_text = _FORMATS[arguments.format]
+    sys.stdout.flush()
+    # Bytes are written to the buffer of the standard output directly, so
+    # it's only flushed when asked to.
+    output = getattr(sys.stdout, 'buffer', None)
+    if output is None:
+        output, encoded = sys.stdout, (lambda text: text)
+    else:
+        encoded = (lambda text: text.encode('utf-8', 'surrogateescape'))
+    found = False
+    name = None
+    results = grepper_set.run()
+    try:
+        for result in results:
+            if result.name != name:
+                # What was found in the previous file is sent downstream
+                # before the next file is written.
+                output.flush()
+                name = result.name
+            output.write(encoded(as_text(result)))
+            found = True
+        output.flush()
+    except BrokenPipeError:
+        # e.g. `arep ... | head`. Python would complain about the unflushed
+        # output while exiting otherwise.
+        results.close()
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0 if found else 1
+    for name, error in sorted(grepper_set.errors.items()):
+        print("arep: {}: {}".format(name, error), file=sys.stderr)
+    if grepper_set.errors:
+        # Like grep, whatever was found in the other files is still written.
+        return 2
+    return 0 if found else 1
+
+
+def _build_index(arguments):
+    root = os.path.abspath(
+        os.getcwd() if arguments.root is None else arguments.root
+    )
+    output = (os.path.join(root, DEFAULT_INDEX_NAME)
+              if arguments.output is None else arguments.output)
+    index = Inverted_index.build(
+        arguments.paths, root=root, workers=arguments.jobs,
+        chunksize=arguments.chunksize
+    )
+    index.save(output)
+    print("Indexed {} files into {}".format(len(index.files), output),
+          file=sys.stderr)
+    return 0
+
+
+def Main(argv=None):
+    """
+    Parameters
+    ----------
+    argv : [str]
+        Default is `None` which uses `sys.argv`.
+
+    Returns
+    -------
+    int
+        The exit status.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] not in _COMMANDS and argv[0] not in {
+            '-h', '--help'
+    }:
+        argv.insert(0, 'search')
+    arguments = _parser().parse_args(argv)
+    return arguments.handler(arguments)
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
@@ -0,0 +1,209 @@
+from arep.__about__ import __version__
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+"""
+An on-disk cache of parsed and annotated ASTs.
+
+An entry is keyed by the hash of the source code, the version of Python, the
+version of arep and how the AST was annotated. So a changed file, a different
+interpreter or a different arep never sees the entries of the other.
+"""
+
+# Bumped whenever what's stored in an entry changes.
+_FORMAT = 5
+
+
+class Parse_cache(object):
+    """
+    Attributes
+    ----------
+    directory : str
+        Where the entries are kept. It's made if it doesn't exist.
+    max_bytes : int
+        The total size that the entries shouldn't exceed. Once they do, the
+        least recently used entries are removed until they're below
+        `low_watermark` of it.
+
+    Methods
+    -------
+    key(source, **options)
+    load(key)
+    store(key, entry)
+    evict()
+    size()
+    """
+    low_watermark = 0.9
+
+    def __init__(self, directory, max_bytes=256 * 2 ** 20):
+        """
+        Parameters
+        ----------
+        directory : str
+        max_bytes : int
+            Default is 256 MiB
+        """
+        assert max_bytes > 0, "The cache should be able to hold something"
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        # What this process thinks the total size is. It's only an estimate
+        # as other processes may be using the same directory, so it's
+        # recounted before evicting.
+        self.__estimated_size = None
+
+    def key(self, source, **options):
+        """
+        Parameters
+        ----------
+        source : str
+            The source code.
+        options
+            Whatever changes what's stored for the source e.g.
+            `parent_table=True`.
+
+        Returns
+        -------
+        str
+        """
+        digest = hashlib.sha256()
+        for part in [
+                str(_FORMAT), __version__, sys.version,
+                repr(sorted(options.items())),
+        ]:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(source.encode('utf-8', 'surrogateescape'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def load(self, key):
+        """
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        The stored entry or `None` if there isn't one.
+        """
+        path = self._path(key)
+        # An entry is tens of thousands of new objects and nothing to
+        # collect, so the garbage collector only slows loading down.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A broken entry e.g. from an interrupted run is just a miss.
+            self._remove(path)
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        try:
+            # The modification time is the last time it was used.
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key, entry):
+        """
+        Stores the entry unless it can't be pickled e.g. as it's too deep.
+        The entry is written to a temporary file first, so concurrent
+        readers never see a partial entry.
+
+        Parameters
+        ----------
+        key : str
+        entry
+            Anything picklable.
+
+        Returns
+        -------
+        bool
+            Whether the entry was stored.
+        """
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except (RecursionError, pickle.PicklingError):
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix='.tmp'
+        )
+        try:
+            with os.fdopen(file_descriptor, 'wb') as f:
+                f.write(data)
+            os.replace(temporary_path, self._path(key))
+        except OSError:
+            self._remove(temporary_path)
+            return False
+        if self.__estimated_size is None:
+            self.__estimated_size = self.size()
+        else:
+            self.__estimated_size += len(data)
+        if self.__estimated_size > self.max_bytes:
+            self.evict()
+        return True
+
+    def _entries(self):
+        """
+        Returns
+        -------
+        [(float, int, str)]
+            Modification time, size and path of every entry.
+        """
+        entries = list()
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.pickle'):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+        return entries
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def size(self):
+        """
+        Returns
+        -------
+        int
+            The total size of the entries in bytes.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        Removes the least recently used entries if the entries are larger
+        than `max_bytes`, until they're smaller than `low_watermark` of it.
+        """
+        entries = sorted(self._entries())
+        total_size = sum(size for _, size, _ in entries)
+        if total_size > self.max_bytes:
+            target_size = self.max_bytes * Parse_cache.low_watermark
+            for _, size, path in entries:
+                if total_size <= target_size:
+                    break
+                self._remove(path)
+                total_size -= size
+        self.__estimated_size = total_size
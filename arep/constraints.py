@@ -1,3 +1,6 @@
+import ast
+
+
 class ConstraintForm(type):
     """
     It acts as a template for all of the constraints. It receives a dictionary
@@ -27,6 +30,8 @@ class ConstraintForm(type):
     _class_vars : {str: any}
         Address of all of the attributes and methods of the class.
     _methods: {str: functions}
+    _address: [str]
+        Path of the constraint e.g. ['Action', 'Raising', 'Error']
 
     Methods
     _______
@@ -35,6 +40,9 @@ class ConstraintForm(type):
     __itername__()
         Works the same is __iter__ except it iterates of __name__
     reset(replace_with)
+    __and__, __or__, __invert__
+        `a & b`, `a | b` and `~a` make a `Constraint_expression` out of
+        constraints and other expressions.
     """
 
     def __new__(cls, name, parents, specs):
@@ -45,6 +53,8 @@ class ConstraintForm(type):
                 '__name__', '__iter__', '__str__', '__getitem__',
             },
             '__itername__', 'view_actives', 'reset', '_class_vars', '_methods',
+            '_address', '__and__', '__or__', '__invert__', '__rand__',
+            '__ror__',
         }
 
         def set_attr_decorated(cls, name, value):
@@ -88,12 +98,13 @@ class ConstraintForm(type):
         def reset(cls, replace_with=None):
             for attr in cls.__itername__():
                 if attr not in non_representables:
-                    if type(getattr(cls, attr)).__name__ == constraint_type:
+                    if attr in cls._methods:
                         reset(getattr(cls, attr), replace_with)
                     else:
                         setattr(cls, attr, replace_with)
 
-        def wrapped(name, specs, with_consideration, constraint_type):
+        def wrapped(name, specs, with_consideration, constraint_type,
+                    address):
             if type(specs) is not dict:
                 return specs
 
@@ -102,13 +113,15 @@ class ConstraintForm(type):
                     try:
                         specs[key] = wrapped(
                             key, specs[key], with_consideration,
-                            constraint_type
+                            constraint_type, address + [key]
                         )
                     except AttributeError:
                         print(key)
 
             specs['__name__'] = name
 
+            specs['_address'] = address
+
             if with_consideration:
                 specs['consideration'] = None
 
@@ -154,6 +167,26 @@ class ConstraintForm(type):
                 lambda cls: view_actives(cls)
             )
 
+            specs['__and__'] = (
+                lambda cls, other: Constraint_expression('and', (cls, other))
+            )
+
+            specs['__rand__'] = (
+                lambda cls, other: Constraint_expression('and', (other, cls))
+            )
+
+            specs['__or__'] = (
+                lambda cls, other: Constraint_expression('or', (cls, other))
+            )
+
+            specs['__ror__'] = (
+                lambda cls, other: Constraint_expression('or', (other, cls))
+            )
+
+            specs['__invert__'] = (
+                lambda cls: Constraint_expression('not', (cls,))
+            )
+
             specs['_class_vars'] = {
                 key: value
                 for key, value in specs.items()
@@ -174,7 +207,66 @@ class ConstraintForm(type):
         # Currently, all constraint types would have the consideration toggle.
         with_consideration = True
 
-        return wrapped(name, specs, with_consideration, constraint_type)
+        return wrapped(name, specs, with_consideration, constraint_type,
+                       [name])
+
+
+class Constraint_expression(object):
+    """
+    A boolean combination of constraints, made by `&`, `|` and `~` on them,
+    e.g. `(kind.Functions | kind.Classes) & properties.Positional`. The
+    operands of an expression are whole constraints e.g. `Action()`, parts of
+    them e.g. `kind.Functions` or other expressions. A part of a constraint
+    only stands for the specifications under it.
+
+    Attributes
+    ----------
+    operator : str
+        One of `and`, `or` and `not`.
+    operands : tuple
+    """
+    operators = frozenset({'and', 'or', 'not'})
+
+    def __init__(self, operator, operands):
+        assert operator in Constraint_expression.operators, (
+            "Unknown operator {}".format(operator)
+        )
+        assert all(
+            isinstance(operand, Constraint_expression) or
+            hasattr(operand, '_address')
+            for operand in operands
+        ), "Only constraints and their expressions can be combined"
+        self.operator = operator
+        self.operands = tuple(operands)
+
+    def __and__(self, other):
+        return Constraint_expression('and', (self, other))
+
+    def __rand__(self, other):
+        return Constraint_expression('and', (other, self))
+
+    def __or__(self, other):
+        return Constraint_expression('or', (self, other))
+
+    def __ror__(self, other):
+        return Constraint_expression('or', (other, self))
+
+    def __invert__(self):
+        return Constraint_expression('not', (self,))
+
+    def __repr__(self):
+        def operand_repr(operand):
+            if isinstance(operand, Constraint_expression):
+                return repr(operand)
+            return '.'.join(operand._address)
+
+        if self.operator == 'not':
+            return "~{}".format(operand_repr(self.operands[0]))
+        return "({})".format(
+            {'and': " & ", 'or': " | "}[self.operator].join(
+                operand_repr(operand) for operand in self.operands
+            )
+        )
 
 
 def _Action_Template():
@@ -234,6 +326,9 @@ def _Action_Template():
             'from_': None,
             'in_expression': None,
         },
+        'Returning': {
+            'in_lambda': None,
+        },
         **{
             spec: {'name': None}
             for spec in {'Making_Global', 'Making_Nonlocal'}
@@ -241,7 +336,7 @@ def _Action_Template():
         **{spec: dict()
            for spec in {
                    'Call', 'Instantiation', 'Definition', 'Deletion',
-                   'Indexing', 'Passing', 'Returning', 'Breaking', 'Continuing'
+                   'Indexing', 'Passing', 'Breaking', 'Continuing'
            }
         }
     }
@@ -256,6 +351,43 @@ class Action(object):
         return ConstraintForm("Action", (object,), _Action_Template())
 
 
+def _Action_Node_Types():
+    comprehension_forms = {
+        ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp
+    }
+    return {
+        'Call': {ast.Call},
+        'Instantiation': {ast.Name},
+        'Import': {ast.Import, ast.ImportFrom},
+        'Import.From': {ast.ImportFrom},
+        'Import.As': {ast.Import, ast.ImportFrom},
+        'Definition': {ast.FunctionDef, ast.ClassDef},
+        'Assignment': {ast.Assign, ast.AugAssign},
+        'Assignment.Operational_Augmentation': {ast.AugAssign},
+        'Unpacking': {ast.Starred, ast.Name},
+        'Assertion': {ast.Assert},
+        'Assertion.Error': {ast.Assert},
+        'Looping': {ast.For, ast.While, *comprehension_forms},
+        'Conditional': {ast.If, ast.IfExp, *comprehension_forms},
+        'With': {ast.With},
+        'With.As': {ast.With},
+        'Deletion': {ast.Delete},
+        'Indexing': {ast.Subscript},
+        'Trying': {ast.Try},
+        'Trying.Except': {ast.Try},
+        'Raising': {ast.Raise},
+        'Raising.Error': {ast.Raise},
+        'Raising.Cause': {ast.Raise},
+        'Yielding': {ast.Yield, ast.YieldFrom, ast.GeneratorExp},
+        'Making_Global': {ast.Global},
+        'Making_Nonlocal': {ast.Nonlocal},
+        'Passing': {ast.Pass},
+        'Returning': {ast.Return},
+        'Breaking': {ast.Break},
+        'Continuing': {ast.Continue},
+    }
+
+
 def _Kind_Template():
     return {
         'Variables': {
@@ -314,6 +446,35 @@ class Kind(object):
         return ConstraintForm("Kind", (object,), _Kind_Template())
 
 
+def _Kind_Node_Types():
+    function_forms = {ast.FunctionDef, ast.Lambda, ast.Name}
+    return {
+        'Variables': {ast.Name, ast.arg},
+        'STD_Types': {ast.Name},
+        'Functions': function_forms,
+        'Functions.Lambda': {ast.Lambda},
+        'Functions.Decorators': {ast.Name},
+        'Functions.Parameters': function_forms,
+        'Functions.Parameters.Arguments': function_forms,
+        'Functions.Parameters.Keywords': function_forms,
+        'Classes': {ast.ClassDef, ast.Name},
+        'Comprehensions': {
+            ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp
+        },
+        'Operations': {
+            ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp, ast.AugAssign
+        },
+    }
+
+
+# The specifications of `Properties.Structural`, whose values are constraints
+# e.g. `inside = kind`, an expression of them or a list of them that are
+# "AND"ed. A node is `inside` the nodes that satisfy them if one of them is
+# its ancestor, `contains` them if one of them is its descendant and is a
+# `direct_child_of` them if its parent is one of them.
+STRUCTURAL_RELATIONS = ('inside', 'contains', 'direct_child_of')
+
+
 def _Properties_Template():
     return {
         'Positional': {
@@ -326,9 +487,15 @@ def _Properties_Template():
                 'maximum': None,
             },
         },
+        'Structural': {relation: None for relation in STRUCTURAL_RELATIONS},
     }
 
 
+def _Properties_Node_Types():
+    # Positional constraints apply to every node that has a position and
+    # structural constraints to every node.
+    return dict()
+
 
 class Properties(object):
     """
@@ -337,3 +504,49 @@ class Properties(object):
     """
     def __new__(self):
         return ConstraintForm("Properties", (object,), _Properties_Template())
+
+
+def _Option_Node_Types():
+    # The node types that a constraint may also match once one of its options
+    # is set.
+    return {
+        # The body of a lambda is an expression of any type.
+        'Action.Returning.in_lambda': set(ast.expr.__subclasses__()),
+    }
+
+
+def node_types(address, options=()):
+    """
+    Returns the AST node types that a constraint can possibly match once its
+    `consideration` is truthy. Any other node is rejected by its `basic`
+    validator.
+
+    Parameters
+    ----------
+    address : [str]
+        Path of the constraint e.g. ['Action', 'Raising', 'Error']
+    options : [str]
+        The options that are set on the constraint e.g. ['in_lambda']. Some
+        of them widen the node types.
+
+    Returns
+    -------
+    {type}  the node types that the constraint is anchored to.
+    None    if the constraint may match any node.
+    """
+    declarations = {
+        'Action': _Action_Node_Types,
+        'Kind': _Kind_Node_Types,
+        'Properties': _Properties_Node_Types,
+    }
+    if address[0] not in declarations:
+        return None
+    anchored_types = declarations[address[0]]().get('.'.join(address[1:]))
+    if anchored_types is None:
+        return None
+    option_types = _Option_Node_Types()
+    for option in options:
+        anchored_types = anchored_types | option_types.get(
+            '.'.join(list(address) + [option]), set()
+        )
+    return anchored_types
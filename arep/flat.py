@@ -0,0 +1,318 @@
+from array import array
+from itertools import compress
+import ast
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""
+A flattened, column per attribute, representation of an AST for bulk
+scanning.
+
+Every node is a row, in the order of `ast.walk`. The columns are NumPy arrays
+if NumPy is installed and `array`s otherwise. Constraints that only read
+those columns, i.e. the node types, the positions and the names, are
+evaluated for all of the rows at once as masks, so the validators only run
+on the rows that survive them.
+"""
+
+# The value of a position column for the nodes that don't have it.
+MISSING = -2 ** 31
+
+# The fields whose value is the identifier of a node, in order of precedence.
+_IDENTIFIER_FIELDS = ('id', 'arg', 'attr', 'name')
+
+
+def _identifier(node):
+    for field in _IDENTIFIER_FIELDS:
+        value = getattr(node, field, None)
+        if type(value) is str:
+            return value
+    return None
+
+
+class FlatAST(object):
+    """
+    Attributes
+    ----------
+    nodes : [ast]
+        The node of every row.
+    types : [type]
+        The node types, by their id.
+    identifiers : [str]
+        The interned identifiers, by their id.
+    type_id, parent, depth, lineno, col_offset, end_lineno,
+    end_col_offset, identifier_id : numpy.ndarray or array
+        A column each. `parent` is -1 for the root, the positions are
+        `MISSING` for the nodes that don't have them and `identifier_id` is -1
+        for the nodes without an identifier e.g. `id` of `ast.Name` or
+        `name` of `ast.FunctionDef`.
+    vectorized : bool
+        Whether the columns are NumPy arrays.
+
+    Methods
+    -------
+    type_mask(node_types)
+    range_mask(column, minimum=None, maximum=None)
+    identifier_mask(identifiers)
+    union_mask(masks)
+    positions(masks)
+    """
+    def __init__(self, nodes, use_numpy=None):
+        """
+        Parameters
+        ----------
+        nodes : [ast]
+            All of the nodes of a tree, in the order of `ast.walk`.
+        use_numpy : bool
+            Default is `None` which uses NumPy if it's installed.
+        """
+        self.vectorized = (numpy is not None) if use_numpy is None else (
+            use_numpy
+        )
+        assert not (self.vectorized and numpy is None), "NumPy is missing"
+        self.nodes = nodes
+        self.types = list()
+        self.identifiers = list()
+        type_ids = dict()
+        identifier_ids = dict()
+        columns = {
+            name: [MISSING] * len(nodes)
+            for name in ['lineno', 'col_offset', 'end_lineno',
+                         'end_col_offset']
+        }
+        type_id = [0] * len(nodes)
+        parent = [-1] * len(nodes)
+        depth = [0] * len(nodes)
+        identifier_id = [-1] * len(nodes)
+        # In the order of `ast.walk`, the children of the nodes follow one
+        # another in the same order as their parents, after the root. The
+        # position of a child can't be looked up by the node, since some of
+        # them e.g. `ast.Load` are shared.
+        child_position = 1
+        for position, node in enumerate(nodes):
+            node_type = type(node)
+            if node_type not in type_ids:
+                type_ids[node_type] = len(self.types)
+                self.types.append(node_type)
+            type_id[position] = type_ids[node_type]
+            for name, column in columns.items():
+                value = getattr(node, name, None)
+                if type(value) is int:
+                    column[position] = value
+            identifier = _identifier(node)
+            if identifier is not None:
+                if identifier not in identifier_ids:
+                    identifier_ids[identifier] = len(self.identifiers)
+                    self.identifiers.append(identifier)
+                identifier_id[position] = identifier_ids[identifier]
+            for _ in ast.iter_child_nodes(node):
+                parent[child_position] = position
+                depth[child_position] = depth[position] + 1
+                child_position += 1
+        self.__type_ids = type_ids
+        self.__identifier_ids = identifier_ids
+        self.type_id = self._column(type_id)
+        # Without NumPy, a mask of types is made by translating the type ids
+        # as bytes, as long as there are few enough types.
+        self.__type_bytes = (
+            bytes(type_id)
+            if not self.vectorized and len(self.types) <= 256 else None
+        )
+        self.parent = self._column(parent)
+        self.depth = self._column(depth)
+        self.identifier_id = self._column(identifier_id)
+        for name, column in columns.items():
+            setattr(self, name, self._column(column))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _column(self, values):
+        if self.vectorized:
+            return numpy.array(values, dtype=numpy.int32)
+        return array('i', values)
+
+    def _in_ids(self, column, ids):
+        """
+        Returns
+        -------
+        numpy.ndarray or bytes
+            Whether the value of every row is one of the ids.
+        """
+        if self.vectorized:
+            return numpy.isin(column, list(ids))
+        ids = frozenset(ids)
+        return bytes(value in ids for value in column)
+
+    def type_mask(self, node_types):
+        """
+        Parameters
+        ----------
+        node_types : {type}
+
+        Returns
+        -------
+        numpy.ndarray or bytes
+            Whether every row is of one of the types.
+        """
+        ids = {
+            self.__type_ids[node_type] for node_type in node_types
+            if node_type in self.__type_ids
+        }
+        if self.__type_bytes is not None:
+            return self.__type_bytes.translate(
+                bytes(type_id in ids for type_id in range(256))
+            )
+        return self._in_ids(self.type_id, ids)
+
+    def range_mask(self, column, minimum=None, maximum=None):
+        """
+        Parameters
+        ----------
+        column : str
+            e.g. `lineno`
+        minimum : int
+            Default is `None` which doesn't limit it.
+        maximum : int
+            Default is `None` which doesn't limit it.
+
+        Returns
+        -------
+        numpy.ndarray or bytes
+            Whether the value of every row is within the limits. A row that
+            doesn't have the value isn't.
+        """
+        values = getattr(self, column)
+        minimum = (MISSING + 1) if minimum is None else max(minimum,
+                                                            MISSING + 1)
+        if self.vectorized:
+            mask = values >= minimum
+            if maximum is not None:
+                mask &= values <= maximum
+            return mask
+        if maximum is None:
+            return bytes(minimum <= value for value in values)
+        return bytes(minimum <= value <= maximum for value in values)
+
+    def identifier_mask(self, identifiers):
+        """
+        Parameters
+        ----------
+        identifiers : {str}
+
+        Returns
+        -------
+        numpy.ndarray or bytes
+            Whether the identifier of every row is one of them.
+        """
+        return self._in_ids(self.identifier_id, {
+            self.__identifier_ids[identifier] for identifier in identifiers
+            if identifier in self.__identifier_ids
+        })
+
+    def union_mask(self, masks):
+        """
+        Parameters
+        ----------
+        masks : [numpy.ndarray or bytes]
+
+        Returns
+        -------
+        numpy.ndarray or bytes
+            Whether every row is in any of the masks.
+        """
+        if self.vectorized:
+            combined = masks[0].copy()
+            for mask in masks[1:]:
+                combined |= mask
+            return combined
+        combined = 0
+        for mask in masks:
+            combined |= int.from_bytes(mask, 'little')
+        return combined.to_bytes(len(self), 'little')
+
+    def positions(self, masks):
+        """
+        Parameters
+        ----------
+        masks : [numpy.ndarray or bytes]
+
+        Returns
+        -------
+        iterable of int
+            The ascending positions of the rows that are in all of the masks.
+            All of the rows if there aren't any masks.
+        """
+        if not masks:
+            return range(len(self))
+        if self.vectorized:
+            combined = masks[0].copy()
+            for mask in masks[1:]:
+                combined &= mask
+            return numpy.flatnonzero(combined).tolist()
+        # The bytes of the masks are either 0 or 1, so they're "AND"ed all at
+        # once as integers.
+        combined = int.from_bytes(masks[0], 'little')
+        for mask in masks[1:]:
+            combined &= int.from_bytes(mask, 'little')
+        return list(compress(
+            range(len(self)), combined.to_bytes(len(self), 'little')
+        ))
+
+
+def vectorized_filters(flat_ast, plan):
+    """
+    Splits a plan into the masks that can be evaluated over the columns and
+    the predicates that still need to be evaluated node by node.
+
+    Parameters
+    ----------
+    flat_ast : FlatAST
+    plan : Query_plan
+
+    Returns
+    -------
+    ([numpy.ndarray or bytes], [(node, knowledge) -> {True, False}])
+        A node can only satisfy the plan if its row is in all of the masks.
+        The positional window is fully decided by its masks, so it's left out
+        of the predicates. The others stay.
+    """
+    masks = list()
+    predicates = list()
+    if plan.node_types is not None:
+        masks.append(flat_ast.type_mask(plan.node_types))
+    for predicate in plan.predicates:
+        window = getattr(predicate, 'window', None)
+        if window is not None:
+            for column, minimum, maximum in [
+                    ('lineno', window.line_minimum, window.line_maximum),
+                    ('col_offset', window.column_minimum,
+                     window.column_maximum),
+            ]:
+                if (minimum, maximum) != (None, None):
+                    masks.append(flat_ast.range_mask(column, minimum, maximum))
+            continue
+        specs = getattr(predicate, 'specs', None)
+        name = None if specs is None else specs.kwargs.get('name')
+        if (
+                specs is not None and
+                specs.kwargs.get('consideration') is True and
+                '.'.join(specs.address) in {
+                    'Kind.Functions', 'Kind.Classes',
+                    'Kind.Functions.Decorators'
+                } and type(name) is str and name
+        ):
+            # They're only satisfied by a definition or a name of the same
+            # identifier, which is still to be checked to be one, except for
+            # a lambda that's assigned to the name, which has no identifier.
+            mask = flat_ast.identifier_mask({name})
+            if specs.address[-1] == 'Functions':
+                mask = flat_ast.union_mask([
+                    mask, flat_ast.type_mask({ast.Lambda})
+                ])
+            masks.append(mask)
+        predicates.append(predicate)
+    return masks, predicates
@@ -1,10 +1,19 @@
+from arep.plan import (
+    validator_specs_deriver, compile_predicate, candidate_node_types,
+    compile_plan, compile_plans, evaluator, adaptive_evaluator,
+    shared_evaluator, compile_expression, Expression_specification,
+    plan_window
+)
 from arep.utils import (
     establish_parent_link, Knowledge_template, update_knowledge_template,
-    Result
+    node_type_index, node_type_bits, annotate_tree, Lazy_knowledge, Result
 )
-from arep import Validators
-from functools import namedtuple, partial
+from arep.flat import FlatAST, vectorized_filters
+from arep.intervals import Interval_index
+from arep.stats import Search_stats
+from collections import deque
 import ast
+import heapq
 import os
 
 
@@ -14,12 +23,12 @@ class Grepper(object):
     ----------
     constraint_list
         The list of all the constraints that are being considered.
-        It automatically "AND"s all the constraints. For now assign
-        `consideration` to False for a constraint to `NOT` it and union
-        greppers for "OR".
+        It automatically "AND"s all the constraints. Constraints can also be
+        combined with `&`, `|` and `~` into a `Constraint_expression`, which
+        is searched for in the same single traversal.
     __ast
         The modified AST of the program where each node with a parent has a
-        pointer to it.
+        pointer to it, unless the parents are kept in a side table.
     __source
         str of the source code
     __name
@@ -28,33 +37,144 @@ class Grepper(object):
         A dictionary of some of the knowledge that can be automatically gained
         by looking at the entire AST. For example, it helps to see whether
         `f()` is a class or a function or alike. It can't be known without it.
+        Unless asked otherwise, it's only learned when the constraints need
+        it.
+    __nodes
+        All of the nodes of the AST in the order of `ast.walk`.
+    __node_index
+        Positions in `__nodes` grouped by node type. It lets `run` visit only
+        the nodes whose type can satisfy the constraints.
+    __stats
+        The profiling counters of all of the searches, if profiled.
+    __flat_ast
+        The `FlatAST` of the nodes, if the searches use one. It's made on the
+        first search.
+    __interval_index
+        The `Interval_index` of the nodes, once a search by `lines` or
+        `enclosing_nodes` needs it. From then on, it's used for all of the
+        searches within some lines.
 
     Methods
     -------
     get_source()
     get_knowledge()
-    run()
+    compile()
+        Compiles the constraints into a `Query_plan` that is reusable across
+        nodes and files.
+    run(plan=None, adaptive=False, lines=None)
         A generator that yields nodes that satisfy all the constraints.
-    all_results()
+    all_results(plan=None, adaptive=False, lines=None)
         Returns a list of all the results by exhusting the generator above.
+    enclosing_nodes(line)
+        Returns the nodes whose lines include the line.
+    run_many(queries, plans=None)
+        A generator that yields the results of many independent lists of
+        constraints, tagged by their query, from a single traversal.
+    all_results_many(queries, plans=None)
+        Returns the results of `run_many` grouped by their query.
+    stats()
+        Returns the profiling counters of the searches so far.
     """
-    def __init__(self, source_abs_path):
+    def __init__(self, source_abs_path, single_pass=True,
+                 parent_table=False, lazy_knowledge=True, cache=None,
+                 profile=False, flat=False):
         """
         Parameters
         ----------
         source_abs_path : str
             Absolute path to the python source code that'll be parsed.
+        single_pass : bool
+            Default is `True` which makes the parent pointers, the knowledge
+            and the node index in one traversal of the AST. `False` makes each
+            of them in a separate traversal.
+        parent_table : bool
+            Default is `False`. If `True`, the parents are kept in the
+            `parents` side table of the knowledge instead of `_parent`
+            attributes, so the AST stays unmodified.
+        lazy_knowledge : bool
+            Default is `True` which only learns the per-file knowledge that
+            the constraints need, right before searching. `False` learns all
+            of it while parsing.
+        cache : Parse_cache
+            Default is `None`. If given, the parsed and annotated AST is
+            loaded from it when the source hasn't changed, and is stored in it
+            otherwise.
+        profile : bool
+            Default is `False`. If `True`, the searches count how often each
+            validator is called, accepts and rejects a node and how long it
+            takes, which is returned by `stats`.
+        flat : bool
+            Default is `False`. If `True`, `run` evaluates the node types, the
+            positions and the names that the constraints need over the columns
+            of a `FlatAST` for all of the nodes at once, and only runs the
+            validators on the nodes that remain.
         """
         assert os.path.exists(source_abs_path), "Path doesn't exist"
         with open(source_abs_path, 'r') as f:
-            self.__ast = establish_parent_link(ast.parse(f.read()))
+            source = f.read()
             self.__source = f
             self.__name = os.path.basename(source_abs_path)
-            self.__knowledge_template = update_knowledge_template(
-                ast_tree_with_parent_pointers=self.__ast,
-                knowledge_template=Knowledge_template(),
-            )
+            if cache is None:
+                annotated = None
+            else:
+                cache_key = cache.key(source, parent_table=parent_table,
+                                      lazy_knowledge=lazy_knowledge)
+                annotated = cache.load(cache_key)
+            if annotated is None:
+                annotated = self._annotated(
+                    ast.parse(source), single_pass, parent_table,
+                    eager_knowledge=(not lazy_knowledge)
+                )
+                if cache is not None:
+                    cache.store(cache_key, annotated)
+            (
+                self.__ast, learned_knowledge,
+                self.__nodes, self.__node_index
+            ) = annotated
+            self.__knowledge_template = Knowledge_template()
+            self.__knowledge_template.maps[0].update(learned_knowledge)
+            if lazy_knowledge:
+                self.__knowledge_template = Lazy_knowledge(
+                    self.__nodes, self.__knowledge_template
+                )
             self.constraint_list = list()
+            self.__stats = Search_stats() if profile else None
+            self.__flat = flat
+            self.__flat_ast = None
+            self.__searches_by_lines = 0
+            self.__interval_index = None
+
+    @staticmethod
+    def _annotated(tree, single_pass, parent_table, eager_knowledge):
+        """
+        Returns
+        -------
+        (ast, {str: type}, [ast], {type: [int]})
+            The tree with its parents, the per-file knowledge that's been
+            learned, the nodes and the node index. It's what's cached.
+        """
+        if single_pass:
+            tree, knowledge, nodes, node_index = annotate_tree(
+                tree, Knowledge_template(), parent_table=parent_table,
+                _with_classes=eager_knowledge,
+                _with_funcs=eager_knowledge,
+                _with_decorators=eager_knowledge,
+                _with_class_methods=eager_knowledge,
+                _with_summaries=eager_knowledge,
+                _with_scopes=eager_knowledge,
+            )
+        else:
+            knowledge = Knowledge_template()
+            if parent_table:
+                knowledge['parents'] = dict()
+            tree = establish_parent_link(tree, knowledge.get('parents'))
+            if eager_knowledge:
+                update_knowledge_template(
+                    ast_tree_with_parent_pointers=tree,
+                    knowledge_template=knowledge,
+                )
+            nodes, node_index = node_type_index(tree)
+        return tree, knowledge.maps[0], nodes, node_index
 
     def get_source(self):
         """
@@ -64,14 +184,39 @@ class Grepper(object):
         """
         return self.__source
 
+    def stats(self):
+        """
+        Returns
+        -------
+        dict or None
+            Same as `Search_stats.as_dict` for all of the searches so far, or
+            `None` if the grepper isn't profiled. It can be exported with
+            `arep.stats.to_prometheus`.
+        """
+        if self.__stats is None:
+            return None
+        return self.__stats.as_dict()
+
     def get_knowledge(self):
         """
         Returns
         -------
         {str: type}
+            With all of the per-file knowledge learned.
         """
+        if isinstance(self.__knowledge_template, Lazy_knowledge):
+            self.__knowledge_template.learn()
         return self.__knowledge_template
 
+    def _validator_specs_deriver(self):
+        """
+        Returns
+        -------
+        [[Validator_specification]]
+            One list per constraint in `constraint_list`.
+        """
+        return validator_specs_deriver(self.constraint_list)
+
     def _validator_predicates_deriver(self):
         """
         Collects all of the functions that need to be checked on each node
@@ -79,78 +224,362 @@ class Grepper(object):
 
         Returns
         -------
-        [(*args, **kwargs) -> {True, False}]
+        [[(node, knowledge) -> {True, False}]]
+        """
+        return [
+            [compile_expression(constraint_specs)]
+            if isinstance(constraint_specs, Expression_specification)
+            else [compile_predicate(specs) for specs in constraint_specs]
+            for constraint_specs in self._validator_specs_deriver()
+        ]
+
+    def _candidate_node_types(self):
+        """
+        Returns
+        -------
+        {type}  the only node types that may satisfy the constraints.
+        None    if the constraints don't restrict the node types.
         """
+        return candidate_node_types(self._validator_specs_deriver())
 
-        def per_constraint_deriver(constraint):
+    def compile(self):
+        """
+        Compiles the current `constraint_list`. The plan doesn't depend on the
+        file, so it can be passed to `run` of other greppers as well.
 
-            def validator_tracker(cls):
-                results = list()
-                parents = [cls.__name__]
+        Returns
+        -------
+        Query_plan
+        """
+        return compile_plan(self.constraint_list)
 
-                def wrapped(cls, parents):
-                    keywords = dict()
-                    for key in cls.view_actives():
-                        value = getattr(cls, key)
-                        if type(value).__name__ not in {
-                            "Action", "Kind", "Properties"
-                        }:
-                            keywords[key] = value
-                        else:
-                            wrapped(value, parents + [key])
-                    if bool(keywords):
-                        results.append(namedtuple(
-                            "Validator_specification", "address kwargs")(
-                                parents, keywords
-                            ))
+    def _candidate_nodes(self, candidate_types):
+        """
+        Parameters
+        ----------
+        candidate_types : {type} or None
 
-                wrapped(cls, parents)
-                return results
+        Yields
+        ------
+        ast
+            Nodes in the order of `ast.walk`, skipping those whose type isn't
+            in `candidate_types`.
+        """
+        if candidate_types is None:
+            for node in self.__nodes:
+                yield node
+        else:
+            for position in heapq.merge(*[
+                    self.__node_index[node_type]
+                    for node_type in candidate_types
+                    if node_type in self.__node_index
+            ]):
+                yield self.__nodes[position]
 
-            validator_specs = validator_tracker(constraint)
+    def _nodes_within_lines(self, first, last, candidate_types):
+        """
+        Parameters
+        ----------
+        first : int or None
+        last : int or None
+            The lines that the nodes should be within. `None` doesn't limit
+            them.
+        candidate_types : {type} or None
 
-            validators = list()
-            for specs in validator_specs:
-                result = getattr(Validators, specs.address[0])
-                for address_index in range(1, len(specs.address)):
-                    result = getattr(result, specs.address[address_index])
-                validators.append(partial(result, **specs.kwargs))
+        Yields
+        ------
+        ast
+            Same as `_candidate_nodes`, except that the subtrees that are
+            entirely outside of the lines, that don't have any positions or
+            that don't have any of the candidate types beneath their root
+            are skipped without being visited.
+        """
+        spans = self.__knowledge_template['spans']
+        if candidate_types is not None:
+            masks = self.__knowledge_template['descendant_types']
+            candidate_bits = node_type_bits(candidate_types)
+        first = float('-inf') if first is None else first
+        last = float('inf') if last is None else last
+        to_be_processed = deque([self.__ast])
+        while to_be_processed:
+            node = to_be_processed.popleft()
+            span = spans.get(node)
+            if span is None or span[1] < first or last < span[0]:
+                continue
+            if candidate_types is None:
+                yield node
+            else:
+                if type(node) in candidate_types:
+                    yield node
+                if not masks.get(node, 0) & candidate_bits:
+                    continue
+            to_be_processed.extend(ast.iter_child_nodes(node))
 
-            return validators
+    def _nodes_starting_within(self, first, last, candidate_types):
+        """
+        Parameters
+        ----------
+        first : int or None
+        last : int or None
+        candidate_types : {type} or None
 
+        Yields
+        ------
+        ast
+            Same as `_candidate_nodes`, except only those whose `lineno` is
+            within the lines, from the `Interval_index`.
+        """
+        for position in self._interval_index().starting_within(first, last):
+            node = self.__nodes[position]
+            if candidate_types is None or type(node) in candidate_types:
+                yield node
+
+    def _prunes_lines(self, window, candidate_types):
+        """
+        Whether visiting the nodes within the lines of the window, pruning
+        the subtrees outside of it, is expected to be cheaper than visiting
+        all of the candidate nodes. If the `spans` and the
+        `descendant_types` aren't known yet, learning each of them is a visit
+        of every node, which is spread over all of the searches by lines so
+        far, since it pays off over repeated ones.
+
+        Returns
+        -------
+        bool
+        """
+        if window is None or (
+                window.line_minimum is None and window.line_maximum is None
+        ):
+            return False
+        self.__searches_by_lines += 1
+        # The lines of the file, from its top level statements.
+        last_line = max([
+            getattr(statement, 'end_lineno', None) or 0
+            for statement in getattr(self.__ast, 'body', [])
+        ] or [0])
+        if last_line < 1:
+            return False
+        first = max(1, window.line_minimum or 1)
+        last = min(last_line, window.line_maximum or last_line)
+        within = max(0, last - first + 1) / last_line
+        candidates = len(self.__nodes) if candidate_types is None else sum(
+            len(self.__node_index.get(node_type, ()))
+            for node_type in candidate_types
+        )
+        side_tables = {'spans'} if candidate_types is None else {
+            'spans', 'descendant_types'
+        }
+        learning_cost = len(
+            side_tables - set(self.__knowledge_template.maps[0])
+        ) * len(self.__nodes) / self.__searches_by_lines
+        # A pruned traversal costs about twice as much per node.
+        if learning_cost + 2 * within * len(self.__nodes) >= candidates:
+            return False
+        if isinstance(self.__knowledge_template, Lazy_knowledge):
+            self.__knowledge_template.learn(side_tables)
+        return True
+
+    def _interval_index(self):
+        if self.__interval_index is None:
+            self.__interval_index = Interval_index(self.__nodes)
+        return self.__interval_index
+
+    def enclosing_nodes(self, line):
+        """
+        Parameters
+        ----------
+        line : int
+
+        Returns
+        -------
+        [ast]
+            The nodes whose lines, from their `lineno` to their `end_lineno`,
+            include the line, in the order of `ast.walk`.
+        """
         return [
-            per_constraint_deriver(constraint)
-            for constraint in self.constraint_list
+            self.__nodes[position]
+            for position in self._interval_index().enclosing(line)
         ]
 
-    def run(self):
+    def run(self, plan=None, adaptive=False, lines=None):
         """
+        Parameters
+        ----------
+        plan : Query_plan
+            Default is `None` which compiles the `constraint_list`.
+        adaptive : bool
+            Default is `False`. If `True`, the order in which the constraints
+            are checked is re-adjusted during the scan from how often each
+            of them rejects a node.
+        lines : range
+            Default is `None`. If given, only the nodes that start on these
+            lines are searched, which are looked up in an `Interval_index`
+            rather than found by visiting the nodes.
+
         Yields
         ------
         Result
             An object with `name`, `line` and `column` attributes.
         """
-        validator_predicates = {
-            validator_predicate
-            for constraint_block in self._validator_predicates_deriver()
-            for validator_predicate in constraint_block
-        }
-        for node in ast.walk(self.__ast):
-            if all([validator_predicate(
-                    node=node, knowledge=self.__knowledge_template
-            ) for validator_predicate in validator_predicates]):
+        if plan is None:
+            plan = self.compile()
+        if lines is not None:
+            assert lines.step == 1, "The lines should be consecutive"
+        knowledge = self.__knowledge_template
+        if isinstance(knowledge, Lazy_knowledge):
+            knowledge.learn(plan.knowledge_keys)
+        stats = self.__stats
+        if self.__flat:
+            if self.__flat_ast is None:
+                self.__flat_ast = FlatAST(self.__nodes)
+            masks, predicates = vectorized_filters(self.__flat_ast, plan)
+            if lines is not None:
+                masks.append(self.__flat_ast.range_mask(
+                    'lineno', lines.start, lines.stop - 1
+                ))
+            plan = plan._replace(predicates=predicates)
+            nodes = map(self.__nodes.__getitem__,
+                        self.__flat_ast.positions(masks))
+        else:
+            window = plan_window(plan)
+            first, last = (
+                (None, None) if window is None
+                else (window.line_minimum, window.line_maximum)
+            )
+            if lines is not None:
+                first = (lines.start if first is None
+                         else max(first, lines.start))
+                last = (lines.stop - 1 if last is None
+                        else min(last, lines.stop - 1))
+            if lines is not None or (
+                    self.__interval_index is not None and
+                    (first, last) != (None, None)
+            ):
+                nodes = self._nodes_starting_within(
+                    first, last, plan.node_types
+                )
+            elif self._prunes_lines(window, plan.node_types):
+                nodes = self._nodes_within_lines(
+                    window.line_minimum, window.line_maximum, plan.node_types
+                )
+            else:
+                nodes = self._candidate_nodes(plan.node_types)
+        if stats is not None:
+            plan, = stats.instrumented_plans([plan])
+            nodes = stats.counted_nodes(nodes)
+        satisfies_all = (adaptive_evaluator if adaptive else evaluator)(
+            plan.predicates
+        )
+        for node in nodes:
+            if satisfies_all(node, knowledge):
                 try:
-                    yield Result(
+                    result = Result(
                         name=self.__name,
                         line=node.lineno, column=node.col_offset
                     )
                 except AttributeError:
-                    pass
+                    continue
+                if stats is not None:
+                    stats.results += 1
+                yield result
 
-    def all_results(self):
+    def run_many(self, queries, plans=None):
         """
+        Searches for all of the queries in a single traversal of the AST.
+
+        Parameters
+        ----------
+        queries : [[Action or Kind or Properties]] or {object: [...]}
+            Independent lists of constraints, each of which is "AND"ed like
+            `constraint_list`.
+        plans : [Query_plan]
+            Default is `None` which compiles the queries with
+            `compile_plans`, in the order of their tags.
+
+        Yields
+        ------
+        (object, Result)
+            The tag of the query that the result satisfies, i.e. its key if
+            `queries` is a dict and its position otherwise, and the result.
+            A result that satisfies several queries is yielded once for each.
+        """
+        tags = (list(queries) if isinstance(queries, dict)
+                else list(range(len(queries))))
+        if plans is None:
+            plans = compile_plans([queries[tag] for tag in tags])
+        stats = self.__stats
+        if stats is not None:
+            plans = stats.instrumented_plans(plans)
+        satisfied_plans = shared_evaluator(plans)
+        knowledge = self.__knowledge_template
+        if isinstance(knowledge, Lazy_knowledge):
+            knowledge.learn(frozenset().union(
+                *[plan.knowledge_keys for plan in plans]
+            ))
+        if any(plan.node_types is None for plan in plans):
+            candidate_types = None
+        else:
+            candidate_types = set().union(
+                *[plan.node_types for plan in plans]
+            )
+        # The plans that each type of node can satisfy.
+        plans_of_type = dict()
+        nodes = self._candidate_nodes(candidate_types)
+        if stats is not None:
+            nodes = stats.counted_nodes(nodes)
+        for node in nodes:
+            node_type = type(node)
+            if node_type not in plans_of_type:
+                plans_of_type[node_type] = [
+                    plan_id for plan_id, plan in enumerate(plans)
+                    if plan.node_types is None or node_type in plan.node_types
+                ]
+            satisfied = satisfied_plans(
+                node, knowledge, plans_of_type[node_type]
+            )
+            if not satisfied or not hasattr(node, 'lineno'):
+                continue
+            result = Result(
+                name=self.__name, line=node.lineno, column=node.col_offset
+            )
+            if stats is not None:
+                stats.results += len(satisfied)
+            for plan_id in satisfied:
+                yield tags[plan_id], result
+
+    def all_results_many(self, queries, plans=None):
+        """
+        Parameters
+        ----------
+        queries : [[Action or Kind or Properties]] or {object: [...]}
+        plans : [Query_plan]
+            Default is `None` which compiles the queries.
+
+        Returns
+        -------
+        {object: [Result]}
+            The results of every query by its tag.
+        """
+        tags = (list(queries) if isinstance(queries, dict)
+                else list(range(len(queries))))
+        results = {tag: list() for tag in tags}
+        for tag, result in self.run_many(queries, plans):
+            results[tag].append(result)
+        return results
+
+    def all_results(self, plan=None, adaptive=False, lines=None):
+        """
+        Parameters
+        ----------
+        plan : Query_plan
+            Default is `None` which compiles the `constraint_list`.
+        adaptive : bool
+            Default is `False`
+        lines : range
+            Default is `None`
+
         Returns
         -------
         [Result]
         """
-        return list(self.run())
+        return list(self.run(plan, adaptive, lines))
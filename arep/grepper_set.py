@@ -0,0 +1,299 @@
+from arep.cache import Parse_cache
+from arep.grepper import Grepper
+from arep.plan import plan_from_specs, validator_specs_deriver
+from arep.utils import Result, ResultSet
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+import os
+import sys
+
+"""
+Searching many files, possibly in parallel.
+
+The constraints are sent to the worker processes as their validator
+specifications and each worker compiles them into a query plan once. Only
+the coordinates of the results are sent back.
+"""
+
+# The query plan and the parse cache of a worker process.
+_worker_plan = None
+_worker_cache = None
+
+# `Executor.shutdown` can cancel the futures that haven't started since
+# Python 3.9.
+_CAN_CANCEL_FUTURES = sys.version_info >= (3, 9)
+
+# How many chunks of files each worker process may have waiting for it.
+_CHUNKS_PER_WORKER = 2
+
+
+def _initialize_worker(validator_specs, cache):
+    global _worker_plan, _worker_cache
+    _worker_plan = plan_from_specs(validator_specs)
+    _worker_cache = cache
+
+
+def _search_file(source_abs_path, plan=None, cache=None):
+    """
+    Parameters
+    ----------
+    source_abs_path : str
+    plan : Query_plan
+        Default is `None` which uses the plan of the worker process.
+    cache : Parse_cache
+        Default is `None` which uses the cache of the worker process, if any.
+
+    Returns
+    -------
+    ([(int, int)], Exception or None)
+        The line and the column of every result, or the error that stopped
+        the file from being searched.
+    """
+    try:
+        grepper = Grepper(
+            source_abs_path, cache=(_worker_cache if cache is None else cache)
+        )
+    except (
+            SyntaxError, ValueError, UnicodeDecodeError, RecursionError,
+            OSError, AssertionError
+    ) as error:
+        # `AssertionError` is what `Grepper` raises for a missing file e.g.
+        # a dangling symbolic link.
+        return ([], error)
+    return ([
+        (result.line, result.column)
+        for result in grepper.run(_worker_plan if plan is None else plan)
+    ], None)
+
+
+def _search_files(source_abs_paths):
+    """
+    Returns
+    -------
+    [([(int, int)], Exception or None)]
+        What `_search_file` returns for every file, with the plan and the
+        cache of the worker process.
+    """
+    return [
+        _search_file(source_abs_path) for source_abs_path in source_abs_paths
+    ]
+
+
+def source_paths(paths):
+    """
+    Parameters
+    ----------
+    paths : [str]
+        Python files and directories to search in.
+
+    Yields
+    ------
+    str
+        Absolute path of every given file and of every `.py` file under the
+        given directories, in sorted order per directory.
+    """
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            for file_name in sorted(files):
+                if file_name.endswith('.py'):
+                    yield os.path.join(directory, file_name)
+
+
+class GrepperSet(object):
+    """
+    Attributes
+    ----------
+    constraint_list
+        Same as `constraint_list` of `Grepper`. It's applied to all of the
+        files.
+    paths : [str]
+        Python files and directories to search in.
+    root : str
+        The names of the results are the paths of their files relative to it.
+    workers : int
+        Number of worker processes. With 1, the files are searched in the
+        current process.
+    chunksize : int
+        Number of files that are sent to a worker process at a time.
+    cache : Parse_cache
+        Where the parsed files are cached, if anywhere.
+    errors : {str: Exception}
+        The relative paths of the files that couldn't be searched, e.g.
+        because of a syntax error, with what went wrong. It's filled as the
+        files are searched.
+
+    Methods
+    -------
+    source_paths()
+        A generator of the absolute paths of all of the files to search.
+    run()
+        A generator that yields the results of all of the files as soon as
+        each file is searched.
+    all_results()
+        Returns a list of all the results by exhusting the generator above.
+    result_set()
+        Returns all of the results in a columnar `ResultSet`.
+    """
+    def __init__(self, paths, root=None, workers=None, chunksize=16,
+                 cache=None):
+        """
+        Parameters
+        ----------
+        paths : str or [str]
+            Python files and directories to search in. The directories are
+            searched recursively for `.py` files.
+        root : str
+            Default is `None` which is the current working directory.
+        workers : int
+            Default is `None` which is the number of CPUs.
+        chunksize : int
+            Default is 16
+        cache : Parse_cache or str
+            Default is `None` which doesn't cache. A directory is the same as
+            a `Parse_cache` of it with the default size.
+        """
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.root = os.path.abspath(os.getcwd() if root is None else root)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        assert self.workers >= 1, "There should be at least one worker"
+        assert chunksize >= 1, "Chunks should have at least one file"
+        self.chunksize = chunksize
+        self.cache = (Parse_cache(cache) if isinstance(cache, str)
+                      else cache)
+        self.constraint_list = list()
+        self.errors = dict()
+
+    def source_paths(self):
+        """
+        Yields
+        ------
+        str
+        """
+        return source_paths(self.paths)
+
+    def _searched_files(self, validator_specs):
+        """
+        Yields
+        ------
+        (str, ([(int, int)], Exception or None))
+            Absolute path of every file with what `_search_file` returned
+            for it, in the order of `source_paths`.
+        """
+        abs_paths = self.source_paths()
+        if self.workers == 1:
+            search = partial(_search_file,
+                             plan=plan_from_specs(validator_specs),
+                             cache=self.cache)
+            for abs_path in abs_paths:
+                yield abs_path, search(abs_path)
+            return
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_initialize_worker,
+            initargs=(validator_specs, self.cache)
+        )
+        # The files are found as they're searched and only a few chunks are
+        # sent ahead of the one whose results are awaited, so the results of
+        # a file don't wait for the whole tree to be walked.
+        chunks = iter(lambda: list(islice(abs_paths, self.chunksize)), [])
+        pending = deque()
+
+        def submit(count):
+            for chunk in islice(chunks, count):
+                pending.append((chunk, executor.submit(_search_files, chunk)))
+
+        try:
+            submit(self.workers * _CHUNKS_PER_WORKER)
+            while pending:
+                chunk, future = pending.popleft()
+                submit(1)
+                for abs_path, searched in zip(chunk, future.result()):
+                    yield abs_path, searched
+        finally:
+            # When the results stop being read, e.g. as the output of the
+            # command line has been closed, the rest of the files are left.
+            # Before Python 3.9, the chunks that have been sent can't be and
+            # are searched regardless.
+            if _CAN_CANCEL_FUTURES:
+                executor.shutdown(cancel_futures=True)
+            else:
+                executor.shutdown()
+
+    def run(self):
+        """
+        Yields
+        ------
+        Result
+            An object with `name`, `line` and `column` attributes where
+            `name` is the path of the file relative to `root`.
+        """
+        for name, coordinates in self._searched_coordinates():
+            for line, column in coordinates:
+                yield Result(name=name, line=line, column=column)
+
+    def _searched_coordinates(self):
+        """
+        Yields
+        ------
+        (str, [(int, int)])
+            The relative path of every file with the coordinates of its
+            results.
+        """
+        validator_specs = validator_specs_deriver(self.constraint_list)
+        for abs_path, (coordinates, error) in self._searched_files(
+                validator_specs
+        ):
+            name = os.path.relpath(abs_path, self.root)
+            if error is not None:
+                self.errors[name] = error
+            yield name, coordinates
+
+    def all_results(self):
+        """
+        Returns
+        -------
+        [Result]
+        """
+        return list(self.run())
+
+    def result_set(self):
+        """
+        Same as `all_results`, without making a `Result` for every result.
+
+        Returns
+        -------
+        ResultSet
+        """
+        results = ResultSet()
+        for name, coordinates in self._searched_coordinates():
+            for line, column in coordinates:
+                results.add(name, line, column)
+        return results
+
+
+def scan(paths, constraints, **kwargs):
+    """
+    Parameters
+    ----------
+    paths : str or [str]
+        Python files and directories to search in.
+    constraints : [Action or Kind or Properties]
+        All of them are "AND"ed.
+    kwargs
+        Passed to `GrepperSet` e.g. `workers`, `chunksize` and `cache`.
+
+    Yields
+    ------
+    Result
+        With the path of the file relative to `root` as the `name`.
+    """
+    grepper_set = GrepperSet(paths, **kwargs)
+    grepper_set.constraint_list.extend(constraints)
+    return grepper_set.run()
@@ -0,0 +1,361 @@
+from arep.__about__ import __version__
+from arep.constraints import STRUCTURAL_RELATIONS
+from arep.grepper_set import GrepperSet, source_paths
+from arep.plan import (
+    candidate_node_types, Expression_specification, validator_specs_deriver
+)
+from arep.utils import ast_operation_types
+from concurrent.futures import ProcessPoolExecutor
+import ast
+import gc
+import os
+import pickle
+import sys
+
+"""
+A repository-wide inverted index.
+
+For every file it records the terms that a query may need to be there, i.e.
+the types of its nodes, its identifiers, what it imports and its operators.
+A query first intersects the files of the terms that its constraints need
+and only searches those files.
+"""
+
+# Bumped whenever what's stored in an index changes.
+_FORMAT = 2
+
+DEFAULT_INDEX_NAME = '.arep_index'
+
+
+def _node_terms(node):
+    """
+    Yields
+    ------
+    str
+        The terms that the node adds to its file.
+    """
+    node_type = type(node)
+    yield 'type:' + node_type.__name__
+    for field in {'id', 'arg', 'attr', 'name'}:
+        identifier = getattr(node, field, None)
+        if type(identifier) is str:
+            yield 'identifier:' + identifier
+    if node_type in {ast.Import, ast.ImportFrom}:
+        for alias in node.names:
+            yield 'import:' + alias.name
+            if alias.asname is not None:
+                yield 'as:' + alias.asname
+        if node_type is ast.ImportFrom and node.module is not None:
+            yield 'from:' + node.module
+    if node_type in {ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.AugAssign}:
+        yield 'operator:' + type(node.op).__name__
+    elif node_type is ast.Compare:
+        for op in node.ops:
+            yield 'operator:' + type(op).__name__
+
+
+def file_terms(tree):
+    """
+    Parameters
+    ----------
+    tree : ast
+
+    Returns
+    -------
+    {str}
+        e.g. `type:Import`, `identifier:f`, `import:os`, `from:os.path`,
+        `as:np` and `operator:Add`.
+    """
+    return {term for node in ast.walk(tree) for term in _node_terms(node)}
+
+
+def _signature(abs_path):
+    status = os.stat(abs_path)
+    return (status.st_mtime_ns, status.st_size)
+
+
+def _indexed_file(abs_path):
+    """
+    Returns
+    -------
+    ((int, int), {str} or None)
+        The signature of the file and its terms. A file that can't be read
+        or parsed has `None` instead.
+    """
+    signature = _signature(abs_path)
+    try:
+        with open(abs_path, 'r') as f:
+            return signature, file_terms(ast.parse(f.read()))
+    except (SyntaxError, ValueError, UnicodeDecodeError, RecursionError,
+            OSError):
+        return signature, None
+
+
+def required_terms(validator_specs):
+    """
+    Every constraint that can only hold for a node which has a certain term,
+    such as an import name or an identifier, requires its file to have it.
+
+    Parameters
+    ----------
+    validator_specs : [[Validator_specification]]
+
+    Returns
+    -------
+    [{str}]
+        A file can only have a result if it has at least one term of every
+        set.
+    """
+    requirements = list()
+    candidate_types = candidate_node_types(validator_specs)
+    if candidate_types is not None:
+        requirements.append({
+            'type:' + node_type.__name__ for node_type in candidate_types
+        })
+    for constraint_specs in validator_specs:
+        if isinstance(constraint_specs, Expression_specification):
+            # Only its node types are required.
+            continue
+        for specs in constraint_specs:
+            if not specs.kwargs.get('consideration'):
+                continue
+            address = '.'.join(specs.address)
+            name = specs.kwargs.get('name')
+            if type(name) is str and name:
+                if address in {'Action.Import'}:
+                    requirements.append({'import:' + name})
+                elif address in {'Action.Import.From'}:
+                    requirements.append({'from:' + name})
+                elif address in {'Action.Import.As'}:
+                    requirements.append({'as:' + name})
+                elif address in {
+                        'Kind.Variables', 'Kind.Functions',
+                        'Kind.Functions.Decorators', 'Kind.Classes'
+                }:
+                    requirements.append({'identifier:' + name})
+            if address == 'Properties.Structural':
+                # A node can't be inside, contain or be a child of what's not
+                # in the file.
+                for relation in STRUCTURAL_RELATIONS:
+                    if relation in specs.kwargs:
+                        requirements.extend(
+                            required_terms(list(specs.kwargs[relation]))
+                        )
+            symbol = specs.kwargs.get('symbol')
+            if address == 'Kind.Operations' and type(symbol) is str:
+                operation_types = ast_operation_types(symbol)
+                if operation_types:
+                    requirements.append({
+                        'operator:' + operation_type.__name__
+                        for operation_type in operation_types
+                    })
+    return requirements
+
+
+class Inverted_index(object):
+    """
+    Attributes
+    ----------
+    root : str
+        The files are kept relative to it.
+    files : [str]
+        The relative paths of the indexed files. The position of a file is
+        its id in the postings.
+    signatures : [(int, int)]
+        The modification time and the size of every file when it was
+        indexed.
+    postings : {str: [int]}
+        The ascending ids of the files that have each term.
+    broken : {int}
+        The ids of the files that couldn't be read or parsed. They're always
+        candidates, so that searching them reports the same errors as
+        without the index.
+
+    Methods
+    -------
+    build(paths, root=None, workers=None, chunksize=16)
+        Indexes the python files of the paths.
+    load(path)
+    save(path)
+    stale_files()
+    candidate_files(constraint_list)
+    search(constraint_list, **kwargs)
+    """
+    def __init__(self, root, files, signatures, postings, broken=None):
+        self.root = os.path.abspath(root)
+        self.files = files
+        self.signatures = signatures
+        self.postings = postings
+        self.broken = set([]) if broken is None else set(broken)
+
+    @classmethod
+    def build(cls, paths, root=None, workers=None, chunksize=16):
+        """
+        Parameters
+        ----------
+        paths : str or [str]
+            Python files and directories to index.
+        root : str
+            Default is `None` which is the current working directory.
+        workers : int
+            Default is `None` which is the number of CPUs. With 1, the files
+            are parsed in the current process.
+        chunksize : int
+            Default is 16
+
+        Returns
+        -------
+        Inverted_index
+        """
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        root = os.path.abspath(os.getcwd() if root is None else root)
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        abs_paths = list(source_paths(paths))
+        if workers == 1:
+            indexed_files = map(_indexed_file, abs_paths)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            indexed_files = executor.map(
+                _indexed_file, abs_paths, chunksize=chunksize
+            )
+        files, signatures, postings = list(), list(), dict()
+        broken = set([])
+        try:
+            for file_id, (signature, terms) in enumerate(indexed_files):
+                files.append(os.path.relpath(abs_paths[file_id], root))
+                signatures.append(signature)
+                if terms is None:
+                    broken.add(file_id)
+                    continue
+                for term in terms:
+                    postings.setdefault(term, list()).append(file_id)
+        finally:
+            if workers != 1:
+                executor.shutdown()
+        return cls(root, files, signatures, postings, broken)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        Inverted_index
+
+        Raises
+        ------
+        ValueError
+            If the index was built by another version of arep or Python, as
+            their ASTs may differ. It should be built again.
+        """
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as f:
+                stored = pickle.load(f)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if stored['versions'] != (_FORMAT, __version__, sys.version):
+            raise ValueError(
+                "{} was built by another version of arep or Python".format(
+                    path
+                )
+            )
+        return cls(stored['root'], stored['files'], stored['signatures'],
+                   stored['postings'], stored['broken'])
+
+    def save(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+        """
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'wb') as f:
+            pickle.dump({
+                'versions': (_FORMAT, __version__, sys.version),
+                'root': self.root,
+                'files': self.files,
+                'signatures': self.signatures,
+                'postings': self.postings,
+                'broken': self.broken,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+
+    def stale_files(self):
+        """
+        Returns
+        -------
+        {int}
+            The ids of the files that have changed since they were indexed.
+            Those that have been removed aren't included. Files that have
+            been added since aren't known until the index is built again.
+        """
+        stale = set([])
+        for file_id, relative_path in enumerate(self.files):
+            try:
+                signature = _signature(os.path.join(self.root, relative_path))
+            except OSError:
+                continue
+            if signature != self.signatures[file_id]:
+                stale.add(file_id)
+        return stale
+
+    def candidate_files(self, constraint_list):
+        """
+        Parameters
+        ----------
+        constraint_list : [Action or Kind or Properties]
+
+        Returns
+        -------
+        [str]
+            The relative paths of the files that may have results, sorted
+            by their ids, which includes those that have gone stale and
+            those that couldn't be parsed.
+        """
+        candidates = None
+        for terms in required_terms(validator_specs_deriver(constraint_list)):
+            having_terms = {
+                file_id
+                for term in terms
+                for file_id in self.postings.get(term, [])
+            }
+            candidates = (having_terms if candidates is None
+                          else candidates & having_terms)
+            if not candidates:
+                break
+        if candidates is None:
+            candidates = set(range(len(self.files)))
+        candidates |= self.stale_files() | self.broken
+        return [
+            self.files[file_id] for file_id in sorted(candidates)
+            if os.path.exists(os.path.join(self.root, self.files[file_id]))
+        ]
+
+    def search(self, constraint_list, **kwargs):
+        """
+        Parameters
+        ----------
+        constraint_list : [Action or Kind or Properties]
+        kwargs
+            Passed to `GrepperSet` e.g. `workers` and `cache`.
+
+        Yields
+        ------
+        Result
+            With the path of the file relative to `root` as the `name`.
+        """
+        grepper_set = GrepperSet(
+            [
+                os.path.join(self.root, relative_path)
+                for relative_path in self.candidate_files(constraint_list)
+            ],
+            root=self.root, **kwargs
+        )
+        grepper_set.constraint_list.extend(constraint_list)
+        return grepper_set.run()
@@ -0,0 +1,149 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+"""
+An index of the lines that the nodes span, for answering which nodes start
+within some lines or enclose a line without visiting all of them.
+"""
+
+
+class Interval_index(object):
+    """
+    The nodes that have a position, as intervals from their `lineno` to their
+    `end_lineno`. The starts are kept sorted for range queries and the
+    intervals are kept in a centered interval tree for enclosing queries,
+    both of which take O(log n + k) for k nodes found.
+
+    Attributes
+    ----------
+    starts : array
+        The `lineno` of the nodes, in ascending order.
+    start_positions : array
+        The position of the node of every start.
+
+    Methods
+    -------
+    starting_within(first, last)
+    enclosing(line)
+    """
+    def __init__(self, nodes):
+        """
+        Parameters
+        ----------
+        nodes : [ast]
+            All of the nodes of a tree. The positions are in this list.
+        """
+        intervals = list()
+        for position, node in enumerate(nodes):
+            start = getattr(node, 'lineno', None)
+            if type(start) is not int:
+                continue
+            end = getattr(node, 'end_lineno', None)
+            intervals.append(
+                (start, end if type(end) is int else start, position)
+            )
+        intervals.sort()
+        self.starts = array('i', [start for start, _, _ in intervals])
+        self.start_positions = array(
+            'i', [position for _, _, position in intervals]
+        )
+        self.__tree = self._centered_tree(intervals)
+
+    @staticmethod
+    def _centered_tree(intervals):
+        """
+        Parameters
+        ----------
+        intervals : [(int, int, int)]
+            Start, end and position, sorted.
+
+        Returns
+        -------
+        list
+            Flat list of the tree nodes, each of which is
+            `[center, left, right, by_start, by_end]`. `left` and `right` are
+            indices in the list or -1, `by_start` has the intervals that
+            contain the center sorted by their start and `by_end` has them
+            sorted by their end, descending. The root is the first.
+        """
+        if not intervals:
+            return []
+        tree = list()
+        # (intervals, index of the parent, whether it's the left child)
+        to_be_built = [(intervals, -1, False)]
+        while to_be_built:
+            current, parent_index, is_left = to_be_built.pop()
+            center = current[len(current) // 2][0]
+            left, right, containing = list(), list(), list()
+            for interval in current:
+                if interval[1] < center:
+                    left.append(interval)
+                elif center < interval[0]:
+                    right.append(interval)
+                else:
+                    containing.append(interval)
+            tree_index = len(tree)
+            tree.append([
+                center, -1, -1, containing,
+                sorted(containing, key=lambda interval: -interval[1])
+            ])
+            if parent_index != -1:
+                tree[parent_index][1 if is_left else 2] = tree_index
+            if left:
+                to_be_built.append((left, tree_index, True))
+            if right:
+                to_be_built.append((right, tree_index, False))
+        return tree
+
+    def starting_within(self, first, last):
+        """
+        Parameters
+        ----------
+        first : int or None
+        last : int or None
+            `None` doesn't limit the lines.
+
+        Returns
+        -------
+        [int]
+            The ascending positions of the nodes whose `lineno` is between
+            the lines, inclusive.
+        """
+        begin = 0 if first is None else bisect_left(self.starts, first)
+        end = (len(self.starts) if last is None
+               else bisect_right(self.starts, last))
+        return sorted(self.start_positions[begin:end])
+
+    def enclosing(self, line):
+        """
+        Parameters
+        ----------
+        line : int
+
+        Returns
+        -------
+        [int]
+            The ascending positions of the nodes whose lines include the
+            line.
+        """
+        positions = list()
+        tree_index = 0 if self.__tree else -1
+        while tree_index != -1:
+            center, left, right, by_start, by_end = self.__tree[tree_index]
+            if line < center:
+                for start, _, position in by_start:
+                    if start > line:
+                        break
+                    positions.append(position)
+                tree_index = left
+            elif center < line:
+                for _, end, position in by_end:
+                    if end < line:
+                        break
+                    positions.append(position)
+                tree_index = right
+            else:
+                positions.extend(position for _, _, position in by_start)
+                break
+        positions.sort()
+        return positions
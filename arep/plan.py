@@ -0,0 +1,858 @@
+from arep.constraints import (
+    Constraint_expression, node_types, STRUCTURAL_RELATIONS
+)
+from arep.structure import Structural_relation
+from arep.Validators.forms import CompiledValidatorForm
+from arep import Validators
+from collections import namedtuple
+
+"""
+Compilation of constraints into query plans.
+
+A query plan is everything about a list of constraints that doesn't depend on
+the program being searched. It's derived once and can be reused for all of
+the nodes of all of the files.
+"""
+
+Validator_specification = namedtuple(
+    "Validator_specification", "address kwargs"
+)
+
+Query_plan = namedtuple("Query_plan", "predicates node_types knowledge_keys")
+
+Expression_specification = namedtuple(
+    "Expression_specification", "operator operands"
+)
+
+Positional_window = namedtuple(
+    "Positional_window",
+    "line_minimum line_maximum column_minimum column_maximum"
+)
+
+_POSITIONAL_AXES = {
+    ('Properties', 'Positional', 'Line_Numbers'): 'line',
+    ('Properties', 'Positional', 'Column_Numbers'): 'column',
+}
+
+_STRUCTURAL_ADDRESS = ('Properties', 'Structural')
+
+
+def _Method_Costs():
+    # Rough relative costs of the validator methods. Anything not listed is a
+    # type check or an attribute comparison and costs 1.
+    return {
+        'Action.Instantiation.basic': 3,
+        'Action.Looping.basic': 2,
+        'Action.Looping.for_': 2,
+        'Action.Looping.for_else': 2,
+        # Looks up the subtree summaries.
+        'Action.Looping.with_break': 2,
+        # Evaluates the test of the loop.
+        'Action.Looping.with_simple_non_terminating_test': 10,
+        'Action.Conditional.basic': 3,
+        'Action.Conditional.elif_': 2,
+        'Action.Conditional.else_': 2,
+        'Action.Trying.Except.type_': 3,
+        'Action.Trying.Except.as_': 3,
+        'Action.Raising.Error.message': 2,
+        'Action.Raising.Cause.name': 4,
+        'Kind.Variables.basic': 3,
+        'Kind.Variables.is_attribute': 5,
+        'Kind.Variables.is_argument': 5,
+        'Kind.Variables.name': 10,
+        'Kind.STD_Types.basic': 4,
+        'Kind.STD_Types.type_': 5,
+        'Kind.Functions.basic': 5,
+        'Kind.Functions.is_builtin': 15,
+        'Kind.Functions.name': 20,
+        'Kind.Functions.Lambda.basic': 2,
+        'Kind.Functions.Lambda.immediately_called': 3,
+        'Kind.Functions.Decorators.basic': 2,
+        'Kind.Functions.Decorators.name': 8,
+        'Kind.Functions.Parameters.basic': 20,
+        'Kind.Functions.Parameters.with_default_values': 25,
+        'Kind.Functions.Parameters.Arguments.basic': 12,
+        'Kind.Functions.Parameters.Arguments.is_variadic': 15,
+        'Kind.Functions.Parameters.Keywords.basic': 12,
+        'Kind.Functions.Parameters.Keywords.is_variadic': 15,
+        'Kind.Classes.basic': 2,
+        'Kind.Classes.name': 4,
+        'Kind.Comprehensions.basic': 2,
+        'Kind.Operations.symbol': 8,
+        # Look up the join of the tree with the nodes of their constraints.
+        'Properties.Structural.inside': 3,
+        'Properties.Structural.contains': 3,
+        'Properties.Structural.direct_child_of': 3,
+    }
+
+
+def validator_specs_deriver(constraint_list):
+    """
+    Flattens every constraint into the addresses of its active validators
+    and the keyword arguments they should receive.
+
+    Parameters
+    ----------
+    constraint_list : [Action or Kind or Properties or Constraint_expression]
+
+    Returns
+    -------
+    [[Validator_specification] or Expression_specification]
+        One list per constraint in `constraint_list`. An expression becomes
+        an `Expression_specification` whose operands are either tuples of
+        `Validator_specification`, for constraints, or other expressions.
+        The constraints of a structural relation become a tuple of their
+        own specifications, the same as what's returned for them.
+    """
+
+    def structural_specs(value):
+        constraints = value if isinstance(value, (list, tuple)) else [value]
+        return tuple(validator_specs_deriver(list(constraints)))
+
+    def validator_tracker(cls):
+        results = list()
+        parents = list(cls._address)
+
+        def wrapped(cls, parents):
+            keywords = dict()
+            for key in cls.view_actives():
+                value = getattr(cls, key)
+                if key not in cls._class_vars:
+                    wrapped(value, parents + [key])
+                elif (
+                        tuple(parents) == _STRUCTURAL_ADDRESS and
+                        key in STRUCTURAL_RELATIONS
+                ):
+                    keywords[key] = structural_specs(value)
+                else:
+                    keywords[key] = value
+            if bool(keywords):
+                results.append(Validator_specification(parents, keywords))
+
+        wrapped(cls, parents)
+        return results
+
+    def expression_tracker(operand):
+        if isinstance(operand, Constraint_expression):
+            return Expression_specification(operand.operator, tuple(
+                expression_tracker(sub_operand)
+                for sub_operand in operand.operands
+            ))
+        return tuple(validator_tracker(operand))
+
+    return [
+        expression_tracker(constraint)
+        if isinstance(constraint, Constraint_expression)
+        else validator_tracker(constraint)
+        for constraint in constraint_list
+    ]
+
+
+def _leaf_specs(constraint_specs):
+    """
+    Yields
+    ------
+    Validator_specification
+        All of those of a constraint or of an expression.
+    """
+    if isinstance(constraint_specs, Expression_specification):
+        for operand in constraint_specs.operands:
+            for specs in _leaf_specs(operand):
+                yield specs
+    else:
+        for specs in constraint_specs:
+            yield specs
+
+
+def expression_node_types(expression):
+    """
+    Parameters
+    ----------
+    expression : Expression_specification or (Validator_specification)
+
+    Returns
+    -------
+    {type}  the only node types that may satisfy the expression.
+    None    if the expression doesn't restrict the node types.
+    """
+    if not isinstance(expression, Expression_specification):
+        return candidate_node_types([expression])
+    if expression.operator == 'not':
+        return None
+    operand_types = [
+        expression_node_types(operand) for operand in expression.operands
+    ]
+    if expression.operator == 'or':
+        if any(types is None for types in operand_types):
+            return None
+        return set().union(*operand_types)
+    restricted_types = [
+        types for types in operand_types if types is not None
+    ]
+    if not restricted_types:
+        return None
+    return set.intersection(*[set(types) for types in restricted_types])
+
+
+def validator_class(address):
+    """
+    Parameters
+    ----------
+    address : [str]
+        e.g. ['Action', 'Raising', 'Error']
+
+    Returns
+    -------
+    The class in `arep.Validators` that validates the constraint.
+    """
+    result = getattr(Validators, address[0])
+    for address_index in range(1, len(address)):
+        result = getattr(result, address[address_index])
+    return result
+
+
+def predicate_cost(specs):
+    """
+    Estimates the relative cost of evaluating a validator on a node by adding
+    up the costs of `basic` and of every method that it'd be calling.
+
+    Parameters
+    ----------
+    specs : Validator_specification
+
+    Returns
+    -------
+    int
+    """
+    method_costs = _Method_Costs()
+    return sum(
+        method_costs.get('.'.join(specs.address + [method]), 1)
+        for method in ['basic'] + [
+            kwarg for kwarg in specs.kwargs
+            if kwarg not in {'node', 'consideration', 'knowledge'}
+        ]
+    )
+
+
+def compile_predicate(specs):
+    """
+    Parameters
+    ----------
+    specs : Validator_specification
+
+    Returns
+    -------
+    (node, knowledge) -> {True, False}
+        Carries its `specs` and its estimated `cost` as attributes.
+    """
+    kwargs = specs.kwargs
+    if tuple(specs.address) == _STRUCTURAL_ADDRESS:
+        kwargs = dict(kwargs)
+        for relation in set(STRUCTURAL_RELATIONS) & set(kwargs):
+            kwargs[relation] = compile_relation(relation, kwargs[relation])
+    predicate = CompiledValidatorForm(
+        validator_class(specs.address), **kwargs
+    )
+    predicate.specs = specs
+    predicate.cost = predicate_cost(specs)
+    return predicate
+
+
+def compile_relation(relation, validator_specs):
+    """
+    Parameters
+    ----------
+    relation : str
+        One of `STRUCTURAL_RELATIONS`.
+    validator_specs : ([Validator_specification] or Expression_specification)
+        The specifications of the constraints of the relation.
+
+    Returns
+    -------
+    Structural_relation
+    """
+    plan = plan_from_specs(list(validator_specs))
+    return Structural_relation(
+        relation, _hashable(validator_specs), evaluator(plan.predicates),
+        plan.node_types
+    )
+
+
+def evaluation_rank(predicate):
+    """
+    Filters should be tried in the ascending order of the expected cost of
+    evaluating them per each node that they reject. Before anything has been
+    observed, a considered constraint is assumed to reject most of the nodes
+    as it's anchored to a specific kind of node.
+
+    Returns
+    -------
+    float
+    """
+    rejection_estimate = (
+        0.9 if predicate.specs.kwargs.get('consideration') else 0.5
+    )
+    return predicate.cost / rejection_estimate
+
+
+def candidate_node_types(validator_specs):
+    """
+    Since all of the constraints are "AND"ed, a node can only satisfy them
+    if its type is allowed by every considered constraint.
+
+    Parameters
+    ----------
+    validator_specs : [[Validator_specification]]
+
+    Returns
+    -------
+    {type}  the only node types that may satisfy the constraints.
+    None    if the constraints don't restrict the node types.
+    """
+    candidate_types = None
+    for constraint_specs in validator_specs:
+        if isinstance(constraint_specs, Expression_specification):
+            expression_types = expression_node_types(constraint_specs)
+            if expression_types is None:
+                continue
+            if candidate_types is None:
+                candidate_types = set(expression_types)
+            else:
+                candidate_types &= expression_types
+            continue
+        for specs in constraint_specs:
+            if not specs.kwargs.get('consideration'):
+                continue
+            anchored_types = node_types(specs.address, [
+                option for option, value in specs.kwargs.items()
+                if value is not None
+            ])
+            if anchored_types is None:
+                continue
+            if candidate_types is None:
+                candidate_types = set(anchored_types)
+            else:
+                candidate_types &= anchored_types
+    return candidate_types
+
+
+def required_knowledge(validator_specs):
+    """
+    Parameters
+    ----------
+    validator_specs : [[Validator_specification]]
+
+    Returns
+    -------
+    {str}
+        The per-file knowledge keys that the validators read, including
+        those of the constraints of the structural relations.
+    """
+    keys = set()
+    for constraint_specs in validator_specs:
+        for specs in _leaf_specs(constraint_specs):
+            keys |= getattr(validator_class(specs.address), '_knowledge_keys',
+                            set([]))
+            if tuple(specs.address) == _STRUCTURAL_ADDRESS:
+                for relation in set(STRUCTURAL_RELATIONS) & set(specs.kwargs):
+                    keys |= required_knowledge(specs.kwargs[relation])
+    return frozenset(keys)
+
+
+def compile_plan(constraint_list):
+    """
+    Parameters
+    ----------
+    constraint_list : [Action or Kind or Properties]
+
+    Returns
+    -------
+    Query_plan
+        `predicates` is a flat list of (node, knowledge) -> {True, False}
+        which all need to hold for a node to be a result, sorted by their
+        `evaluation_rank`. The positional ranges are merged into a single
+        predicate of their `positional_window`. `node_types` is the same as
+        `candidate_node_types` and `knowledge_keys` is the same as
+        `required_knowledge`.
+    """
+    return plan_from_specs(validator_specs_deriver(constraint_list))
+
+
+def _positional_limits(specs):
+    """
+    Returns
+    -------
+    (str, int or None, int or None) or None
+        The axis, the minimum and the maximum of a considered positional
+        constraint whose limits are integers, if it is one. Anything else,
+        e.g. a negated one, is left to its validator.
+    """
+    axis = _POSITIONAL_AXES.get(tuple(specs.address))
+    kwargs = specs.kwargs
+    if (
+            axis is None or kwargs.get('consideration') is not True or
+            not set(kwargs) <= {'consideration', 'minimum', 'maximum'}
+    ):
+        return None
+    limits = (kwargs.get('minimum'), kwargs.get('maximum'))
+    if not all(limit is None or type(limit) is int for limit in limits):
+        return None
+    return (axis,) + limits
+
+
+def positional_window(validator_specs):
+    """
+    Merges all of the positional constraints that are only integer ranges,
+    which are "AND"ed, into one window.
+
+    Parameters
+    ----------
+    validator_specs : [Validator_specification]
+
+    Returns
+    -------
+    (Positional_window or None, [Validator_specification],
+     [Validator_specification])
+        The window, if any of the constraints has a limit, the
+        specifications that it's made of and those that aren't part of it.
+        A window whose minimum is larger than its maximum contains nothing.
+    """
+    limits = {'line': [None, None], 'column': [None, None]}
+    merged, others = list(), list()
+    for specs in validator_specs:
+        positional = _positional_limits(specs)
+        if positional is None:
+            others.append(specs)
+            continue
+        merged.append(specs)
+        axis, minimum, maximum = positional
+        if minimum is not None:
+            limits[axis][0] = (minimum if limits[axis][0] is None
+                               else max(minimum, limits[axis][0]))
+        if maximum is not None:
+            limits[axis][1] = (maximum if limits[axis][1] is None
+                               else min(maximum, limits[axis][1]))
+    window = Positional_window(*(limits['line'] + limits['column']))
+    if all(limit is None for limit in window):
+        window = None
+    return window, merged, others
+
+
+def compile_window(window, specs):
+    """
+    Parameters
+    ----------
+    window : Positional_window
+    specs : Validator_specification
+        What the predicate is reported as.
+
+    Returns
+    -------
+    (node, knowledge) -> {True, False}
+        Whether the node is within the window, in one comparison per limit.
+        Carries its `window`, `specs` and `cost` as attributes.
+    """
+    checks = [
+        (attribute, minimum, maximum)
+        for attribute, minimum, maximum in [
+            ('lineno', window.line_minimum, window.line_maximum),
+            ('col_offset', window.column_minimum, window.column_maximum),
+        ]
+        if (minimum, maximum) != (None, None)
+    ]
+
+    def predicate(node, knowledge):
+        for attribute, minimum, maximum in checks:
+            try:
+                value = getattr(node, attribute)
+            except AttributeError:
+                return False
+            if (
+                    (minimum is not None and value < minimum) or
+                    (maximum is not None and maximum < value)
+            ):
+                return False
+        return True
+
+    predicate.window = window
+    predicate.specs = specs
+    predicate.cost = 1
+    return predicate
+
+
+def plan_window(plan):
+    """
+    Returns
+    -------
+    Positional_window or None
+        The positional window of the plan, if it has one.
+    """
+    for predicate in plan.predicates:
+        window = getattr(predicate, 'window', None)
+        if window is not None:
+            return window
+    return None
+
+
+def _hashable(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def specs_key(specs):
+    """
+    Parameters
+    ----------
+    specs : Validator_specification
+
+    Returns
+    -------
+    tuple
+        Equal for the specifications of the same validator with the same
+        arguments, so their predicates are interchangeable.
+    """
+    return (tuple(specs.address), frozenset(
+        (key, _hashable(value)) for key, value in specs.kwargs.items()
+    ))
+
+
+def plan_from_specs(validator_specs, compiled_predicates=None):
+    """
+    Same as `compile_plan`, but from the output of `validator_specs_deriver`.
+    Unlike the constraints and the plans, the specifications can be pickled,
+    so they're what should be sent to other processes.
+
+    Parameters
+    ----------
+    validator_specs : [[Validator_specification]]
+    compiled_predicates : {tuple: (node, knowledge) -> {True, False}}
+        Default is `None`. If given, the predicates are looked up in it by
+        their `specs_key` and the new ones are added to it, so plans that
+        share it share their predicates as well.
+
+    Returns
+    -------
+    Query_plan
+    """
+    if compiled_predicates is None:
+        compiled_predicates = dict()
+    if any(
+            isinstance(constraint_specs, Expression_specification)
+            for constraint_specs in validator_specs
+    ):
+        return Query_plan(
+            predicates=[compile_expression(
+                Expression_specification('and', tuple(
+                    constraint_specs
+                    if isinstance(constraint_specs, Expression_specification)
+                    else tuple(constraint_specs)
+                    for constraint_specs in validator_specs
+                )),
+                compiled_predicates
+            )],
+            node_types=candidate_node_types(validator_specs),
+            knowledge_keys=required_knowledge(validator_specs),
+        )
+
+    def compiled(specs):
+        key = specs_key(specs)
+        if key not in compiled_predicates:
+            compiled_predicates[key] = compile_predicate(specs)
+        return compiled_predicates[key]
+
+    # The positional ranges are checked together, in a single predicate.
+    window, merged, others = positional_window([
+        specs
+        for constraint_specs in validator_specs
+        for specs in constraint_specs
+    ])
+    predicates = [compiled(specs) for specs in others]
+    if window is not None:
+        window_specs = (
+            merged[0] if len(merged) == 1 else Validator_specification(
+                ['Properties', 'Positional'], {
+                    key: value
+                    for key, value in window._asdict().items()
+                    if value is not None
+                }
+            )
+        )
+        key = ('window', window)
+        if key not in compiled_predicates:
+            compiled_predicates[key] = compile_window(window, window_specs)
+        predicates.append(compiled_predicates[key])
+
+    return Query_plan(
+        predicates=sorted(dict.fromkeys(predicates), key=evaluation_rank),
+        node_types=candidate_node_types(validator_specs),
+        knowledge_keys=required_knowledge(validator_specs),
+    )
+
+
+def _expression_dag(expression):
+    """
+    Turns an expression into a DAG where equal sub-expressions are the same
+    node. `&` and `|` are flattened and their operands are a set, so the
+    order and the repetition of the operands don't matter, and `~~a` is `a`.
+
+    Returns
+    -------
+    (tuple, {tuple: (str, [tuple] or Validator_specification)})
+        The key of the root and the operator and the operands of every node
+        by its key. Each validator is a `predicate` node.
+    """
+    dag = dict()
+
+    def build(operand):
+        if isinstance(operand, Validator_specification):
+            key = ('predicate', specs_key(operand))
+            dag[key] = ('predicate', operand)
+            return key
+        if isinstance(operand, Expression_specification):
+            operator, operands = operand
+        else:
+            # A constraint holds if all of its validators do.
+            operator, operands = 'and', operand
+        operand_keys = [build(sub_operand) for sub_operand in operands]
+        if operator == 'not':
+            operand_key = operand_keys[0]
+            if operand_key[0] == 'not':
+                return operand_key[1]
+            key = ('not', operand_key)
+            dag[key] = ('not', [operand_key])
+            return key
+        flattened = set()
+        for operand_key in operand_keys:
+            if operand_key[0] == operator:
+                flattened |= operand_key[1]
+            else:
+                flattened.add(operand_key)
+        if len(flattened) == 1:
+            return flattened.pop()
+        key = (operator, frozenset(flattened))
+        dag[key] = (operator, list(flattened))
+        return key
+
+    root_key = build(expression)
+    # Dropping what's left of the simplified away nodes e.g. `~a` of `~~a`.
+    reachable = {root_key: dag[root_key]}
+    to_be_processed = [root_key]
+    while to_be_processed:
+        operator, operands = dag[to_be_processed.pop()]
+        if operator != 'predicate':
+            for operand_key in operands:
+                if operand_key not in reachable:
+                    reachable[operand_key] = dag[operand_key]
+                    to_be_processed.append(operand_key)
+    return root_key, reachable
+
+
+def compile_expression(expression, compiled_predicates=None):
+    """
+    Compiles an expression into a single predicate. Its DAG is evaluated
+    with short-circuits, trying the cheaper operands first, and the outcome
+    of every node that's shared between several others is remembered per
+    AST node. So every validator is evaluated at most once per AST node.
+
+    Parameters
+    ----------
+    expression : Expression_specification
+    compiled_predicates : {tuple: (node, knowledge) -> {True, False}}
+        Default is `None`. Same as in `plan_from_specs`.
+
+    Returns
+    -------
+    (node, knowledge) -> {True, False}
+        Carries its `expression` and its estimated `cost` as attributes.
+    """
+    if compiled_predicates is None:
+        compiled_predicates = dict()
+    root_key, dag = _expression_dag(expression)
+    references = {key: 0 for key in dag}
+    for operator, operands in dag.values():
+        if operator != 'predicate':
+            for operand_key in operands:
+                references[operand_key] += 1
+    evaluators = dict()
+    costs = dict()
+
+    def evaluator_of(key):
+        if key in evaluators:
+            return evaluators[key]
+        operator, operands = dag[key]
+        if operator == 'predicate':
+            predicate_key = specs_key(operands)
+            if predicate_key not in compiled_predicates:
+                compiled_predicates[predicate_key] = compile_predicate(
+                    operands
+                )
+            predicate = compiled_predicates[predicate_key]
+            costs[key] = predicate.cost
+
+            def evaluate(node, knowledge, outcomes):
+                return predicate(node, knowledge)
+        else:
+            for operand_key in operands:
+                evaluator_of(operand_key)
+            operand_evaluators = [
+                evaluators[operand_key]
+                for operand_key in sorted(operands, key=costs.__getitem__)
+            ]
+            costs[key] = sum(costs[operand_key] for operand_key in operands)
+            if operator == 'not':
+                operand_evaluator = operand_evaluators[0]
+
+                def evaluate(node, knowledge, outcomes):
+                    return not operand_evaluator(node, knowledge, outcomes)
+            elif operator == 'and':
+                def evaluate(node, knowledge, outcomes):
+                    for operand_evaluator in operand_evaluators:
+                        if not operand_evaluator(node, knowledge, outcomes):
+                            return False
+                    return True
+            else:
+                def evaluate(node, knowledge, outcomes):
+                    for operand_evaluator in operand_evaluators:
+                        if operand_evaluator(node, knowledge, outcomes):
+                            return True
+                    return False
+        if references.get(key, 0) > 1:
+            evaluate = _remembered(evaluate)
+        evaluators[key] = evaluate
+        return evaluate
+
+    root = evaluator_of(root_key)
+
+    def predicate(node, knowledge):
+        return bool(root(node, knowledge, dict()))
+
+    predicate.expression = expression
+    predicate.cost = costs[root_key]
+    return predicate
+
+
+def _remembered(evaluate):
+    def remembered(node, knowledge, outcomes):
+        if remembered not in outcomes:
+            outcomes[remembered] = evaluate(node, knowledge, outcomes)
+        return outcomes[remembered]
+    return remembered
+
+
+def compile_plans(constraint_lists):
+    """
+    Compiles independent lists of constraints so that a predicate which is
+    needed by several of them is the same object in all of their plans.
+
+    Parameters
+    ----------
+    constraint_lists : [[Action or Kind or Properties]]
+
+    Returns
+    -------
+    [Query_plan]
+    """
+    compiled_predicates = dict()
+    return [
+        plan_from_specs(validator_specs_deriver(constraint_list),
+                        compiled_predicates)
+        for constraint_list in constraint_lists
+    ]
+
+
+def shared_evaluator(plans):
+    """
+    Parameters
+    ----------
+    plans : [Query_plan]
+
+    Returns
+    -------
+    (node, knowledge, [int]) -> [int]
+        Which of the given plans the node satisfies. Each predicate is
+        evaluated at most once per node, however many of the plans need it.
+    """
+    predicate_lists = [tuple(plan.predicates) for plan in plans]
+
+    def evaluate(node, knowledge, plan_ids):
+        outcomes = dict()
+        satisfied = list()
+        for plan_id in plan_ids:
+            for predicate in predicate_lists[plan_id]:
+                if predicate not in outcomes:
+                    outcomes[predicate] = bool(predicate(node, knowledge))
+                if not outcomes[predicate]:
+                    break
+            else:
+                satisfied.append(plan_id)
+        return satisfied
+
+    return evaluate
+
+
+def evaluator(predicates):
+    """
+    Parameters
+    ----------
+    predicates : [(node, knowledge) -> {True, False}]
+
+    Returns
+    -------
+    (node, knowledge) -> {True, False}
+        Whether all of the predicates hold. It stops at the first predicate
+        that doesn't.
+    """
+    predicates = tuple(predicates)
+
+    def evaluate(node, knowledge):
+        for predicate in predicates:
+            if not predicate(node, knowledge):
+                return False
+        return True
+
+    return evaluate
+
+
+def adaptive_evaluator(predicates, reordering_period=256):
+    """
+    Same as `evaluator`, except that it keeps count of how often each
+    predicate rejects a node and every `reordering_period` nodes, it sorts
+    the predicates by their cost per observed rejection.
+
+    Parameters
+    ----------
+    predicates : [(node, knowledge) -> {True, False}]
+        Each with a `cost` attribute.
+    reordering_period : int
+        Default is 256
+
+    Returns
+    -------
+    (node, knowledge) -> {True, False}
+    """
+    order = list(predicates)
+    evaluations = {predicate: 0 for predicate in order}
+    rejections = {predicate: 0 for predicate in order}
+    nodes_seen = [0]
+
+    def cost_per_rejection(predicate):
+        # Laplace smoothing so that a predicate that hasn't rejected anything
+        # yet still gets a finite rank.
+        return (predicate.cost * (evaluations[predicate] + 1) /
+                (rejections[predicate] + 1))
+
+    def evaluate(node, knowledge):
+        nodes_seen[0] += 1
+        if nodes_seen[0] % reordering_period == 0:
+            order.sort(key=cost_per_rejection)
+        for predicate in order:
+            evaluations[predicate] += 1
+            if not predicate(node, knowledge):
+                rejections[predicate] += 1
+                return False
+        return True
+
+    return evaluate
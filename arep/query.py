@@ -0,0 +1,203 @@
+from arep.constraints import (
+    Action, Kind, Properties, STRUCTURAL_RELATIONS
+)
+import builtins
+import json
+import os
+
+"""
+Queries written as data, e.g. in JSON or YAML, instead of as constraints.
+
+A query is a mapping from the constraint categories to their specifications,
+nested the same way as the constraints are e.g.
+
+    {"Action": {"Import": {"name": "os"}},
+     "Properties": {"Positional": {"Line_Numbers": {"minimum": 10}}}}
+
+An empty specification only considers its constraint e.g.
+`{"Kind": {"Functions": {}}}` is any function. Types, such as `type_` of
+`Action.Raising.Error`, are written by their names.
+
+All of the categories of a query are "AND"ed. A query can also be a list of
+queries, which are "AND"ed as well, or `{"and": [...]}`, `{"or": [...]}` and
+`{"not": query}` which combine their queries like `&`, `|` and `~` do.
+
+The structural relations of `Properties.Structural` are queries themselves
+e.g. `{"Properties": {"Structural": {"inside": {"Action": {"Looping": {}}}}}}`.
+"""
+
+_CATEGORIES = {'Action': Action, 'Kind': Kind, 'Properties': Properties}
+
+_OPERATORS = {'and', 'or', 'not'}
+
+
+class QueryError(ValueError):
+    """
+    Raised when a query doesn't describe any constraints.
+    """
+
+
+def _specification_value(key, value):
+    # Types can't be written as data, so they're written by their names.
+    # Those that aren't builtins only need to have the same name.
+    if key == 'type_' and isinstance(value, str):
+        builtin = getattr(builtins, value, None)
+        if isinstance(builtin, type):
+            return builtin
+        return type(value, (Exception,), dict())
+    return value
+
+
+def _specify(constraint, specifications, address):
+    if not isinstance(specifications, dict):
+        raise QueryError("{} should be a mapping of its specifications".format(
+            '.'.join(address)
+        ))
+    for key, value in specifications.items():
+        try:
+            if address == ['Properties', 'Structural'] and (
+                    key in STRUCTURAL_RELATIONS
+            ):
+                setattr(constraint, key, _constraint_terms(value))
+            elif value == {}:
+                # e.g. `{"Kind": {"Functions": {}}}` is just any function.
+                getattr(constraint, key).consideration = True
+            elif isinstance(value, dict):
+                _specify(getattr(constraint, key), value, address + [key])
+            else:
+                setattr(constraint, key, _specification_value(key, value))
+        except (AttributeError, KeyError, TypeError) as error:
+            raise QueryError("{} isn't a specification: {}".format(
+                '.'.join(address + [key]), error
+            ))
+
+
+def _constraint_terms(query):
+    """
+    Returns
+    -------
+    [Action or Kind or Properties or Constraint_expression]
+        Which should all hold.
+    """
+    if isinstance(query, list):
+        terms = [term for sub_query in query
+                 for term in _constraint_terms(sub_query)]
+        if not terms:
+            raise QueryError("A list of queries shouldn't be empty")
+        return terms
+    if not isinstance(query, dict) or not query:
+        raise QueryError("A query should be a non-empty mapping or a list")
+    operators = _OPERATORS & set(query)
+    if operators:
+        if len(query) != 1:
+            raise QueryError(
+                "{} can't be next to anything else".format(operators.pop())
+            )
+        operator, operand = next(iter(query.items()))
+        if operator == 'not':
+            return [~_combined(_constraint_terms(operand))]
+        if not isinstance(operand, list) or not operand:
+            raise QueryError("{} needs a list of queries".format(operator))
+        combined = [_combined(_constraint_terms(sub_query))
+                    for sub_query in operand]
+        result = combined[0]
+        for term in combined[1:]:
+            result = (result & term) if operator == 'and' else (result | term)
+        return [result]
+    terms = list()
+    for category, specifications in query.items():
+        if category not in _CATEGORIES:
+            raise QueryError("Unknown category {}, expected one of {}".format(
+                category, ', '.join(sorted(_CATEGORIES) + sorted(_OPERATORS))
+            ))
+        constraint = _CATEGORIES[category]()
+        _specify(constraint, specifications, [category])
+        terms.append(constraint)
+    return terms
+
+
+def _combined(terms):
+    result = terms[0]
+    for term in terms[1:]:
+        result = result & term
+    return result
+
+
+def constraints_from_query(query):
+    """
+    Parameters
+    ----------
+    query : dict or list
+        e.g. the parsed JSON or YAML of a query.
+
+    Returns
+    -------
+    [Action or Kind or Properties or Constraint_expression]
+        A `constraint_list` that searches for the query.
+
+    Raises
+    ------
+    QueryError
+    """
+    return _constraint_terms(query)
+
+
+def parse_query(text, yaml=None):
+    """
+    Parameters
+    ----------
+    text : str
+        A query in JSON or YAML.
+    yaml : bool
+        Default is `None` which tries JSON first and YAML next. YAML needs
+        the optional `PyYAML` package.
+
+    Returns
+    -------
+    dict or list
+
+    Raises
+    ------
+    QueryError
+    """
+    if not yaml:
+        try:
+            return json.loads(text)
+        except ValueError as error:
+            if yaml is False:
+                raise QueryError("Invalid JSON query: {}".format(error))
+    try:
+        import yaml as pyyaml
+    except ImportError:
+        raise QueryError("YAML queries need PyYAML to be installed")
+    try:
+        return pyyaml.safe_load(text)
+    except pyyaml.YAMLError as error:
+        raise QueryError("Invalid query: {}".format(error))
+
+
+def load_query(source):
+    """
+    Parameters
+    ----------
+    source : str
+        Path to a `.json`, `.yaml` or `.yml` file, or the query itself.
+
+    Returns
+    -------
+    [Action or Kind or Properties or Constraint_expression]
+
+    Raises
+    ------
+    QueryError
+    """
+    if os.path.isfile(source):
+        extension = os.path.splitext(source)[1].lower()
+        with open(source, 'r') as f:
+            text = f.read()
+        yaml = (True if extension in {'.yaml', '.yml'}
+                else False if extension == '.json'
+                else None)
+    else:
+        text, yaml = source, None
+    return constraints_from_query(parse_query(text, yaml=yaml))
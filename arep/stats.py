@@ -0,0 +1,236 @@
+from arep.plan import compile_expression
+from time import perf_counter
+
+"""
+Opt-in profiling counters of a search.
+
+The predicates of a plan are wrapped to count how often each validator is
+called, how often it accepts or rejects a node and how long it takes. A
+search that isn't profiled uses the plan as it is, so it doesn't pay for any
+of it.
+"""
+
+
+def _rendered(value):
+    if isinstance(value, type):
+        return value.__name__
+    return repr(value)
+
+
+def specification_label(specs):
+    """
+    Parameters
+    ----------
+    specs : Validator_specification
+
+    Returns
+    -------
+    (str, str)
+        The address of the validator and its arguments e.g.
+        `('Action.Import', "consideration=True, name='os'")`.
+    """
+    return '.'.join(specs.address), ', '.join(
+        '{}={}'.format(key, _rendered(value))
+        for key, value in sorted(specs.kwargs.items())
+    )
+
+
+class _Instrumenting_predicates(dict):
+    """
+    A `compiled_predicates` table of `plan_from_specs` and
+    `compile_expression` that instruments every predicate that's put in it.
+    """
+    def __init__(self, stats):
+        dict.__init__(self)
+        self.stats = stats
+
+    def __setitem__(self, key, predicate):
+        dict.__setitem__(self, key, self.stats.instrumented(predicate))
+
+
+class Search_stats(object):
+    """
+    Attributes
+    ----------
+    nodes_visited : int
+        The nodes that were checked against the constraints.
+    results : int
+        The results that were yielded.
+
+    Methods
+    -------
+    instrumented(predicate)
+    instrumented_plans(plans)
+    counted_nodes(nodes)
+    as_dict()
+    reset()
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Sets all of the counters to zero.
+        """
+        self.nodes_visited = 0
+        self.results = 0
+        # [accepts, rejects, seconds] of every validator by its label.
+        self.__validators = dict()
+
+    def instrumented(self, predicate):
+        """
+        Parameters
+        ----------
+        predicate : (node, knowledge) -> {True, False}
+            A compiled validator with its `specs` and `cost`.
+
+        Returns
+        -------
+        (node, knowledge) -> {True, False}
+            The same predicate, counting its calls into the stats.
+        """
+        counters = self.__validators.setdefault(
+            specification_label(predicate.specs), [0, 0, 0.0]
+        )
+
+        def counted(node, knowledge):
+            start = perf_counter()
+            outcome = predicate(node, knowledge)
+            counters[2] += perf_counter() - start
+            counters[0 if outcome else 1] += 1
+            return outcome
+
+        counted.specs = predicate.specs
+        counted.cost = predicate.cost
+        if hasattr(predicate, 'window'):
+            counted.window = predicate.window
+        return counted
+
+    def instrumented_plans(self, plans):
+        """
+        Parameters
+        ----------
+        plans : [Query_plan]
+
+        Returns
+        -------
+        [Query_plan]
+            The same plans with instrumented predicates. A predicate that's
+            shared between the plans stays shared. The validators of an
+            expression are instrumented one by one, rather than the
+            expression as a whole.
+        """
+        instrumented = dict()
+        instrumenting_predicates = _Instrumenting_predicates(self)
+
+        def instrumented_predicate(predicate):
+            if predicate not in instrumented:
+                if hasattr(predicate, 'expression'):
+                    instrumented[predicate] = compile_expression(
+                        predicate.expression, instrumenting_predicates
+                    )
+                else:
+                    instrumented[predicate] = self.instrumented(predicate)
+            return instrumented[predicate]
+
+        return [
+            plan._replace(predicates=[
+                instrumented_predicate(predicate)
+                for predicate in plan.predicates
+            ])
+            for plan in plans
+        ]
+
+    def counted_nodes(self, nodes):
+        """
+        Yields
+        ------
+        ast
+            The nodes, counting them as they're visited.
+        """
+        for node in nodes:
+            self.nodes_visited += 1
+            yield node
+
+    def as_dict(self):
+        """
+        Returns
+        -------
+        dict
+            `nodes_visited`, `results` and `validators`, which lists the
+            `calls`, `accepts`, `rejects` and cumulative `seconds` of every
+            validator with its `specification_label`, in the order that they
+            were first used.
+        """
+        return {
+            'nodes_visited': self.nodes_visited,
+            'results': self.results,
+            'validators': [
+                {
+                    'validator': validator,
+                    'specification': specification,
+                    'calls': accepts + rejects,
+                    'accepts': accepts,
+                    'rejects': rejects,
+                    'seconds': seconds,
+                }
+                for (validator, specification), (accepts, rejects, seconds)
+                in self.__validators.items()
+            ],
+        }
+
+
+_PROMETHEUS_COUNTERS = [
+    ('nodes_visited', "Nodes that were checked against the constraints."),
+    ('results', "Results that were yielded."),
+]
+
+_PROMETHEUS_VALIDATOR_COUNTERS = [
+    ('calls', "Calls of the validator."),
+    ('accepts', "Nodes that the validator accepted."),
+    ('rejects', "Nodes that the validator rejected."),
+    ('seconds', "Time spent in the validator."),
+]
+
+
+def _label_value(value):
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def to_prometheus(stats, prefix='arep'):
+    """
+    Parameters
+    ----------
+    stats : dict
+        What `Search_stats.as_dict` or `Grepper.stats` returns.
+    prefix : str
+        Default is `arep`
+
+    Returns
+    -------
+    str
+        The counters in the Prometheus text exposition format.
+    """
+    lines = list()
+    for key, description in _PROMETHEUS_COUNTERS:
+        name = '{}_{}_total'.format(prefix, key)
+        lines.extend([
+            '# HELP {} {}'.format(name, description),
+            '# TYPE {} counter'.format(name),
+            '{} {}'.format(name, stats[key]),
+        ])
+    for key, description in _PROMETHEUS_VALIDATOR_COUNTERS:
+        name = '{}_validator_{}_total'.format(prefix, key)
+        lines.extend([
+            '# HELP {} {}'.format(name, description),
+            '# TYPE {} counter'.format(name),
+        ])
+        for validator in stats['validators']:
+            lines.append('{}{{validator="{}",specification="{}"}} {}'.format(
+                name, _label_value(validator['validator']),
+                _label_value(validator['specification']),
+                repr(float(validator[key])) if key == 'seconds'
+                else validator[key]
+            ))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,164 @@
+from arep.utils import parent
+from array import array
+from itertools import accumulate
+from operator import itemgetter
+
+"""
+The structural relations between the nodes of a tree, i.e. whether a node is
+inside, contains or is a direct child of the nodes that satisfy some other
+constraints.
+
+The relations are decided by the Euler tour numbers of the nodes. The
+descendants of a node are those whose `pre` is between its `pre` and its
+`post`, so all of the nodes that satisfy the other constraints are joined
+with the whole tree at once, as intervals over the `pre` numbers. After that,
+whether a node is in a relation takes a lookup or two.
+"""
+
+
+def _number_count(tours):
+    # Shared nodes are numbered before they're left out, so the numbers may
+    # go beyond twice the nodes.
+    return max(map(itemgetter(1), tours.values()), default=-1) + 1
+
+
+def _matching_nodes(tours, satisfies, node_types, knowledge):
+    return [
+        node for node in tours
+        if (node_types is None or type(node) in node_types) and
+        satisfies(node, knowledge)
+    ]
+
+
+def enclosed_numbers(tours, nodes):
+    """
+    Parameters
+    ----------
+    tours : {ast: (int, int)}
+        The `tours` side table [1]_.
+    nodes : [ast]
+
+    Returns
+    -------
+    bytes
+        Whether every `pre` number belongs to a proper descendant of one of
+        the nodes. The intervals of the nodes are added up as +1 after their
+        `pre` and -1 at their `post` and swept once.
+
+    References
+    ----------
+    .. [1] : euler_tour(nodes)
+    """
+    size = _number_count(tours)
+    boundaries = array('i', [0]) * (size + 1)
+    for node in nodes:
+        pre, post = tours[node]
+        boundaries[pre + 1] += 1
+        boundaries[post] -= 1
+    return bytes(map(bool, accumulate(boundaries)))
+
+
+def preceding_counts(tours, nodes):
+    """
+    Parameters
+    ----------
+    tours : {ast: (int, int)}
+    nodes : [ast]
+
+    Returns
+    -------
+    array
+        How many of the nodes have a `pre` smaller than every number, so the
+        nodes within the interval of a node are counted in one subtraction.
+    """
+    size = _number_count(tours)
+    starts = array('i', [0]) * (size + 1)
+    for node in nodes:
+        starts[tours[node][0] + 1] = 1
+    return array('i', accumulate(starts))
+
+
+class Structural_relation(object):
+    """
+    One relation of `Properties.Structural` [1]_ with the compiled
+    constraints of its value. It's what the `Structural` validator receives
+    instead of the constraints.
+
+    The nodes that satisfy the constraints and their join with the tree are
+    found once per tree, the first time that the relation is checked, and
+    kept in the `structures` table of its knowledge.
+
+    Attributes
+    ----------
+    relation : str
+        One of `STRUCTURAL_RELATIONS`.
+    key : hashable
+        Equal for relations of equal constraints.
+    satisfies : (node, knowledge) -> {True, False}
+    node_types : {type} or None
+        The only node types that may satisfy the constraints.
+
+    References
+    ----------
+    .. [1] : arep.constraints.STRUCTURAL_RELATIONS
+    """
+    def __init__(self, relation, key, satisfies, node_types=None):
+        self.relation = relation
+        self.key = key
+        self.satisfies = satisfies
+        self.node_types = node_types
+
+    def _table(self, knowledge):
+        """
+        Returns
+        -------
+        bytes or array or {ast}
+            `enclosed_numbers` for `inside`, `preceding_counts` for
+            `contains` and the set of the nodes for `direct_child_of`.
+        """
+        try:
+            structures = knowledge['structures']
+        except KeyError:
+            structures = knowledge['structures'] = dict()
+        table_key = (self.relation, self.key)
+        if table_key not in structures:
+            tours = knowledge['tours']
+            if self.key not in structures:
+                structures[self.key] = _matching_nodes(
+                    tours, self.satisfies, self.node_types, knowledge
+                )
+            nodes = structures[self.key]
+            if self.relation == 'inside':
+                structures[table_key] = enclosed_numbers(tours, nodes)
+            elif self.relation == 'contains':
+                structures[table_key] = preceding_counts(tours, nodes)
+            else:
+                structures[table_key] = frozenset(nodes)
+        return structures[table_key]
+
+    def __call__(self, node, knowledge):
+        """
+        Returns
+        -------
+        bool
+            Whether the node is in the relation with any of the nodes that
+            satisfy the constraints.
+
+        Raises
+        ------
+        AttributeError
+            For a `direct_child_of` of a node without a parent.
+        """
+        table = self._table(knowledge)
+        if self.relation == 'direct_child_of':
+            return parent(node, knowledge) in table
+        numbers = knowledge['tours'].get(node)
+        if numbers is None:
+            return False
+        pre, post = numbers
+        if self.relation == 'inside':
+            return bool(table[pre])
+        return table[post] - table[pre + 1] > 0
+
+    def __repr__(self):
+        return "Structural_relation({}, {!r})".format(self.relation, self.key)
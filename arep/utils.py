@@ -1,6 +1,8 @@
-from collections import defaultdict, namedtuple
+from array import array
+from collections import ChainMap, defaultdict, deque, namedtuple
 from functools import partial
 from inspect import getfullargspec as spec
+from types import MappingProxyType
 import ast
 import builtins
 import keyword
@@ -10,7 +12,17 @@ if sys.version_info > (3, 0):
     long = int
 
 
-def Knowledge_template():
+def _freeze(knowledge):
+    if isinstance(knowledge, dict):
+        return MappingProxyType({
+            key: _freeze(value) for key, value in knowledge.items()
+        })
+    if isinstance(knowledge, set):
+        return frozenset(knowledge)
+    return knowledge
+
+
+def _Base_knowledge():
     """
     A dictionary of what's known for all python programs by default on
     the system it's being run.
@@ -52,11 +64,477 @@ def Knowledge_template():
         for builtin_kind_set in knowledge['builtins']['kinds'].values()
         for builtin_type in builtin_kind_set
     }
+    knowledge['builtins']['type_names'] = {
+        builtin_type.__name__
+        for builtin_type in knowledge['builtins']['types']
+    }
     knowledge['builtins']['all'] = (set(dir(builtins)) |
                                     knowledge['builtins']['keywords'])
     return knowledge
 
 
+_BASE_KNOWLEDGE = _freeze(_Base_knowledge())
+
+
+def Knowledge_template():
+    """
+    A dictionary of what's known for all python programs by default on
+    the system it's being run.
+
+    The builtin part is computed once per process, frozen and shared between
+    all of the templates. Each template is only an overlay on top of it that
+    holds the per-file knowledge [1]_.
+
+    Returns
+    -------
+    knowledge : {str: type}
+
+    References
+    ----------
+    .. [1] : update_knowledge_template(tree, knowledge_template)
+    """
+    return ChainMap(dict(), _BASE_KNOWLEDGE)
+
+
+def parent(node, knowledge):
+    """
+    Returns the parent of the node from the `parents` side table of the
+    knowledge if there's one [1]_, or from the `_parent` pointer of the node
+    otherwise.
+
+    Parameters
+    ----------
+    node : ast
+    knowledge : {str: type}
+
+    Returns
+    -------
+    ast
+
+    Raises
+    ------
+    AttributeError
+        If the node doesn't have a parent, same as `node._parent` would.
+
+    References
+    ----------
+    .. [1] : establish_parent_link(tree, parents)
+    """
+    if 'parents' not in knowledge:
+        return node._parent
+    try:
+        return knowledge['parents'][node]
+    except KeyError:
+        raise AttributeError("{} doesn't have a parent".format(node))
+
+
+Scope = namedtuple("Scope", "function class_ module innermost")
+
+
+def _scope_within(node, scope_of_node):
+    """
+    Returns the scope that the children of the node are in.
+    """
+    if type(node) is ast.Module:
+        return Scope(function=None, class_=None, module=node, innermost=node)
+    if type(node) in {ast.FunctionDef, ast.Lambda}:
+        return scope_of_node._replace(function=node, innermost=node)
+    if type(node) is ast.ClassDef:
+        return scope_of_node._replace(class_=node, innermost=node)
+    return scope_of_node
+
+
+def scope_index(nodes):
+    """
+    Finds the nearest enclosing function, class and module of every node.
+    Nodes that aren't in a function, class or module share the same `Scope`
+    of their parent, so there's only one `Scope` for each such definition.
+
+    Parameters
+    ----------
+    nodes : [ast]
+        All of the nodes of the tree, starting from its root, in an order
+        where every node comes before its children e.g. `ast.walk`.
+
+    Returns
+    -------
+    {ast: Scope}
+        The `function`, `class_` and `module` of the `Scope` of each node are
+        its nearest enclosing `ast.FunctionDef` or `ast.Lambda`,
+        `ast.ClassDef` and `ast.Module` respectively, or `None`. `innermost`
+        is the nearest of them.
+    """
+    scopes = {nodes[0]: Scope(None, None, None, None)} if nodes else dict()
+    for node in nodes:
+        scope_of_children = _scope_within(node, scopes[node])
+        for child in ast.iter_child_nodes(node):
+            scopes[child] = scope_of_children
+    return scopes
+
+
+def scope(node, knowledge):
+    """
+    Returns the `Scope` of the node from the `scopes` side table of the
+    knowledge [1]_.
+
+    Parameters
+    ----------
+    node : ast
+    knowledge : {str: type}
+
+    Returns
+    -------
+    Scope
+
+    Raises
+    ------
+    AttributeError
+        If the node isn't in the table.
+
+    References
+    ----------
+    .. [1] : scope_index(nodes)
+    """
+    try:
+        return knowledge['scopes'][node]
+    except KeyError:
+        raise AttributeError("{} isn't in a known scope".format(node))
+
+
+Subtree_summary = namedtuple(
+    "Subtree_summary", "with_break elif_chain_length terminal_else"
+)
+
+_LOOP_TYPES = frozenset({ast.For, ast.AsyncFor, ast.While})
+
+
+def subtree_summaries(nodes):
+    """
+    Summarizes the subtrees of the loops and the if statements, bottom-up,
+    so that what a validator would otherwise find by walking a subtree or by
+    following an elif chain is known in O(1).
+
+    Parameters
+    ----------
+    nodes : [ast]
+        All of the nodes of the tree in an order where every node comes
+        before its children e.g. `ast.walk`.
+
+    Returns
+    -------
+    {ast: Subtree_summary}
+        For every `ast.For`, `ast.AsyncFor`, `ast.While` and `ast.If`.
+        `with_break` is whether a `break` in the body of the loop belongs to
+        that loop rather than to a nested one. `elif_chain_length` is the
+        number of `elif`s that follow the if statement and `terminal_else` is
+        whether its chain ends in an `else`.
+    """
+    # Nodes whose subtree has a `break` that belongs to a loop above them.
+    with_free_break = set()
+    summaries = dict()
+    for node in reversed(nodes):
+        node_type = type(node)
+        if node_type is ast.Break:
+            with_free_break.add(node)
+        elif node_type in _LOOP_TYPES:
+            summaries[node] = Subtree_summary(
+                with_break=any(
+                    child in with_free_break for child in node.body
+                ),
+                elif_chain_length=0, terminal_else=False
+            )
+            # A `break` in the `else` of a loop belongs to the outer loop.
+            if any(child in with_free_break for child in node.orelse):
+                with_free_break.add(node)
+        else:
+            if node_type is ast.If:
+                if len(node.orelse) == 0:
+                    summaries[node] = Subtree_summary(False, 0, False)
+                elif type(node.orelse[0]) is ast.If:
+                    elif_summary = summaries[node.orelse[0]]
+                    summaries[node] = elif_summary._replace(
+                        elif_chain_length=(
+                            elif_summary.elif_chain_length + 1
+                        )
+                    )
+                else:
+                    summaries[node] = Subtree_summary(False, 0, True)
+            if any(
+                    child in with_free_break
+                    for child in ast.iter_child_nodes(node)
+            ):
+                with_free_break.add(node)
+    return summaries
+
+
+def subtree_summary(node, knowledge):
+    """
+    Returns the `Subtree_summary` of the node from the `summaries` side
+    table of the knowledge [1]_.
+
+    Parameters
+    ----------
+    node : ast
+    knowledge : {str: type}
+
+    Returns
+    -------
+    Subtree_summary
+
+    Raises
+    ------
+    AttributeError
+        If the node isn't summarized.
+
+    References
+    ----------
+    .. [1] : subtree_summaries(nodes)
+    """
+    try:
+        return knowledge['summaries'][node]
+    except KeyError:
+        raise AttributeError("{} isn't summarized".format(node))
+
+
+def subtree_spans(nodes):
+    """
+    Finds the lines that the subtree of every node spans, bottom-up. A
+    subtree may start before its root e.g. a decorated function starts at
+    its first decorator, so the span of its root isn't enough.
+
+    Parameters
+    ----------
+    nodes : [ast]
+        All of the nodes of the tree in an order where every node comes
+        before its children e.g. `ast.walk`.
+
+    Returns
+    -------
+    {ast: (int, int)}
+        The first and the last line of every node whose subtree has a node
+        with a position. The others, e.g. `ast.Load`, are left out.
+    """
+    spans = dict()
+    for node in reversed(nodes):
+        first = getattr(node, 'lineno', None)
+        last = getattr(node, 'end_lineno', None) or first
+        for child in ast.iter_child_nodes(node):
+            child_span = spans.get(child)
+            if child_span is None:
+                continue
+            if first is None:
+                first, last = child_span
+            else:
+                if child_span[0] < first:
+                    first = child_span[0]
+                if child_span[1] > last:
+                    last = child_span[1]
+        if first is not None:
+            spans[node] = (first, last)
+    return spans
+
+
+def _ast_node_types():
+    node_types = set()
+    to_be_processed = [ast.AST]
+    while to_be_processed:
+        for node_type in to_be_processed.pop().__subclasses__():
+            if node_type not in node_types:
+                node_types.add(node_type)
+                to_be_processed.append(node_type)
+    return sorted(
+        [node_type for node_type in node_types
+         if node_type.__module__ == 'ast'],
+        key=lambda node_type: node_type.__qualname__
+    )
+
+
+# A bit per node type of the `ast` module, in the order of their names so
+# that the bits are the same in every process of the same Python. All of the
+# other types share the last bit.
+_NODE_TYPE_BITS = {
+    node_type: 1 << position
+    for position, node_type in enumerate(_ast_node_types())
+}
+_OTHER_NODE_TYPES_BIT = 1 << len(_NODE_TYPE_BITS)
+
+
+def node_type_bits(node_types):
+    """
+    Parameters
+    ----------
+    node_types : {type}
+
+    Returns
+    -------
+    int
+        The bits of the types, "OR"ed, to be compared with the masks of
+        `descendant_types`.
+    """
+    bits = 0
+    for node_type in node_types:
+        bits |= _NODE_TYPE_BITS.get(node_type, _OTHER_NODE_TYPES_BIT)
+    return bits
+
+
+def descendant_types(nodes):
+    """
+    Finds the node types that occur anywhere beneath every node, bottom-up,
+    as a bit mask, so whether a subtree may have a node of some types is a
+    single `&` with their `node_type_bits`.
+
+    Parameters
+    ----------
+    nodes : [ast]
+        All of the nodes of the tree in an order where every node comes
+        before its children e.g. `ast.walk`.
+
+    Returns
+    -------
+    {ast: int}
+        The mask of the descendants of every node, which is 0 for the
+        leaves. Equal masks are the same object.
+    """
+    masks = dict()
+    interned = dict()
+    bits = _NODE_TYPE_BITS
+    for node in reversed(nodes):
+        mask = 0
+        for child in ast.iter_child_nodes(node):
+            mask |= (bits.get(type(child), _OTHER_NODE_TYPES_BIT) |
+                     masks.get(child, 0))
+        masks[node] = interned.setdefault(mask, mask)
+    return masks
+
+
+def euler_tour(nodes):
+    """
+    Numbers the nodes in a depth-first traversal of the tree, from a single
+    counter that's incremented both when the traversal enters a node and
+    when it leaves it. So a node is an ancestor of another if and only if
+    `pre < other_pre and other_post < post`, and the descendants of a node
+    are the nodes whose `pre` is between its `pre` and its `post`.
+
+    Parameters
+    ----------
+    nodes : [ast]
+        All of the nodes of the tree, starting with its root e.g.
+        `ast.walk`.
+
+    Returns
+    -------
+    {ast: (int, int)}
+        The `pre` and the `post` of every node. The nodes that are shared
+        between several parents e.g. `ast.Load` don't have a single place
+        in the tree, so they're left out.
+    """
+    tours = dict()
+    if not nodes:
+        return tours
+    pre = {nodes[0]: 0}
+    shared = set()
+    number = 1
+    # The nodes that the traversal is in, with the children that it's yet to
+    # enter.
+    path = [(nodes[0], ast.iter_child_nodes(nodes[0]))]
+    while path:
+        node, children = path[-1]
+        for child in children:
+            if child in pre or child in tours:
+                shared.add(child)
+                continue
+            pre[child] = number
+            number += 1
+            path.append((child, ast.iter_child_nodes(child)))
+            break
+        else:
+            path.pop()
+            tours[node] = (pre.pop(node), number)
+            number += 1
+    for node in shared:
+        del tours[node]
+    return tours
+
+
+def _func_name_checker(node, knowledge):
+    if type(node) is ast.FunctionDef:
+        return ('Function', node.name)
+    elif type(node) is ast.Lambda:
+        if type(parent(node, knowledge)) is ast.Call:
+            return ('Function', ast.Lambda)
+    return False
+
+
+def _class_name_checker(node, knowledge):
+    if type(node) is ast.ClassDef:
+        return ('Class', node.name)
+    return False
+
+
+def _decorator_name_checker(node, knowledge):
+    if type(node) is ast.Name:
+        node_parent = parent(node, knowledge)
+        if hasattr(node_parent, "decorator_list"):
+            if node in node_parent.decorator_list:
+                return ('Decorator', node.id)
+
+
+def _class_method_name_checker(node, knowledge):
+    if type(node) in {ast.Lambda, ast.FunctionDef}:
+        if type(scope(node, knowledge).innermost) is ast.ClassDef:
+            return ('Method', (ast.Lambda
+                               if type(node) is ast.Lambda
+                               else node.name))
+    return False
+
+
+def _name_checkers(_with_classes, _with_funcs, _with_decorators,
+                   _with_class_methods):
+    name_checkers = list()
+    if _with_funcs:
+        name_checkers.append(_func_name_checker)
+    if _with_classes:
+        name_checkers.append(_class_name_checker)
+    if _with_decorators:
+        name_checkers.append(_decorator_name_checker)
+    if _with_class_methods:
+        name_checkers.append(_class_method_name_checker)
+    return name_checkers
+
+
+def _check_names(node, knowledge, name_checkers, name_kinds):
+    for name_checker in name_checkers:
+        try:
+            result = name_checker(node, knowledge)
+            if result:
+                name_kinds[result[0]][result[1]].add(node)
+        except AttributeError:
+            pass
+
+
+def _empty_name_kinds(_with_classes=True, _with_funcs=True,
+                      _with_decorators=True, _with_class_methods=True):
+    # The nodes of each name are kept in a set. As the nodes hash by their
+    # identity, checking whether a node has a name is O(1).
+    return {
+        key: defaultdict(set)
+        for key, is_requested in [
+            ('Function', _with_funcs), ('Class', _with_classes),
+            ('Decorator', _with_decorators), ('Method', _with_class_methods),
+        ]
+        if is_requested
+    }
+
+
+def _learn_name_kinds(name_kinds, knowledge_template):
+    # Every requested kind is learned, even if the file has none of its
+    # names, so that looking it up doesn't raise a KeyError.
+    for name_kind, names_set in name_kinds.items():
+        # A plain dict so that looking up a missing name won't add it.
+        knowledge_template[name_kind] = dict(names_set)
+    return knowledge_template
+
+
 def update_knowledge_template(
         ast_tree_with_parent_pointers, knowledge_template,
         _with_classes=True, _with_funcs=True, _with_decorators=True,
@@ -70,6 +548,8 @@ def update_knowledge_template(
     ast_tree_with_parent_pointers : ast
         A modified AST with parent pointers. [1]_
     knowledge_template : {str: type}
+        If it has a `parents` side table, that will be used instead of the
+        parent pointers.
     _with_classes : bool
         Default is `True`
     _with_funcs : bool
@@ -82,98 +562,284 @@ def update_knowledge_template(
     Returns
     -------
     knowledge_template : {str: type}
+        Each of `Function`, `Class`, `Decorator` and `Method` maps the names
+        of its kind to the set of their nodes. Along with the names, it has
+        the `scopes` [2]_, the `summaries` [3]_, the `spans` [4]_, the
+        `tours` [5]_ and the `descendant_types` [6]_ side tables.
 
     References
     ----------
-    .. [1] : establish_parent_pointers(tree)
-    """
-
-    def func_name_checker(node):
-        if type(node) is ast.FunctionDef:
-            return ('Function', node.name)
-        elif type(node) is ast.Lambda:
-            if type(node._parent) is ast.Call:
-                return ('Function', ast.Lambda)
-        return False
-
-    def class_name_checker(node):
-        if type(node) is ast.ClassDef:
-            return ('Class', node.name)
-        return False
-
-    def decorator_name_checker(node):
-        if type(node) is ast.Name:
-            if hasattr(node._parent, "decorator_list"):
-                if node in node._parent.decorator_list:
-                    return ('Decorator', node.id)
-
-    def class_method_name_checker(node):
-
-        def contained_in_class(node):
-            if hasattr(node, "_parent"):
-                if type(node._parent) is ast.ClassDef:
-                    return True
-                if type(node._parent) in {ast.FunctionDef, ast.Lambda}:
-                    return False
-                return contained_in_class(node._parent)
-            return False
-
-        if type(node) in {ast.Lambda, ast.FunctionDef}:
-            if contained_in_class(node):
-                return ('Method', (ast.Lambda
-                                   if type(node) is ast.Lambda
-                                   else node.name))
-        return False
-
-    name_kinds = {
-        key: defaultdict(list)
-        for key in {'Function', 'Class', 'Decorator', 'Method'}
-    }
-    name_checkers = set([])
-    if _with_funcs:
-        name_checkers.add(func_name_checker)
-    if _with_classes:
-        name_checkers.add(class_name_checker)
-    if _with_decorators:
-        name_checkers.add(decorator_name_checker)
-    if _with_class_methods:
-        name_checkers.add(class_method_name_checker)
-    for node in ast.walk(ast_tree_with_parent_pointers):
-        for name_checker in name_checkers:
-            try:
-                result = name_checker(node)
-                if result:
-                    name_kinds[result[0]][result[1]].append(node)
-            except AttributeError:
-                pass
+    .. [1] : establish_parent_link(tree)
+    .. [2] : scope_index(nodes)
+    .. [3] : subtree_summaries(nodes)
+    .. [4] : subtree_spans(nodes)
+    .. [5] : euler_tour(nodes)
+    .. [6] : descendant_types(nodes)
+    """
+    name_kinds = _empty_name_kinds(
+        _with_classes, _with_funcs, _with_decorators, _with_class_methods
+    )
+    name_checkers = _name_checkers(
+        _with_classes, _with_funcs, _with_decorators, _with_class_methods
+    )
+    nodes = list(ast.walk(ast_tree_with_parent_pointers))
+    knowledge_template['scopes'] = scope_index(nodes)
+    knowledge_template['summaries'] = subtree_summaries(nodes)
+    knowledge_template['spans'] = subtree_spans(nodes)
+    knowledge_template['tours'] = euler_tour(nodes)
+    knowledge_template['descendant_types'] = descendant_types(nodes)
+    for node in nodes:
+        _check_names(node, knowledge_template, name_checkers, name_kinds)
+    return _learn_name_kinds(name_kinds, knowledge_template)
 
-    for name_kind, names_set in name_kinds.items():
-        if len(names_set):
-            knowledge_template[name_kind] = names_set
-    return knowledge_template
+
+class Lazy_knowledge(ChainMap):
+    """
+    A knowledge template whose per-file names i.e. `Function`, `Class`,
+    `Decorator` and `Method` aren't learned until they're needed.
+
+    Unlike `update_knowledge_template`, a learned name kind is always
+    present, even if nothing in the file has that kind of name. The side
+    tables i.e. `scopes` [1]_, `summaries` [2]_, `spans` [3]_, `tours` [4]_
+    and `descendant_types` [5]_ are also made on demand.
+
+    Attributes
+    ----------
+    name_kinds : {str}
+        All of the name kinds that can be learned.
+    side_tables : {str: [ast] -> {ast: type}}
+        How each side table is made from the nodes.
+
+    Methods
+    -------
+    learn(keys=None)
+        Learns the given name kinds and side tables, or all of them. The name
+        kinds are learned in one scan of the nodes.
+
+    References
+    ----------
+    .. [1] : scope_index(nodes)
+    .. [2] : subtree_summaries(nodes)
+    .. [3] : subtree_spans(nodes)
+    .. [4] : euler_tour(nodes)
+    .. [5] : descendant_types(nodes)
+    """
+    name_kinds = frozenset({'Function', 'Class', 'Decorator', 'Method'})
+    side_tables = MappingProxyType({
+        'scopes': scope_index,
+        'summaries': subtree_summaries,
+        'spans': subtree_spans,
+        'tours': euler_tour,
+        'descendant_types': descendant_types,
+    })
+
+    def __init__(self, nodes, knowledge_template=None):
+        """
+        Parameters
+        ----------
+        nodes : [ast]
+            All of the nodes of the file in the order of `ast.walk`. Their
+            parents should already be known, either as pointers or in the
+            `parents` side table.
+        knowledge_template : ChainMap
+            Default is `None` which uses a new `Knowledge_template()`. The
+            learned names are written in its per-file overlay.
+        """
+        if knowledge_template is None:
+            knowledge_template = Knowledge_template()
+        super(Lazy_knowledge, self).__init__(*knowledge_template.maps)
+        self.nodes = nodes
+
+    def __missing__(self, key):
+        if (
+                key in Lazy_knowledge.name_kinds or
+                key in Lazy_knowledge.side_tables
+        ):
+            self.learn({key})
+            return self.maps[0][key]
+        raise KeyError(key)
+
+    def learn(self, keys=None):
+        """
+        Parameters
+        ----------
+        keys : {str}
+            Default is `None` which learns all of the name kinds and side
+            tables. Those that are already learned and those that can't be
+            learned are skipped.
+        """
+        keys = {
+            key
+            for key in (
+                Lazy_knowledge.name_kinds | set(Lazy_knowledge.side_tables)
+                if keys is None else keys
+            )
+            if key not in self.maps[0]
+        }
+        for key in keys & set(Lazy_knowledge.side_tables):
+            self.maps[0][key] = Lazy_knowledge.side_tables[key](self.nodes)
+        name_kinds = keys & Lazy_knowledge.name_kinds
+        if not name_kinds:
+            return
+        requested = dict(
+            _with_classes=('Class' in name_kinds),
+            _with_funcs=('Function' in name_kinds),
+            _with_decorators=('Decorator' in name_kinds),
+            _with_class_methods=('Method' in name_kinds),
+        )
+        learned = _empty_name_kinds(**requested)
+        name_checkers = _name_checkers(**requested)
+        for node in self.nodes:
+            _check_names(node, self, name_checkers, learned)
+        _learn_name_kinds(learned, self.maps[0])
+
+
+def annotate_tree(
+        tree, knowledge_template, parent_table=False,
+        _with_classes=True, _with_funcs=True, _with_decorators=True,
+        _with_class_methods=True, _with_summaries=True, _with_scopes=True):
+    """
+    Does what `establish_parent_link`, `update_knowledge_template`,
+    `scope_index` and `node_type_index` do, in a single traversal of the
+    tree. The `summaries` [1]_, the `spans` [2]_, the `tours` [3]_ and the
+    `descendant_types` [4]_ are made afterwards.
+
+    The nodes are visited in the same order as `ast.walk`, so by the time a
+    node is checked for the knowledge, it and all of its ancestors already
+    have their parent pointers.
+
+    Parameters
+    ----------
+    tree : ast
+    knowledge_template : {str: type}
+    parent_table : bool
+        Default is `False`. If `True`, the parents are kept in the `parents`
+        side table of the knowledge and the tree isn't modified.
+    _with_classes : bool
+        Default is `True`
+    _with_funcs : bool
+        Default is `True`
+    _with_decorators : bool
+        Default is `True`
+    _with_class_methods : bool
+        Default is `True`
+    _with_summaries : bool
+        Default is `True`
+    _with_scopes : bool
+        Default is `True`. The `scopes` are made anyway if the methods are
+        learned, since telling them apart takes the enclosing class.
+
+    Returns
+    -------
+    tree : ast
+        With parent pointers unless `parent_table` is `True`.
+    knowledge_template : {str: type}
+    nodes : [ast]
+        All of the nodes in the order of `ast.walk`.
+    index : {type: [int]}
+        Ascending positions in `nodes` of all the nodes of each type.
+
+    References
+    ----------
+    .. [1] : subtree_summaries(nodes)
+    .. [2] : subtree_spans(nodes)
+    .. [3] : euler_tour(nodes)
+    .. [4] : descendant_types(nodes)
+    """
+    name_kinds = _empty_name_kinds(
+        _with_classes, _with_funcs, _with_decorators, _with_class_methods
+    )
+    name_checkers = _name_checkers(
+        _with_classes, _with_funcs, _with_decorators, _with_class_methods
+    )
+    if parent_table:
+        knowledge_template['parents'] = dict()
+        parents = knowledge_template['parents']
+    with_scopes = _with_scopes or _with_class_methods
+    if with_scopes:
+        knowledge_template['scopes'] = {tree: Scope(None, None, None, None)}
+        scopes = knowledge_template['scopes']
+    nodes = list()
+    index = defaultdict(list)
+    to_be_processed = deque([tree])
+    while to_be_processed:
+        node = to_be_processed.popleft()
+        index[type(node)].append(len(nodes))
+        nodes.append(node)
+        _check_names(node, knowledge_template, name_checkers, name_kinds)
+        if with_scopes:
+            scope_of_children = _scope_within(node, scopes[node])
+        for child in ast.iter_child_nodes(node):
+            if parent_table:
+                parents[child] = node
+            else:
+                child._parent = node
+            if with_scopes:
+                scopes[child] = scope_of_children
+            to_be_processed.append(child)
+    if _with_summaries:
+        knowledge_template['summaries'] = subtree_summaries(nodes)
+        knowledge_template['spans'] = subtree_spans(nodes)
+        knowledge_template['tours'] = euler_tour(nodes)
+        knowledge_template['descendant_types'] = descendant_types(nodes)
+    return (
+        tree, _learn_name_kinds(name_kinds, knowledge_template),
+        nodes, dict(index)
+    )
 
 
-def establish_parent_link(tree):
+def establish_parent_link(tree, parents=None):
     """
     Makes a parent pointer for all of the nodes who have a parent.
 
     Parameters
     ----------
     tree : ast
+    parents : {ast: ast}
+        Default is `None`. If given, the parent of every node is stored in it
+        instead of the `_parent` attribute of the node and the tree won't be
+        modified. Put it under the `parents` key of the knowledge for the
+        validators to find it.
 
     Returns
     -------
     tree : ast
     """
-    to_be_processed = [tree]
+    to_be_processed = deque([tree])
     while to_be_processed:
-        current_parent = to_be_processed.pop(0)
+        current_parent = to_be_processed.popleft()
         for child in ast.iter_child_nodes(current_parent):
-            child._parent = current_parent
-        to_be_processed.extend(list(ast.iter_child_nodes(current_parent)))
+            if parents is None:
+                child._parent = current_parent
+            else:
+                parents[child] = current_parent
+            to_be_processed.append(child)
     return tree
 
 
+def node_type_index(tree):
+    """
+    Groups all of the nodes of the tree by their type while remembering the
+    order in which `ast.walk` visits them.
+
+    Parameters
+    ----------
+    tree : ast
+
+    Returns
+    -------
+    nodes : [ast]
+        All of the nodes in the order of `ast.walk`.
+    index : {type: [int]}
+        Ascending positions in `nodes` of all the nodes of each type.
+    """
+    nodes = list(ast.walk(tree))
+    index = defaultdict(list)
+    for position, node in enumerate(nodes):
+        index[type(node)].append(position)
+    return nodes, dict(index)
+
+
 def count_arity(func):
     """
     Returns the number of the arguments that the function receives.
@@ -219,7 +885,7 @@ def count_arity_ast(node):
     return None
 
 
-def ast_mapped_operators():
+def _build_ast_mapped_operators():
     """
     Returns a dictionary whose keys are ast nodes of operators and whose
     values are functions that operates on their arguments with their respective
@@ -283,51 +949,99 @@ def ast_mapped_operators():
             (ast.GtE, ast.Lt),
             (ast.Gt, ast.LtE),
     }:
+        # The negated operation is bound as a default since the loop variable
+        # would otherwise be looked up after the loop is over.
         ast_mappings[ast_not_operation] = (
-            lambda *args: ast_mappings[ast.Not](
-                ast_mappings[previously_defined_ast_operation](*args)
-            )
+            lambda *args, negated=previously_defined_ast_operation:
+            ast_mappings[ast.Not](ast_mappings[negated](*args))
         )
     return ast_mappings
 
 
+_AST_MAPPED_OPERATORS = MappingProxyType(_build_ast_mapped_operators())
+
+_AST_OPERATION_SYMBOLS = MappingProxyType({
+    ast.Is: 'is',
+    ast.IsNot: 'is not',
+    ast.In: 'in',
+    ast.NotIn: 'not in',
+    ast.Not: 'not',
+    ast.And: 'and',
+    ast.Or: 'or',
+    ast.Eq: '==',
+    ast.NotEq: '!=',
+    ast.Lt: '<',
+    ast.LtE: '<=',
+    ast.Gt: '>',
+    ast.GtE: '>=',
+    ast.UAdd: '+',
+    ast.USub: '-',
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.FloorDiv: '//',
+    ast.Mod: '%',
+    ast.Pow: '**',
+    ast.MatMult: '@',
+    ast.Invert: '~',
+    ast.LShift: '<<',
+    ast.RShift: '>>',
+    ast.BitAnd: '&',
+    ast.BitOr: '|',
+    ast.BitXor: '^',
+})
+
+_AST_OPERATION_TYPES = MappingProxyType({
+    symbol: frozenset(
+        ast_operation
+        for ast_operation, operation_symbol in _AST_OPERATION_SYMBOLS.items()
+        if operation_symbol == symbol
+    )
+    for symbol in set(_AST_OPERATION_SYMBOLS.values())
+})
+
+
+def ast_mapped_operators():
+    """
+    Returns a read-only dictionary whose keys are ast nodes of operators and
+    whose values are functions that operates on their arguments with their
+    respective key. It's computed once when the module is imported.
+
+    Returns
+    -------
+    ast_mappings : {ast: (*args) -> {True, False}}
+    """
+    return _AST_MAPPED_OPERATORS
+
+
 def ast_operation_symbols():
     """
-    Returns a dictionary whose keys are ast nodes of operators and whose values
-    are the symbols representing those operations.
+    Returns a read-only dictionary whose keys are ast nodes of operators and
+    whose values are the symbols representing those operations.
 
     Returns
     -------
     {ast: str}
     """
-    return {
-        ast.Is: 'is',
-        ast.Not: 'not',
-        ast.And: 'and',
-        ast.Or: 'in',
-        ast.Eq: '==',
-        ast.NotEq: '!=',
-        ast.Lt: '<',
-        ast.LtE: '<=',
-        ast.Gt: '>',
-        ast.GtE: '>=',
-        ast.UAdd: '+',
-        ast.USub: '-',
-        ast.Add: '+',
-        ast.Sub: '-',
-        ast.Mult: '*',
-        ast.Div: '/',
-        ast.FloorDiv: '//',
-        ast.Mod: '%',
-        ast.Pow: '**',
-        ast.MatMult: '@',
-        ast.Invert: '~',
-        ast.LShift: '<<',
-        ast.RShift: '>>',
-        ast.BitAnd: '&',
-        ast.BitOr: '|',
-        ast.BitXor: '^',
-    }
+    return _AST_OPERATION_SYMBOLS
+
+
+def ast_operation_types(symbol):
+    """
+    The reverse of `ast_operation_symbols`. For example `-` is both `ast.Sub`
+    and `ast.USub`.
+
+    Parameters
+    ----------
+    symbol : str
+
+    Returns
+    -------
+    frozenset({ast})
+        Empty if no operation is represented by the symbol.
+    """
+    return _AST_OPERATION_TYPES.get(symbol, frozenset())
 
 
 def comparison_evaluator(node):
@@ -363,11 +1077,15 @@ def comparison_evaluator(node):
     return left
 
 
-class Result(object):
+class Result(namedtuple("_Coordinate", "name line column")):
     """
     The object representing a coordinate of a node inside of a python source
     code and is being created and returned by the Grepper.
 
+    It's a tuple without a `__dict__`, so results are ordered by their name,
+    then their line and then their column, and they're compared and hashed
+    as tuples are.
+
     Attributes
     ----------
     name : str
@@ -375,36 +1093,124 @@ class Result(object):
     line : int
     column : int
     """
-    def __init__(self, name, line, column):
-        self.name = name
-        self.line = line
-        self.column = column
+    __slots__ = ()
 
-    def __eq__(self, other):
-        return bool(
-            (self.name == other.name) and
-            (self.line == other.line) and
-            (self.column == other.column)
+    def __repr__(self):
+        return '{}(Line={!r}, Column={!r})'.format(
+            self.name.replace('.', '_dot_'), self.line, self.column
         )
 
-    def __lt__(self, other):
-        return bool(
-            (self.name == other.name) and (
-                (self.line < other.line) or
-                ((self.line == other.line) and
-                 (self.column < other.column))
-            )
+    def __str__(self):
+        return '{}(Line={!r}, Column={!r})'.format(
+            self.name, self.line, self.column
         )
 
-    def __hash__(self):
-        return hash((self.name, self.line, self.column))
 
-    def __repr__(self):
-        return namedtuple(self.name.replace('.', '_dot_'), "Line Column")(
-            self.line, self.column
-        ).__repr__()
+class ResultSet(object):
+    """
+    A columnar collection of results for scans with very many of them. The
+    lines and the columns are kept in arrays of machine integers and every
+    file name is kept once, in a table that the results refer to by
+    position.
 
-    def __str__(self):
-        return namedtuple(self.name, "Line Column")(
-            self.line, self.column
-        ).__str__()
+    Attributes
+    ----------
+    names : [str]
+        The file names of the results, each of them once.
+    name_ids : array
+        The position in `names` of the file name of every result.
+    lines : array
+    columns : array
+
+    Methods
+    -------
+    add(name, line, column)
+    append(result)
+    extend(results)
+    sort()
+    """
+    __slots__ = ('names', 'name_ids', 'lines', 'columns', '__name_ids')
+
+    def __init__(self, results=()):
+        """
+        Parameters
+        ----------
+        results : iterable of Result
+            Default is none.
+        """
+        self.names = list()
+        self.name_ids = array('i')
+        self.lines = array('i')
+        self.columns = array('i')
+        self.__name_ids = dict()
+        self.extend(results)
+
+    def add(self, name, line, column):
+        """
+        Adds a result from its coordinate, without making a `Result`.
+        """
+        name_id = self.__name_ids.get(name)
+        if name_id is None:
+            name_id = self.__name_ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        self.name_ids.append(name_id)
+        self.lines.append(line)
+        self.columns.append(column)
+
+    def append(self, result):
+        """
+        Parameters
+        ----------
+        result : Result
+        """
+        self.add(result.name, result.line, result.column)
+
+    def extend(self, results):
+        """
+        Parameters
+        ----------
+        results : iterable of Result
+        """
+        for result in results:
+            self.add(result.name, result.line, result.column)
+
+    def sort(self):
+        """
+        Sorts the results in place, in the same order as `Result`s are.
+        """
+        names, name_ids = self.names, self.name_ids
+        lines, columns = self.lines, self.columns
+        order = sorted(range(len(self)), key=lambda position: (
+            names[name_ids[position]], lines[position], columns[position]
+        ))
+        self.name_ids = array('i', [name_ids[position] for position in order])
+        self.lines = array('i', [lines[position] for position in order])
+        self.columns = array('i', [columns[position] for position in order])
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(len(self))[position]]
+        return Result(
+            self.names[self.name_ids[position]],
+            self.lines[position], self.columns[position]
+        )
+
+    def __iter__(self):
+        names = self.names
+        for name_id, line, column in zip(
+                self.name_ids, self.lines, self.columns
+        ):
+            yield Result(names[name_id], line, column)
+
+    def __eq__(self, other):
+        if not isinstance(other, ResultSet):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return 'ResultSet({} results in {} files)'.format(
+            len(self), len(self.names)
+        )
@@ -0,0 +1,5 @@
+"""
+Timing scripts for arep. They aren't part of the test suite; each module can
+be run on its own e.g. `python -m benchmarks.validator_form`, and
+`benchmarks.suite` times all of a search into a JSON report.
+"""
@@ -0,0 +1,69 @@
+import argparse
+import json
+import math
+
+"""
+Compares two JSON reports of `benchmarks.suite`, e.g. of two commits, by the
+smallest time of every benchmark that's in both.
+
+    python -m benchmarks.compare before.json after.json
+"""
+
+
+def load(path):
+    """
+    Returns
+    -------
+    ({str: str or int}, {(str, int): {str: str or int or {str: float}}})
+        The metadata and the results keyed by the benchmark and the nodes.
+    """
+    with open(path, 'r') as f:
+        report = json.load(f)
+    return report['metadata'], {
+        (result['benchmark'], result['nodes']): result
+        for result in report['results']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=1.1,
+                        help="Ratios beyond it either way are marked.")
+    arguments = parser.parse_args()
+
+    before_metadata, before = load(arguments.before)
+    after_metadata, after = load(arguments.after)
+    for key in ['python', 'platform']:
+        if before_metadata[key] != after_metadata[key]:
+            print("The runs differ in {}: {!r} and {!r}".format(
+                key, before_metadata[key], after_metadata[key]
+            ))
+    print("{:<52}{:>9}{:>12}{:>12}{:>9}".format(
+        "benchmark", "nodes", "before ms", "after ms", "ratio"
+    ))
+    ratios = list()
+    for key in sorted(set(before) & set(after), key=lambda key: (key[1],
+                                                               key[0])):
+        before_seconds = before[key]['seconds']['min']
+        after_seconds = after[key]['seconds']['min']
+        ratio = after_seconds / before_seconds if before_seconds else 1.0
+        ratios.append(ratio)
+        mark = ('slower' if ratio > arguments.threshold
+                else 'faster' if ratio < 1 / arguments.threshold
+                else '')
+        print("{:<52}{:>9}{:>12.3f}{:>12.3f}{:>8.2f}x {}".format(
+            key[0], key[1], before_seconds * 1e3, after_seconds * 1e3, ratio,
+            mark
+        ).rstrip())
+    if ratios:
+        print("geometric mean of the ratios: {:.3f}".format(
+            math.exp(sum(map(math.log, ratios)) / len(ratios))
+        ))
+
+
+if __name__ == '__main__':
+    main()
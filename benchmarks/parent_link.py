@@ -0,0 +1,61 @@
+from arep.utils import establish_parent_link
+from benchmarks.synthetic import synthetic_source, BLOCK_NODES
+import argparse
+import ast
+import time
+
+"""
+Scaling of parent linking with the size of the tree. The queue of
+`establish_parent_link` used to be a list consumed with `pop(0)`, which is
+kept below as the reference.
+
+    python -m benchmarks.parent_link --nodes 1000 100000 1000000
+"""
+
+
+def list_queue_parent_link(tree):
+    to_be_processed = [tree]
+    while to_be_processed:
+        current_parent = to_be_processed.pop(0)
+        for child in ast.iter_child_nodes(current_parent):
+            child._parent = current_parent
+        to_be_processed.extend(list(ast.iter_child_nodes(current_parent)))
+    return tree
+
+
+def seconds(link, tree):
+    start = time.perf_counter()
+    link(tree)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, nargs='+',
+                        default=[1000, 100000, 1000000])
+    parser.add_argument('--reference-limit', type=int, default=100000,
+                        help="Largest tree to time the list queue on.")
+    arguments = parser.parse_args()
+
+    print("{:>10}{:>14}{:>14}{:>14}".format(
+        "nodes", "list queue s", "pointers s", "side table s"
+    ))
+    for nodes in arguments.nodes:
+        source = synthetic_source(max(1, nodes // BLOCK_NODES))
+        reference = (
+            seconds(list_queue_parent_link, ast.parse(source))
+            if nodes <= arguments.reference_limit
+            else float('nan')
+        )
+        pointers = seconds(establish_parent_link, ast.parse(source))
+        tree = ast.parse(source)
+        side_table = seconds(
+            lambda tree: establish_parent_link(tree, dict()), tree
+        )
+        print("{:>10}{:>14.3f}{:>14.3f}{:>14.3f}".format(
+            len(list(ast.walk(tree))), reference, pointers, side_table
+        ))
+
+
+if __name__ == '__main__':
+    main()
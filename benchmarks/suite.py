@@ -0,0 +1,272 @@
+from arep.__about__ import __version__
+from arep.constraints import Action, Kind
+from arep.grepper import Grepper
+from arep.utils import (
+    annotate_tree, establish_parent_link, Knowledge_template,
+    update_knowledge_template
+)
+from benchmarks.synthetic import BLOCK_NODES, write_synthetic_source
+import argparse
+import ast
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+"""
+Timing and memory of every stage of a search on synthetic files, written as
+JSON so that runs on different commits can be compared with
+`benchmarks.compare`.
+
+What `Grepper.__init__` does is timed stage by stage (parsing, parent
+linking, learning the knowledge and the single pass that does all of them)
+and as a whole, separately from `Grepper.run`. `run` is timed for every
+validator class of `Validators/action.py` and `Validators/kind.py` on its
+own, with its knowledge learned beforehand so that only the traversal and the
+validator are timed.
+
+    python -m benchmarks.suite --nodes 1000 100000 1000000 -o before.json
+"""
+
+STAGES = ['parse', 'establish_parent_link', 'update_knowledge_template',
+          'annotate_tree', 'Grepper.__init__']
+
+
+def validator_addresses():
+    """
+    Returns
+    -------
+    [[str]]
+        The address of every constraint of `Action` and `Kind` e.g.
+        `['Action', 'Raising', 'Error']`, each of which has a validator
+        class.
+    """
+    def addresses(constraint):
+        for name in constraint.__itername__():
+            if name[0].isupper():
+                sub_constraint = getattr(constraint, name)
+                yield list(sub_constraint._address)
+                yield from addresses(sub_constraint)
+
+    return [
+        address
+        for template in [Action(), Kind()]
+        for address in addresses(template)
+    ]
+
+
+def considered(address):
+    """
+    Returns
+    -------
+    Action or Kind
+        That only considers the constraint of the address.
+    """
+    constraint = {'Action': Action, 'Kind': Kind}[address[0]]()
+    sub_constraint = constraint
+    for name in address[1:]:
+        sub_constraint = getattr(sub_constraint, name)
+    sub_constraint.consideration = True
+    return constraint
+
+
+def timings(function, repeat):
+    """
+    Calls `function` `repeat` times with the garbage collector disabled, like
+    `timeit` does, after setting up every call with a collection.
+
+    Returns
+    -------
+    {str: float}
+        The smallest and the median of the seconds that it took.
+    """
+    seconds = list()
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(repeat):
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            function()
+            seconds.append(time.perf_counter() - start)
+            gc.enable()
+    finally:
+        if not gc_was_enabled:
+            gc.disable()
+    return {'min': min(seconds), 'median': statistics.median(seconds)}
+
+
+def peak_bytes(function):
+    """
+    Returns
+    -------
+    int
+        The most memory that was allocated while calling `function`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def stage_functions(path, source):
+    """
+    Yields
+    ------
+    (str, function)
+        What each stage of `STAGES` does, starting from the source code. The
+        tree of a stage is only made once the previous stage is done with,
+        so that the largest files fit in memory.
+    """
+    yield 'parse', lambda: ast.parse(source)
+    tree = ast.parse(source)
+    yield 'establish_parent_link', lambda: establish_parent_link(tree)
+    yield 'update_knowledge_template', (
+        lambda: update_knowledge_template(tree, Knowledge_template())
+    )
+    tree = ast.parse(source)
+    yield 'annotate_tree', lambda: annotate_tree(tree, Knowledge_template())
+    del tree
+    yield 'Grepper.__init__', lambda: Grepper(path)
+
+
+def metadata():
+    """
+    Returns
+    -------
+    {str: str or int}
+        What a run depends on, so that only comparable runs are compared.
+    """
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'arep': __version__,
+        'commit': commit,
+        'python': sys.version,
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def benchmark(nodes, repeat, memory, validators, directory, log=None):
+    """
+    Parameters
+    ----------
+    nodes : int
+        Roughly the number of nodes of the synthetic file.
+    repeat : int
+    memory : bool
+        Whether to measure the peak memory of the stages as well.
+    validators : [[str]]
+        Addresses of the validators to time `run` with.
+    directory : str
+        Where the synthetic file is written.
+    log : file
+        Default is `None`. Progress is written to it, if given.
+
+    Yields
+    ------
+    {str: str or int or {str: float}}
+        The result of every benchmark.
+    """
+    path = write_synthetic_source(
+        os.path.join(directory, 'synthetic_{}.py'.format(nodes)),
+        max(1, nodes // BLOCK_NODES)
+    )
+    with open(path, 'r') as f:
+        source = f.read()
+    actual_nodes = sum(1 for _ in ast.walk(ast.parse(source)))
+    for stage, function in stage_functions(path, source):
+        if log is not None:
+            print("{} nodes: {}".format(actual_nodes, stage), file=log)
+        result = {
+            'benchmark': 'init.' + stage,
+            'nodes': actual_nodes,
+            'seconds': timings(function, repeat),
+        }
+        if memory:
+            result['peak_bytes'] = peak_bytes(function)
+        yield result
+    grepper = Grepper(path, lazy_knowledge=False)
+    for address in validators:
+        if log is not None:
+            print("{} nodes: run {}".format(actual_nodes, '.'.join(address)),
+                  file=log)
+        grepper.constraint_list[:] = [considered(address)]
+        plan = grepper.compile()
+        results = list()
+
+        def search():
+            results[:] = grepper.run(plan)
+
+        seconds = timings(search, repeat)
+        yield {
+            'benchmark': 'run.' + '.'.join(address),
+            'nodes': actual_nodes,
+            'seconds': seconds,
+            'results': len(results),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--nodes', type=int, nargs='+',
+                        default=[1000, 10000, 100000],
+                        help="Sizes of the synthetic files, up to 1000000.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Don't measure the peak memory.")
+    parser.add_argument('--validators', nargs='+', default=None,
+                        help="Only these e.g. Action.Raising.Error. Default "
+                             "is all of them.")
+    parser.add_argument('-o', '--output', default=None,
+                        help="Where the JSON is written. Default is the "
+                             "standard output.")
+    arguments = parser.parse_args()
+
+    validators = validator_addresses()
+    if arguments.validators is not None:
+        validators = [
+            address for address in validators
+            if '.'.join(address) in set(arguments.validators)
+        ]
+    # The deepest synthetic files are deeper than the default limit.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            result
+            for nodes in arguments.nodes
+            for result in benchmark(
+                nodes, arguments.repeat, not arguments.no_memory,
+                validators, directory, log=sys.stderr
+            )
+        ]
+    report = {'metadata': metadata(), 'results': results}
+    if arguments.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(arguments.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import textwrap
+
+"""
+Generators of synthetic python programs for the benchmarks.
+"""
+
+_BLOCK = textwrap.dedent('''
+    import os as os_{index}
+    from collections import defaultdict
+
+
+    @property
+    def function_{index}(a, b=1, *args, **kwargs):
+        total = a + b * {index}
+        for element in range(total):
+            if element % 3 == 0:
+                total -= element
+            elif element > 100:
+                break
+            else:
+                continue
+        while total > 0:
+            total //= 2
+        try:
+            values = [x ** 2 for x in args if x]
+        except (TypeError, ValueError) as e:
+            raise ValueError("bad arguments") from e
+        finally:
+            pass
+        return {{key: len(values) for key in kwargs}}
+
+
+    class Class_{index}(object):
+        scale = lambda self, x: x * {index}
+
+        def method(self, *items):
+            assert items, "no items"
+            with open(os_{index}.devnull) as handle:
+                yield from (handle.name for _ in items)
+
+
+    def helper_{index}(mapping):
+        global counter
+        first, *rest = mapping[0], {index}
+        table = dict(first=first)
+        del table['first']
+
+        def inner():
+            nonlocal first
+            first = int(first) + len(rest)
+        return inner
+''')
+
+
+# Number of nodes in the AST of a single block.
+BLOCK_NODES = 216
+
+
+def synthetic_source(blocks):
+    """
+    Parameters
+    ----------
+    blocks : int
+        Number of repetitions of a block of `BLOCK_NODES` nodes that uses most
+        of the constructs arep can search for.
+
+    Returns
+    -------
+    str
+    """
+    return ''.join(_BLOCK.format(index=index) for index in range(blocks))
+
+
+def write_synthetic_source(path, blocks):
+    """
+    Writes `synthetic_source(blocks)` to `path` and returns `path`.
+    """
+    with open(path, 'w') as f:
+        f.write(synthetic_source(blocks))
+    return path
@@ -0,0 +1,74 @@
+from arep.plan import validator_class
+from arep.utils import (
+    establish_parent_link, Knowledge_template, update_knowledge_template
+)
+from arep.Validators.forms import CompiledValidatorForm
+from benchmarks.synthetic import synthetic_source
+from functools import partial
+import argparse
+import ast
+import timeit
+
+"""
+Per-node cost of a validator called through `ValidatorForm` (which reflects on
+the argument lists on every call) against the same validator compiled once
+with `CompiledValidatorForm`.
+
+    python -m benchmarks.validator_form --blocks 50
+"""
+
+SPECIFICATIONS = [
+    (['Action', 'Raising', 'Error'], {'type_': ValueError,
+                                      'consideration': True}),
+    (['Action', 'Looping'], {'with_break': True, 'consideration': True}),
+    (['Kind', 'Functions'], {'is_builtin': False, 'consideration': True}),
+    (['Kind', 'Operations'], {'symbol': '+', 'consideration': True}),
+    (['Properties', 'Positional', 'Line_Numbers'],
+     {'minimum': 10, 'maximum': 500, 'consideration': True}),
+]
+
+
+def per_node_cost(predicate, nodes, knowledge, repeat):
+    """
+    Returns the best of `repeat` runs, in nanoseconds per node.
+    """
+    def scan():
+        for node in nodes:
+            predicate(node, knowledge)
+
+    return min(timeit.repeat(scan, number=1, repeat=repeat)) / len(nodes) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--blocks', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    arguments = parser.parse_args()
+
+    tree = establish_parent_link(
+        ast.parse(synthetic_source(arguments.blocks))
+    )
+    knowledge = update_knowledge_template(tree, Knowledge_template())
+    nodes = list(ast.walk(tree))
+    print("{} nodes".format(len(nodes)))
+    print("{:<40}{:>14}{:>14}{:>9}".format(
+        "validator", "reflected ns", "compiled ns", "speedup"
+    ))
+    for address, kwargs in SPECIFICATIONS:
+        cls = validator_class(address)
+        reflected = partial(cls, **kwargs)
+        before = per_node_cost(
+            lambda node, knowledge: reflected(node=node, knowledge=knowledge),
+            nodes, knowledge, arguments.repeat
+        )
+        after = per_node_cost(
+            CompiledValidatorForm(cls, **kwargs),
+            nodes, knowledge, arguments.repeat
+        )
+        print("{:<40}{:>14.0f}{:>14.0f}{:>8.1f}x".format(
+            '.'.join(address), before, after, before / after
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,20 @@
 from ..utils import action, results_formatter
 from functools import partial
 import arep
+import ast
 import pytest
 import os
 
 results_formatter = partial(results_formatter, name=os.path.basename(__file__))
 
-results_in_lambda = results_formatter(set([]))
+results_in_lambda = results_formatter({
+    (8, 17), (10, 15)
+})
 
 results_regular = results_formatter({
     (2, 4), (6, 8)
 })
 
-all_results = (results_regular | results_in_lambda)
-
 
 @pytest.fixture
 def grepper():
@@ -21,8 +22,17 @@ def grepper():
     return engine
 
 
-def test_Returning(grepper, action):
+@pytest.mark.parametrize(('in_lambda'), [True, False, None])
+def test_Returning(grepper, action, in_lambda):
     action.reset()
     action.Returning.consideration = True
+    action.Returning.in_lambda = in_lambda
     grepper.constraint_list.append(action)
-    assert set(grepper.all_results()) == all_results
+    if in_lambda:
+        results = results_in_lambda
+    else:
+        # The bodies of lambdas are only matched when asked for.
+        results = results_regular
+    assert set(grepper.all_results()) == results
+    if in_lambda is None:
+        assert grepper.compile().node_types == {ast.Return}
@@ -29,3 +29,44 @@ def test_neq(left, right):
 ])
 def test_lt(left, right):
     assert results_formatter(left) < results_formatter(right)
+
+
+@pytest.mark.parametrize(('left', 'right'), [
+    [("a", 2, 1), ("b", 1, 1)],
+    [("a.py", 9, 9), ("b/a.py", 1, 1)],
+])
+def test_lt_across_names(left, right):
+    assert results_formatter(left) < results_formatter(right)
+    assert not results_formatter(right) < results_formatter(left)
+
+
+def test_total_order():
+    results = [
+        arep.utils.Result(n, x, y)
+        for n in ["b", "a"] for x in [2, 1] for y in [3, 1]
+    ]
+    assert [tuple(result) for result in sorted(results)] == sorted(
+        (n, x, y) for n in ["b", "a"] for x in [2, 1] for y in [3, 1]
+    )
+
+
+def test_slots():
+    result = arep.utils.Result("a/b.py", 1, 2)
+    assert not hasattr(result, '__dict__')
+    assert repr(result) == "a/b_dot_py(Line=1, Column=2)"
+    assert str(result) == "a/b.py(Line=1, Column=2)"
+
+
+def test_result_set():
+    results = [
+        arep.utils.Result(n, x, y)
+        for n in ["b", "a", "b"] for x in [2, 1] for y in [3, 1]
+    ]
+    result_set = arep.utils.ResultSet(results)
+    assert len(result_set) == len(results)
+    assert list(result_set) == results
+    assert result_set[4] == results[4]
+    assert result_set.names == ["b", "a"]
+    assert result_set.lines.typecode == 'i'
+    result_set.sort()
+    assert list(result_set) == sorted(results)
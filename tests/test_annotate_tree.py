@@ -0,0 +1,59 @@
+from arep.constraints import Action, Kind
+from arep.utils import (
+    annotate_tree, establish_parent_link, Knowledge_template,
+    update_knowledge_template, node_type_index
+)
+from .utils import data_files, parsed
+import arep
+import pytest
+
+
+def coordinates(nodes):
+    return [
+        (type(node), getattr(node, 'lineno', None),
+         getattr(node, 'col_offset', None))
+        for node in nodes
+    ]
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_single_pass_matches_separate_passes(source):
+    separate_tree = establish_parent_link(parsed(source))
+    separate_knowledge = update_knowledge_template(
+        separate_tree, Knowledge_template()
+    )
+    separate_nodes, separate_index = node_type_index(separate_tree)
+
+    tree, knowledge, nodes, index = annotate_tree(
+        parsed(source), Knowledge_template()
+    )
+    assert coordinates(nodes) == coordinates(separate_nodes)
+    assert index == separate_index
+    assert all(
+        coordinates([node._parent]) == coordinates([separate_node._parent])
+        for node, separate_node in zip(nodes[1:], separate_nodes[1:])
+    )
+    assert knowledge.keys() == separate_knowledge.keys()
+    for name_kind in {'Function', 'Class', 'Decorator', 'Method'}:
+        if name_kind in knowledge:
+            assert {
+                name: sorted(coordinates(named), key=str)
+                for name, named in knowledge[name_kind].items()
+            } == {
+                name: sorted(coordinates(named), key=str)
+                for name, named in separate_knowledge[name_kind].items()
+            }
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_single_pass_grepper_matches_separate_passes(source):
+    action = Action()
+    action.Call.consideration = True
+    kind = Kind()
+    kind.Variables.is_argument = False
+    results = list()
+    for single_pass in {True, False}:
+        grepper = arep.Grepper(source, single_pass=single_pass)
+        grepper.constraint_list.extend([action, kind])
+        results.append(grepper.all_results())
+    assert results[0] == results[1]
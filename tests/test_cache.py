@@ -0,0 +1,99 @@
+from arep.cache import Parse_cache
+from arep.constraints import Action, Kind
+import arep
+import glob
+import os
+import pytest
+import time
+
+data_files = sorted(glob.glob(os.path.abspath('tests/data/Kind/*.py')))
+
+
+def constraints():
+    kind = Kind()
+    kind.Functions.consideration = True
+    action = Action()
+    action.Call.consideration = False
+    return [kind, action]
+
+
+def results(grepper):
+    grepper.constraint_list.extend(constraints())
+    try:
+        return grepper.all_results()
+    except KeyError:
+        # Eager knowledge lacks the name kinds that the file doesn't have.
+        return KeyError
+
+
+@pytest.mark.parametrize(('source'), data_files)
+@pytest.mark.parametrize(('parent_table'), [True, False])
+@pytest.mark.parametrize(('lazy_knowledge'), [True, False])
+def test_cached_grepper_matches_parsed_grepper(
+        tmpdir, monkeypatch, source, parent_table, lazy_knowledge):
+    cache = Parse_cache(str(tmpdir))
+    options = {'parent_table': parent_table,
+               'lazy_knowledge': lazy_knowledge}
+    parsed = results(arep.Grepper(source, cache=cache, **options))
+    assert len(os.listdir(str(tmpdir))) == 1
+
+    def parsing(*args, **kwargs):
+        raise AssertionError("Cached sources shouldn't be parsed")
+
+    monkeypatch.setattr(arep.grepper.ast, 'parse', parsing)
+    assert results(arep.Grepper(source, cache=cache, **options)) == parsed
+
+
+def test_key_changes_with_source_options_and_interpreter(
+        tmpdir, monkeypatch):
+    cache = Parse_cache(str(tmpdir))
+    key = cache.key("x = 1\n", parent_table=False)
+    assert key == cache.key("x = 1\n", parent_table=False)
+    assert key != cache.key("x = 2\n", parent_table=False)
+    assert key != cache.key("x = 1\n", parent_table=True)
+    monkeypatch.setattr(arep.cache.sys, 'version', 'another interpreter')
+    assert key != cache.key("x = 1\n", parent_table=False)
+
+
+def test_changed_file_is_parsed_again(tmpdir):
+    cache = Parse_cache(str(tmpdir.mkdir('cache')))
+    source = tmpdir.join('program.py')
+    source.write("def f():\n    pass\n")
+    assert len(results(arep.Grepper(str(source), cache=cache))) == 1
+    source.write("def f():\n    pass\n\n\ndef g():\n    pass\n")
+    assert len(results(arep.Grepper(str(source), cache=cache))) == 2
+
+
+def test_broken_entry_is_a_miss(tmpdir):
+    cache = Parse_cache(str(tmpdir))
+    key = cache.key("x = 1\n")
+    with open(os.path.join(str(tmpdir), key + '.pickle'), 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.load(key) is None
+    assert not os.listdir(str(tmpdir))
+
+
+def test_least_recently_used_entries_are_evicted(tmpdir):
+    entry = 'x' * 1000
+    cache = Parse_cache(str(tmpdir), max_bytes=3500)
+    for key in ['a', 'b', 'c']:
+        assert cache.store(key, entry)
+        time.sleep(0.01)
+    assert cache.load('a') == entry
+    time.sleep(0.01)
+    assert cache.store('d', entry)
+    assert cache.size() <= cache.max_bytes * Parse_cache.low_watermark
+    assert cache.load('b') is None
+    assert all(cache.load(key) == entry for key in ['a', 'c', 'd'])
+    assert not cache.store('too large', 'x' * 4000)
+
+
+@pytest.mark.parametrize(('workers'), [1, 2])
+def test_grepper_set_with_cache(tmpdir, workers):
+    directory = os.path.abspath('tests/data/Kind')
+    expected = list(arep.scan(directory, constraints(), workers=1))
+    for _ in range(2):
+        assert list(arep.scan(
+            directory, constraints(), workers=workers, cache=str(tmpdir)
+        )) == expected
+    assert len(os.listdir(str(tmpdir))) == len(data_files)
@@ -0,0 +1,136 @@
+from arep.__main__ import Main
+from arep.constraints import Action, Kind, Properties
+from arep.grepper_set import scan
+from arep.index import Inverted_index
+from arep.query import constraints_from_query, load_query, QueryError
+import json
+import os
+import pytest
+
+data_directory = os.path.abspath('tests/data')
+
+imports_query = {
+    'Action': {'Import': {'name': 'os'}},
+    'Properties': {'Positional': {'Line_Numbers': {'minimum': 2}}},
+}
+
+
+def imports_constraints():
+    action = Action()
+    action.Import.name = 'os'
+    properties = Properties()
+    properties.Positional.Line_Numbers.minimum = 2
+    return [action, properties]
+
+
+def expected(constraint_list):
+    return sorted(
+        (result.name, result.line, result.column)
+        for result in scan(data_directory, constraint_list,
+                           root=data_directory, workers=1)
+    )
+
+
+def test_query_matches_constraints():
+    assert expected(constraints_from_query(imports_query)) == expected(
+        imports_constraints()
+    )
+
+
+def test_query_expressions_and_types():
+    functions = Kind()
+    functions.Functions.consideration = True
+    classes = Kind()
+    classes.Classes.consideration = True
+    error = Action()
+    error.Raising.Error.type_ = ValueError
+    assert expected(constraints_from_query(
+        {'or': [{'Kind': {'Functions': {}}},
+                {'not': {'Kind': {'Classes': {}}}}]}
+    )) == expected([functions | ~classes])
+    assert expected(load_query(
+        'Action:\n  Raising:\n    Error:\n      type_: ValueError\n'
+    )) == expected([error])
+
+
+@pytest.mark.parametrize('query', [
+    {'Actions': {}},
+    {'Action': {'Import': {'title': 'os'}}},
+    {'Action': {'Import': 'os'}},
+    {'and': {'Kind': {}}},
+    {'not': {'Kind': {}}, 'Action': {}},
+    [],
+])
+def test_invalid_queries(query):
+    with pytest.raises(QueryError):
+        constraints_from_query(query)
+
+
+@pytest.mark.parametrize('output_format', ['grep', 'jsonl', 'null'])
+def test_search_output_formats(output_format, capfdbinary):
+    status = Main([
+        json.dumps(imports_query), data_directory, '--root', data_directory,
+        '-j', '1', '--format', output_format,
+    ])
+    output = capfdbinary.readouterr().out.decode('utf-8')
+    assert status == 0
+    if output_format == 'jsonl':
+        results = [
+            (result['name'], result['line'], result['column'])
+            for result in map(json.loads, output.splitlines())
+        ]
+    else:
+        separator = '\n' if output_format == 'grep' else '\0'
+        assert output.endswith(separator)
+        results = [
+            (name, int(line), int(column))
+            for name, line, column in (
+                result.rsplit(':', 2)
+                for result in output.split(separator)[:-1]
+            )
+        ]
+    assert sorted(results) == expected(imports_constraints())
+
+
+def test_search_with_workers_and_index(tmpdir, capfdbinary):
+    query_path = os.path.join(str(tmpdir), 'query.json')
+    with open(query_path, 'w') as f:
+        json.dump(imports_query, f)
+    index_path = os.path.join(str(tmpdir), 'index')
+    Inverted_index.build(
+        data_directory, root=data_directory, workers=1
+    ).save(index_path)
+    for arguments in [
+            ['search', query_path, data_directory, '-j', '2',
+             '--cache', os.path.join(str(tmpdir), 'cache')],
+            [query_path, '--index', index_path, '-j', '1'],
+    ]:
+        assert Main(arguments + ['--root', data_directory]) == 0
+        output = capfdbinary.readouterr().out.decode('utf-8')
+        assert sorted(
+            (name, int(line), int(column))
+            for name, line, column in (
+                result.rsplit(':', 2) for result in output.splitlines()
+            )
+        ) == expected(imports_constraints())
+
+
+def test_search_exit_statuses(capfdbinary):
+    nothing = {'Action': {'Import': {'name': 'no_such_module'}}}
+    assert Main([json.dumps(nothing), data_directory, '-j', '1']) == 1
+    assert capfdbinary.readouterr().out == b''
+    assert Main(['{"Nothing": {}}', data_directory]) == 2
+    assert b'Nothing' in capfdbinary.readouterr().err
+
+
+def test_search_exit_status_with_unparsable_files(tmpdir, capfdbinary):
+    directory = str(tmpdir)
+    with open(os.path.join(directory, 'a.py'), 'w') as f:
+        f.write('import os\n')
+    with open(os.path.join(directory, 'b.py'), 'w') as f:
+        f.write('import (\n')
+    query = json.dumps({'Action': {'Import': {'name': 'os'}}})
+    assert Main([query, directory, '--root', directory, '-j', '1']) == 2
+    captured = capfdbinary.readouterr()
+    assert captured.out.decode('utf-8').splitlines() == ['a.py:1:0']
+    assert b'b.py' in captured.err
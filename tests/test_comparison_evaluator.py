@@ -18,3 +18,37 @@ ops = arep.utils.ast_mapped_operators()
 ])
 def test_eq(args, result):
     assert ops[ast.Eq](*args) == result
+
+
+@pytest.mark.parametrize(('operation', 'args', 'result'), [
+    (ast.NotEq, [1, 2], True),
+    (ast.NotEq, [1, 1], False),
+    (ast.Gt, [2, 1], True),
+    (ast.Gt, [1, 1], False),
+    (ast.GtE, [1, 1], True),
+    (ast.NotIn, [1, [2]], True),
+    (ast.IsNot, [1, None], True),
+])
+def test_negated_operations(operation, args, result):
+    assert bool(ops[operation](*args)) == result
+
+
+def test_operator_tables_are_shared_and_read_only():
+    assert arep.utils.ast_mapped_operators() is ops
+    assert (arep.utils.ast_operation_symbols() is
+            arep.utils.ast_operation_symbols())
+    with pytest.raises(TypeError):
+        arep.utils.ast_operation_symbols()[ast.Add] = 'plus'
+
+
+@pytest.mark.parametrize(('symbol', 'operations'), [
+    ('-', {ast.Sub, ast.USub}),
+    ('**', {ast.Pow}),
+    ('not in', {ast.NotIn}),
+    ('or', {ast.Or}),
+    ('nonsense', set([])),
+])
+def test_ast_operation_types(symbol, operations):
+    assert arep.utils.ast_operation_types(symbol) == operations
+    for operation in operations:
+        assert arep.utils.ast_operation_symbols()[operation] == symbol
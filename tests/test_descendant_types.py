@@ -0,0 +1,48 @@
+from arep.utils import descendant_types, node_type_bits
+from .utils import data_files, parsed
+import arep
+import ast
+import pytest
+
+
+@pytest.mark.parametrize('source', data_files)
+def test_descendant_types(source):
+    tree = parsed(source)
+    nodes = list(ast.walk(tree))
+    masks = descendant_types(nodes)
+    for node in nodes:
+        assert masks[node] == node_type_bits({
+            type(descendant) for descendant in ast.walk(node)
+            if descendant is not node
+        })
+
+
+def test_node_type_bits():
+    class Custom(ast.AST):
+        pass
+
+    assert node_type_bits(set()) == 0
+    assert node_type_bits({ast.Call}) & node_type_bits({ast.Call, ast.Raise})
+    assert not node_type_bits({ast.Call}) & node_type_bits({ast.Raise})
+    assert not node_type_bits({Custom}) & node_type_bits(
+        {ast.Call, ast.Raise}
+    )
+
+
+@pytest.mark.parametrize('source', data_files)
+@pytest.mark.parametrize('candidate_types', [
+    None, {ast.Raise}, {ast.Call, ast.Yield}, {ast.Break}, {ast.Module},
+])
+@pytest.mark.parametrize(('first', 'last'), [(None, None), (2, 9)])
+def test_pruned_traversal(source, candidate_types, first, last):
+    parsed(source)
+    grepper = arep.Grepper(source)
+    spans = grepper.get_knowledge()['spans']
+    assert list(
+        grepper._nodes_within_lines(first, last, candidate_types)
+    ) == [
+        node for node in grepper._candidate_nodes(candidate_types)
+        if node in spans and
+        (first is None or first <= spans[node][1]) and
+        (last is None or spans[node][0] <= last)
+    ]
@@ -0,0 +1,138 @@
+from arep.constraints import (
+    Kind, Properties, Constraint_expression, _Kind_Node_Types
+)
+from arep.plan import (
+    compile_expression, compile_plan, specs_key, validator_specs_deriver,
+    _expression_dag
+)
+from .utils import data_files
+import arep
+import glob
+import os
+import pytest
+
+
+def functions():
+    kind = Kind()
+    kind.Functions.consideration = True
+    return kind
+
+
+def classes():
+    kind = Kind()
+    kind.Classes.consideration = True
+    return kind
+
+
+def early_lines():
+    properties = Properties()
+    properties.Positional.Line_Numbers.maximum = 10
+    return properties
+
+
+def results(source, *constraints):
+    grepper = arep.Grepper(source)
+    grepper.constraint_list.extend(constraints)
+    return grepper.all_results()
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_or_and_not_match_separate_searches(source):
+    everything = set(results(source))
+    separate_functions = set(results(source, functions()))
+    separate_classes = set(results(source, classes()))
+    separate_early = set(results(source, early_lines()))
+    assert set(results(source, functions() | classes())) == (
+        separate_functions | separate_classes
+    )
+    assert set(results(source, (functions() | classes()) & early_lines())) == (
+        (separate_functions | separate_classes) & separate_early
+    )
+    negated = set(results(source, ~functions()))
+    assert negated | separate_functions == everything
+    assert set(results(source, ~~functions())) == separate_functions
+    assert set(results(source, functions() | ~functions())) == everything
+
+
+def test_parts_of_constraints_are_operands():
+    kind = Kind()
+    kind.Functions.consideration = True
+    kind.Classes.consideration = True
+    properties = early_lines()
+    expression = (kind.Functions | kind.Classes) & properties.Positional
+    assert isinstance(expression, Constraint_expression)
+    (expression_specs,) = validator_specs_deriver([expression])
+    (either, positional) = expression_specs.operands
+    assert [specs.address for (specs,) in either.operands] == [
+        ['Kind', 'Functions'], ['Kind', 'Classes']
+    ]
+    assert [specs.address for specs in positional] == [
+        ['Properties', 'Positional', 'Line_Numbers']
+    ]
+    node_types = compile_plan([expression]).node_types
+    assert node_types == (_Kind_Node_Types()['Functions'] |
+                          _Kind_Node_Types()['Classes'])
+
+
+def test_only_constraints_can_be_combined():
+    with pytest.raises(AssertionError):
+        Constraint_expression('and', (functions(), 'Functions'))
+    with pytest.raises(AssertionError):
+        Constraint_expression('xor', (functions(), classes()))
+
+
+def test_equal_subexpressions_are_one_node():
+    first = (functions() | classes()) & ~~(classes() | functions())
+    (first_specs,) = validator_specs_deriver([first])
+    root_key, dag = _expression_dag(first_specs)
+    assert root_key[0] == 'or'
+    assert len(dag) == 3
+    (second_specs,) = validator_specs_deriver([
+        (functions() & early_lines()) | (early_lines() & functions())
+    ])
+    root_key, dag = _expression_dag(second_specs)
+    assert root_key[0] == 'and'
+
+
+def test_validators_are_evaluated_once_per_node():
+    evaluations = []
+
+    def counted(name):
+        def predicate(node, knowledge):
+            evaluations.append(name)
+            return name == 'functions'
+        predicate.cost = 1
+        return predicate
+
+    expression = (
+        (functions() & ~classes()) | (classes() & early_lines()) |
+        (~classes() & ~functions())
+    )
+    (expression_specs,) = validator_specs_deriver([expression])
+    compiled_predicates = {
+        specs_key(specs): counted(specs.address[1])
+        for (specs,) in [
+            validator_specs_deriver([constraint])[0]
+            for constraint in [functions(), classes(), early_lines()]
+        ]
+    }
+    predicate = compile_expression(expression_specs, compiled_predicates)
+    assert predicate(None, None) is True
+    assert sorted(evaluations) == sorted(set(evaluations))
+
+
+@pytest.mark.parametrize(('workers'), [1, 2])
+def test_expressions_in_grepper_set(workers):
+    directory = os.path.abspath('tests/data/Kind')
+    expression = (functions() | classes()) & early_lines()
+    expected = []
+    for source in sorted(glob.glob(os.path.join(directory, '*.py'))):
+        expected += [
+            (os.path.relpath(source, directory), result.line, result.column)
+            for result in results(source, expression)
+        ]
+    assert [
+        (result.name, result.line, result.column)
+        for result in arep.scan(directory, [expression], root=directory,
+                                workers=workers)
+    ] == expected
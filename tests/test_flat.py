@@ -0,0 +1,107 @@
+from arep.constraints import Action, Kind, Properties
+from arep.flat import FlatAST, MISSING, numpy
+from .utils import data_files
+import arep
+import ast
+import pytest
+
+backends = [False] + ([True] if numpy is not None else [])
+
+assigned_lambda = """
+f = lambda x: x
+
+print(f(3))
+"""
+
+
+def constraint_lists():
+    call = Action()
+    call.Call.consideration = True
+    lines = Properties()
+    lines.Positional.Line_Numbers.minimum = 3
+    lines.Positional.Line_Numbers.maximum = 40
+    columns = Properties()
+    columns.Positional.Column_Numbers.maximum = 4
+    named_function = Kind()
+    named_function.Functions.name = 'f'
+    # Also the name of assigned lambdas in some of the data files.
+    named_x = Kind()
+    named_x.Functions.name = 'x'
+    named_class = Kind()
+    named_class.Classes.name = 'A'
+    inconsistent = Properties()
+    inconsistent.Positional.Line_Numbers.minimum = 5
+    inconsistent.Positional.Line_Numbers.maximum = 4
+    indifferent = Properties()
+    indifferent.Positional.Line_Numbers.consideration = True
+    negated = Properties()
+    negated.Positional.Line_Numbers.minimum = 3
+    negated.Positional.Line_Numbers.consideration = False
+    return [
+        [call, lines], [columns], [named_function], [named_x],
+        [named_class, lines],
+        [inconsistent], [indifferent], [negated], [call | named_function],
+    ]
+
+
+@pytest.mark.parametrize('source', data_files)
+def test_flat_run_matches_run(source):
+    try:
+        plain = arep.Grepper(source)
+        flat = arep.Grepper(source, flat=True)
+    except SyntaxError:
+        pytest.skip("Not parsable by this version of Python")
+    for constraint_list in constraint_lists():
+        plain.constraint_list[:] = constraint_list
+        flat.constraint_list[:] = constraint_list
+        assert flat.all_results() == plain.all_results()
+
+
+def test_flat_run_matches_run_for_assigned_lambda(tmp_path):
+    path = tmp_path / 'assigned_lambda.py'
+    path.write_text(assigned_lambda)
+    named_function = Kind()
+    named_function.Functions.name = 'f'
+    plain = arep.Grepper(str(path))
+    flat = arep.Grepper(str(path), flat=True)
+    for grepper in [plain, flat]:
+        grepper.constraint_list.append(named_function)
+    assert [(result.line, result.column)
+            for result in plain.all_results()] == [(2, 4), (4, 6)]
+    assert flat.all_results() == plain.all_results()
+
+
+@pytest.mark.parametrize('use_numpy', backends)
+def test_columns(use_numpy):
+    tree = ast.parse("def f(a):\n    return a.b + g(a)\n")
+    nodes = list(ast.walk(tree))
+    flat_ast = FlatAST(nodes, use_numpy=use_numpy)
+    assert len(flat_ast) == len(nodes)
+    for position, node in enumerate(nodes):
+        assert flat_ast.types[flat_ast.type_id[position]] is type(node)
+        parent = flat_ast.parent[position]
+        if parent == -1:
+            assert node is tree
+            assert flat_ast.depth[position] == 0
+        else:
+            assert node in list(ast.iter_child_nodes(nodes[parent]))
+            assert flat_ast.depth[position] == flat_ast.depth[parent] + 1
+        assert flat_ast.lineno[position] == getattr(node, 'lineno', MISSING)
+        assert flat_ast.end_col_offset[position] == getattr(
+            node, 'end_col_offset', MISSING
+        )
+    names = [
+        nodes[position]
+        for position in flat_ast.positions([
+            flat_ast.identifier_mask({'a', 'f'}),
+            flat_ast.range_mask('col_offset', 4, 100),
+        ])
+    ]
+    assert [type(node) for node in names] == [ast.arg, ast.Name, ast.Name]
+    assert list(flat_ast.positions([
+        flat_ast.type_mask({ast.Call, ast.Attribute}),
+    ])) == [
+        position for position, node in enumerate(nodes)
+        if type(node) in {ast.Call, ast.Attribute}
+    ]
+    assert list(flat_ast.positions([])) == list(range(len(nodes)))
@@ -0,0 +1,127 @@
+from arep.constraints import Action, Properties
+from arep.utils import Result
+import arep
+import glob
+import os
+import pytest
+
+data_directory = os.path.abspath('tests/data')
+data_files = sorted(glob.glob(os.path.join(data_directory, '*/*.py')))
+
+
+def constraints():
+    action = Action()
+    action.Call.consideration = True
+    properties = Properties()
+    properties.Positional.Line_Numbers.minimum = 2
+    return [action, properties]
+
+
+def grepped_separately():
+    results = set([])
+    errors = set([])
+    for source in data_files:
+        name = os.path.relpath(source, data_directory)
+        try:
+            grepper = arep.Grepper(source)
+        except SyntaxError:
+            errors.add(name)
+            continue
+        grepper.constraint_list.extend(constraints())
+        results |= {
+            Result(name, result.line, result.column)
+            for result in grepper.run()
+        }
+    return results, errors
+
+
+@pytest.mark.parametrize(('workers', 'chunksize'), [(1, 1), (2, 3)])
+def test_grepper_set_matches_separate_greppers(workers, chunksize):
+    results, errors = grepped_separately()
+    assert results
+    grepper_set = arep.GrepperSet(
+        data_directory, root=data_directory, workers=workers,
+        chunksize=chunksize
+    )
+    grepper_set.constraint_list.extend(constraints())
+    found = grepper_set.all_results()
+    assert len(found) == len(set(found))
+    assert set(found) == results
+    assert set(grepper_set.errors) == errors
+    assert all(isinstance(error, SyntaxError)
+               for error in grepper_set.errors.values())
+
+
+def test_results_are_streamed_in_file_order():
+    names = [
+        result.name
+        for result in arep.scan([data_directory], constraints(),
+                                root=data_directory, workers=2)
+    ]
+    file_order = [os.path.relpath(source, data_directory)
+                  for source in data_files]
+    assert names == sorted(names, key=file_order.index)
+
+
+def test_names_are_relative_to_the_working_directory(monkeypatch):
+    monkeypatch.chdir(os.path.dirname(data_directory))
+    source = os.path.join('data', 'Action', 'Call.py')
+    results = list(arep.scan(source, constraints(), workers=1))
+    assert results
+    assert {result.name for result in results} == {source}
+
+
+def test_result_set():
+    grepper_set = arep.GrepperSet(data_directory, root=data_directory,
+                                  workers=1)
+    grepper_set.constraint_list.extend(constraints())
+    result_set = grepper_set.result_set()
+    assert list(result_set) == grepper_set.all_results()
+    assert len(result_set.names) == len(set(
+        result.name for result in result_set
+    ))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_unreadable_files_are_errors(tmp_path, workers):
+    (tmp_path / 'a.py').write_text("f()\n")
+    os.symlink(str(tmp_path / 'missing.py'), str(tmp_path / 'b.py'))
+    grepper_set = arep.GrepperSet(str(tmp_path), root=str(tmp_path),
+                                  workers=workers)
+    grepper_set.constraint_list.extend(constraints()[:1])
+    assert grepper_set.all_results() == [Result('a.py', 1, 0)]
+    assert set(grepper_set.errors) == {'b.py'}
+
+
+def test_parallel_search_on_pythons_without_cancel_futures(monkeypatch):
+    monkeypatch.setattr(arep.grepper_set, '_CAN_CANCEL_FUTURES', False)
+    results = arep.scan([data_directory], constraints(),
+                        root=data_directory, workers=2)
+    assert next(results)
+    results.close()
+
+
+def test_files_are_found_as_they_are_searched(monkeypatch):
+    found = list()
+
+    def source_paths(self):
+        for source in data_files:
+            found.append(source)
+            yield source
+
+    monkeypatch.setattr(arep.GrepperSet, 'source_paths', source_paths)
+    grepper_set = arep.GrepperSet(data_directory, root=data_directory,
+                                  workers=2, chunksize=1)
+    grepper_set.constraint_list.extend(constraints())
+    results = grepper_set.run()
+    first = data_files.index(
+        os.path.join(data_directory, next(results).name)
+    )
+    # Every chunk that's awaited sends another one ahead.
+    sent_ahead = 2 * arep.grepper_set._CHUNKS_PER_WORKER
+    assert len(found) == min(first + 1 + sent_ahead, len(data_files))
+    assert len(found) < len(data_files)
+    results.close()
+    assert grepper_set.all_results() == list(arep.scan(
+        data_directory, constraints(), root=data_directory, workers=1
+    ))
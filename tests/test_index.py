@@ -0,0 +1,135 @@
+from arep.__main__ import Main
+from arep.constraints import Action, Kind, Properties
+from arep.index import Inverted_index, file_terms
+import arep
+import ast
+import os
+import pytest
+import shutil
+
+data_directory = os.path.abspath('tests/data')
+
+
+def constraint(category, address, **specifications):
+    instance = {'Action': Action, 'Kind': Kind,
+                'Properties': Properties}[category]()
+    target = instance
+    for name in address.split('.'):
+        target = getattr(target, name)
+    for key, value in specifications.items():
+        setattr(target, key, value)
+    return instance
+
+
+queries = [
+    [constraint('Action', 'Import', name='os')],
+    [constraint('Action', 'Import.From', name='os')],
+    [constraint('Action', 'Import.As', name='np')],
+    [constraint('Action', 'Raising', consideration=True)],
+    [constraint('Action', 'Looping', with_break=True)],
+    [constraint('Kind', 'Functions', name='f')],
+    [constraint('Kind', 'Classes', name='Something')],
+    [constraint('Kind', 'Variables', name='x')],
+    [constraint('Kind', 'Operations', symbol='+')],
+    [constraint('Kind', 'Operations', symbol='not in')],
+    [constraint('Action', 'Call', consideration=True),
+     constraint('Properties', 'Positional.Line_Numbers', minimum=3)],
+]
+
+
+@pytest.fixture(scope='module')
+def index():
+    return Inverted_index.build(data_directory, root=data_directory,
+                                workers=1)
+
+
+def test_file_terms():
+    terms = file_terms(ast.parse(
+        "import numpy as np\nfrom os import path\n"
+        "def f(x):\n    return x + 1 not in y\n"
+    ))
+    assert {
+        'type:Import', 'type:FunctionDef', 'import:numpy', 'as:np',
+        'from:os', 'import:path', 'identifier:f', 'identifier:x',
+        'identifier:y', 'operator:Add', 'operator:NotIn'
+    } <= terms
+
+
+@pytest.mark.parametrize(('query'), queries)
+def test_indexed_search_matches_scan(index, query):
+    assert list(index.search(query, workers=1)) == list(arep.scan(
+        data_directory, query, root=data_directory, workers=1
+    ))
+
+
+def test_selective_queries_have_few_candidates(index):
+    broken = {index.files[file_id] for file_id in index.broken}
+    assert set(index.candidate_files(queries[0])) - broken == {
+        os.path.join('Action', 'Import.py')
+    }
+    assert set(index.candidate_files([
+        constraint('Action', 'Import', name='not_imported_anywhere')
+    ])) == broken
+    assert len(index.candidate_files([Action()])) == len(index.files)
+
+
+def test_stale_files_are_candidates(tmpdir):
+    directory = str(tmpdir.join('data'))
+    shutil.copytree(os.path.join(data_directory, 'Action'), directory)
+    index = Inverted_index.build(directory, root=directory, workers=1)
+    query = [constraint('Action', 'Import', name='zipimport')]
+    assert not list(index.search(query, workers=1))
+    with open(os.path.join(directory, 'Passing.py'), 'a') as f:
+        f.write("\nimport zipimport\n")
+    os.utime(os.path.join(directory, 'Passing.py'), ns=(0, 0))
+    assert index.stale_files() == {index.files.index('Passing.py')}
+    assert [result.name for result in index.search(query, workers=1)] == [
+        'Passing.py'
+    ]
+
+
+def test_unparsable_files_are_candidates(tmpdir, capfd):
+    directory = str(tmpdir)
+    with open(os.path.join(directory, 'a.py'), 'w') as f:
+        f.write('import os\n')
+    with open(os.path.join(directory, 'b.py'), 'w') as f:
+        f.write('import (\n')
+    index = Inverted_index.build(directory, root=directory, workers=1)
+    assert index.broken == {index.files.index('b.py')}
+    query = [constraint('Action', 'Import', name='zipimport')]
+    assert index.candidate_files(query) == ['b.py']
+    path = os.path.join(directory, 'index')
+    index.save(path)
+    assert Main(['{"Action": {"Import": {"name": "os"}}}', '--index', path,
+                 '-j', '1']) == 2
+    captured = capfd.readouterr()
+    assert captured.out.splitlines() == ['a.py:1:0']
+    assert 'b.py' in captured.err
+
+
+def test_index_is_saved_and_loaded(tmpdir, index):
+    path = str(tmpdir.join('index'))
+    index.save(path)
+    loaded = Inverted_index.load(path)
+    assert loaded.root == index.root
+    assert loaded.files == index.files
+    assert loaded.postings == index.postings
+    assert loaded.broken == index.broken
+
+
+def test_index_of_another_python_is_rejected(tmpdir, monkeypatch, index):
+    path = str(tmpdir.join('index'))
+    index.save(path)
+    monkeypatch.setattr(arep.index.sys, 'version', 'another interpreter')
+    with pytest.raises(ValueError):
+        Inverted_index.load(path)
+
+
+@pytest.mark.parametrize(('jobs'), ['1', '2'])
+def test_index_build_command(tmpdir, index, jobs):
+    path = str(tmpdir.join('index'))
+    assert Main([
+        'index', 'build', data_directory, '--root', data_directory,
+        '--output', path, '-j', jobs
+    ]) == 0
+    assert Inverted_index.load(path).postings == index.postings
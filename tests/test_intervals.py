@@ -0,0 +1,82 @@
+from arep.constraints import Action, Properties
+from arep.intervals import Interval_index
+from .utils import data_files, parsed
+import arep
+import ast
+import os
+import pytest
+
+line_ranges = [range(1, 6), range(3, 4), range(10, 200), range(7, 2)]
+
+
+@pytest.mark.parametrize('source', data_files)
+def test_interval_index(source):
+    nodes = list(ast.walk(parsed(source)))
+    index = Interval_index(nodes)
+    positioned = [
+        (position, node) for position, node in enumerate(nodes)
+        if hasattr(node, 'lineno')
+    ]
+    last_line = max([node.end_lineno for _, node in positioned] or [0])
+    for line in range(0, last_line + 2):
+        assert index.enclosing(line) == [
+            position for position, node in positioned
+            if node.lineno <= line <= node.end_lineno
+        ]
+    for first, last in [(None, None), (3, 9), (None, 4), (5, None), (6, 2)]:
+        assert index.starting_within(first, last) == [
+            position for position, node in positioned
+            if (first is None or first <= node.lineno) and
+            (last is None or node.lineno <= last)
+        ]
+
+
+@pytest.mark.parametrize('source', data_files)
+@pytest.mark.parametrize('flat', [False, True])
+def test_run_by_lines(source, flat):
+    parsed(source)
+    grepper = arep.Grepper(source, flat=flat)
+    call = Action()
+    call.Call.consideration = True
+    window = Properties()
+    window.Positional.Line_Numbers.minimum = 4
+    window.Positional.Line_Numbers.maximum = 30
+    for constraint_list in [[], [call], [call, window]]:
+        grepper.constraint_list[:] = constraint_list
+        everything = grepper.all_results()
+        for lines in line_ranges:
+            assert grepper.all_results(lines=lines) == [
+                result for result in everything if result.line in lines
+            ]
+        # Once the index is there, the positional constraints use it.
+        assert grepper.all_results() == everything
+
+
+def test_enclosing_nodes():
+    source = os.path.abspath('tests/data/Action/Looping.py')
+    tree = parsed(source)
+    grepper = arep.Grepper(source)
+    for line in range(1, 12):
+        assert [
+            (type(node), node.lineno, node.col_offset)
+            for node in grepper.enclosing_nodes(line)
+        ] == [
+            (type(node), node.lineno, node.col_offset)
+            for node in ast.walk(tree)
+            if hasattr(node, 'lineno') and
+            node.lineno <= line <= node.end_lineno
+        ]
+
+
+@pytest.mark.parametrize('flat', [False, True])
+def test_empty_file(tmp_path, flat):
+    path = tmp_path / '__init__.py'
+    path.write_text('')
+    grepper = arep.Grepper(str(path), flat=flat)
+    call = Action()
+    call.Call.consideration = True
+    grepper.constraint_list[:] = [call]
+    assert list(grepper.run(lines=range(1, 2))) == []
+    assert grepper.all_results(lines=range(1, 2)) == []
+    assert grepper.enclosing_nodes(1) == []
+    assert Interval_index([]).enclosing(1) == []
@@ -0,0 +1,158 @@
+from arep.constraints import Action, Kind, Properties
+from arep.plan import compile_plan
+from arep.utils import (
+    establish_parent_link, Knowledge_template, Lazy_knowledge
+)
+from .utils import data_files
+import arep
+import ast
+import os
+import pytest
+
+program = """
+class A(object):
+    def f(self, x):
+        return [lambda y: x + y for _ in range(x)]
+"""
+
+
+def test_builtin_knowledge_is_shared():
+    first, second = Knowledge_template(), Knowledge_template()
+    assert first is not second
+    assert first['builtins'] is second['builtins']
+    assert first['comprehension_forms'] is second['comprehension_forms']
+
+
+def test_builtin_knowledge_is_frozen():
+    knowledge = Knowledge_template()
+    with pytest.raises(TypeError):
+        knowledge['builtins']['all'] = set([])
+    with pytest.raises(AttributeError):
+        knowledge['builtins']['types'].add(object)
+
+
+def test_builtin_knowledge():
+    builtins = Knowledge_template()['builtins']
+    assert {'print', 'len', 'self', 'lambda'} <= builtins['all']
+    assert {int, str, dict} <= builtins['types']
+    assert {'int', 'str', 'dict'} <= builtins['type_names']
+    assert ast.ListComp in Knowledge_template()['comprehension_forms']
+
+
+def test_per_file_knowledge_doesnt_leak():
+    classes = arep.Grepper(os.path.abspath('tests/data/Kind/Classes.py'))
+    passing = arep.Grepper(os.path.abspath('tests/data/Action/Passing.py'))
+    assert classes.get_knowledge()['Class']
+    assert not passing.get_knowledge()['Class']
+    assert 'Class' not in Knowledge_template()
+
+
+def test_knowledge_is_learned_on_demand():
+    tree = establish_parent_link(ast.parse(program))
+    knowledge = Lazy_knowledge(list(ast.walk(tree)))
+    assert not set(knowledge.maps[0])
+    assert set(knowledge['Class']) == {'A'}
+    assert set(knowledge.maps[0]) == {'Class'}
+    assert set(knowledge['Method']) == {'f'}
+    assert not knowledge['Decorator']
+    # Methods are found through the scopes.
+    assert set(knowledge.maps[0]) == {
+        'Class', 'Method', 'Decorator', 'scopes'
+    }
+    with pytest.raises(KeyError):
+        knowledge['nonsense']
+
+
+@pytest.mark.parametrize(('category', 'address', 'keys'), [
+    ('Action', 'Import', set([])),
+    ('Action', 'Instantiation', {'Class'}),
+    ('Kind', 'Classes', {'Class'}),
+    ('Kind', 'Variables', {'Function'}),
+    ('Kind', 'Functions.Lambda', {'Method'}),
+    ('Properties', 'Positional.Line_Numbers', set([])),
+])
+def test_plan_requires_only_the_knowledge_it_reads(category, address, keys):
+    constraint = {'Action': Action, 'Kind': Kind,
+                  'Properties': Properties}[category]()
+    target = constraint
+    for name in address.split('.'):
+        target = getattr(target, name)
+    target.consideration = True
+    assert compile_plan([constraint]).knowledge_keys == keys
+
+
+def test_import_query_skips_knowledge(monkeypatch):
+    grepper = arep.Grepper(os.path.abspath('tests/data/Action/Import.py'))
+
+    def learning(*args):
+        raise AssertionError("Knowledge shouldn't be learned")
+
+    monkeypatch.setattr(arep.utils, '_check_names', learning)
+    action = Action()
+    action.Import.name = 'os'
+    grepper.constraint_list.append(action)
+    assert grepper.all_results()
+
+
+def test_named_nodes_are_identity_sets():
+    tree = establish_parent_link(ast.parse(program))
+    knowledge = Lazy_knowledge(list(ast.walk(tree)))
+    method_lambdas = knowledge['Method'].get(ast.Lambda, set([]))
+    assert type(knowledge['Method']['f']) is set
+    assert not method_lambdas
+    # Looking up a name that isn't known doesn't add it.
+    assert 'g' not in knowledge['Method']
+    assert knowledge['Method'].get('g') is None
+    assert 'g' not in knowledge['Method']
+
+
+def test_lambdas_with_many_method_lambdas():
+    lambdas = 500
+    source = "class A(object):\n    fs = [{}]\n\ngs = [{}]\n".format(
+        ", ".join(["lambda self: self"] * lambdas),
+        ", ".join(["lambda x: x"] * lambdas),
+    )
+    tree = establish_parent_link(ast.parse(source))
+    nodes = list(ast.walk(tree))
+    knowledge = Lazy_knowledge(nodes)
+    assert len(knowledge['Method'][ast.Lambda]) == lambdas
+    kind = Kind()
+    kind.Functions.Lambda.consideration = True
+    plan = compile_plan([kind])
+    assert sum(
+        all(predicate(node, knowledge) for predicate in plan.predicates)
+        for node in nodes
+    ) == lambdas
+
+
+def named_knowledge_constraints():
+    for category, address, specification, value in [
+            (Kind, 'Functions', 'consideration', True),
+            (Kind, 'Functions', 'name', 'f'),
+            (Kind, 'Functions.Decorators', 'consideration', True),
+            (Kind, 'Functions.Lambda', 'consideration', True),
+            (Kind, 'Classes', 'consideration', True),
+            (Kind, 'Classes', 'name', 'A'),
+            (Kind, 'Variables', 'consideration', True),
+            (Action, 'Instantiation', 'consideration', True),
+    ]:
+        constraint = category()
+        target = constraint
+        for name in address.split('.'):
+            target = getattr(target, name)
+        setattr(target, specification, value)
+        yield constraint
+
+
+@pytest.mark.parametrize('source', data_files)
+def test_eager_and_lazy_knowledge_agree(source):
+    try:
+        lazy = arep.Grepper(source)
+        eager = arep.Grepper(source, lazy_knowledge=False)
+    except SyntaxError:
+        pytest.skip("Not parsable by this version of Python")
+    assert set(Lazy_knowledge.name_kinds) <= set(eager.get_knowledge())
+    for constraint in named_knowledge_constraints():
+        lazy.constraint_list[:] = [constraint]
+        eager.constraint_list[:] = [constraint]
+        assert eager.all_results() == lazy.all_results()
@@ -0,0 +1,33 @@
+from arep.constraints import Action, Kind
+from arep.utils import node_type_index
+from .utils import addresses, data_files
+import arep
+import ast
+import pytest
+
+
+def test_node_type_index_order():
+    tree = ast.parse("def f(x):\n    return [x for x in range(x)]\n")
+    nodes, index = node_type_index(tree)
+    assert nodes == list(ast.walk(tree))
+    for node_type, positions in index.items():
+        assert positions == sorted(positions)
+        assert all(type(nodes[position]) is node_type
+                   for position in positions)
+
+
+@pytest.mark.parametrize(('source'), data_files)
+@pytest.mark.parametrize(('category', 'address'), addresses)
+def test_indexed_run_matches_full_walk(source, category, address):
+    constraint = {'Action': Action, 'Kind': Kind}[category]()
+    target = constraint
+    for name in address.split('.'):
+        target = getattr(target, name)
+    target.consideration = True
+
+    grepper = arep.Grepper(source)
+    grepper.constraint_list.append(constraint)
+    plan = grepper.compile()
+    assert plan.node_types is not None
+    walked = grepper.all_results(plan._replace(node_types=None))
+    assert grepper.all_results(plan) == walked
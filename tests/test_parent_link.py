@@ -0,0 +1,63 @@
+from arep.constraints import Action, Kind
+from arep.utils import establish_parent_link, parent
+from .utils import addresses, data_files
+import arep
+import ast
+import pytest
+
+program = """
+class A(object):
+    def f(self, x):
+        return [lambda y: x + y for _ in range(x)]
+"""
+
+
+def children(node):
+    # Expression contexts and operators such as ast.Load and ast.Add are
+    # shared between all the nodes of all trees, so they don't have a single
+    # parent.
+    return [
+        child for child in ast.iter_child_nodes(node)
+        if not isinstance(child, (
+            ast.expr_context, ast.operator, ast.boolop, ast.unaryop,
+            ast.cmpop
+        ))
+    ]
+
+
+def test_parent_pointers():
+    tree = establish_parent_link(ast.parse(program))
+    assert not hasattr(tree, "_parent")
+    for node in ast.walk(tree):
+        for child in children(node):
+            assert child._parent is node
+
+
+def test_parent_side_table_leaves_the_tree_unmodified():
+    parents = dict()
+    tree = establish_parent_link(ast.parse(program), parents)
+    knowledge = {'parents': parents}
+    for node in ast.walk(tree):
+        for child in children(node):
+            assert not hasattr(child, "_parent")
+            assert parent(child, knowledge) is node
+    with pytest.raises(AttributeError):
+        parent(tree, knowledge)
+
+
+@pytest.mark.parametrize(('source'), data_files)
+@pytest.mark.parametrize(('category', 'address'), addresses)
+def test_parent_table_grepper_matches_parent_pointers(source, category,
+                                                      address):
+    constraint = {'Action': Action, 'Kind': Kind}[category]()
+    target = constraint
+    for name in address.split('.'):
+        target = getattr(target, name)
+    target.consideration = True
+
+    results = list()
+    for parent_table in (False, True):
+        grepper = arep.Grepper(source, parent_table=parent_table)
+        grepper.constraint_list.append(constraint)
+        results.append(grepper.all_results())
+    assert results[0] == results[1]
@@ -0,0 +1,105 @@
+from arep.constraints import Action, Properties
+from arep.plan import (
+    compile_plan, plan_window, Positional_window, positional_window,
+    validator_specs_deriver
+)
+from arep.utils import subtree_spans
+from .utils import data_files
+import arep
+import ast
+import pytest
+
+windows = [(1, 5), (3, 3), (10, None), (None, 4), (6, 2), (None, None)]
+
+
+def lines(minimum, maximum):
+    properties = Properties()
+    properties.Positional.Line_Numbers.consideration = True
+    if minimum is not None:
+        properties.Positional.Line_Numbers.minimum = minimum
+    if maximum is not None:
+        properties.Positional.Line_Numbers.maximum = maximum
+    return properties
+
+
+def expected(tree, minimum, maximum, node_types=None):
+    return [
+        (node.lineno, node.col_offset)
+        for node in ast.walk(tree)
+        if hasattr(node, 'lineno') and
+        (minimum is None or minimum <= node.lineno) and
+        (maximum is None or node.lineno <= maximum) and
+        (node_types is None or type(node) in node_types)
+    ]
+
+
+@pytest.mark.parametrize('source', data_files)
+@pytest.mark.parametrize('lazy_knowledge', [True, False])
+def test_windows_match_every_node_within_them(source, lazy_knowledge):
+    try:
+        grepper = arep.Grepper(source, lazy_knowledge=lazy_knowledge)
+        with open(source, 'r') as f:
+            tree = ast.parse(f.read())
+    except SyntaxError:
+        pytest.skip("Not parsable by this version of Python")
+    call = Action()
+    call.Call.consideration = True
+    # Repeated, so that the later searches prune the subtrees.
+    for _ in range(3):
+        for minimum, maximum in windows:
+            grepper.constraint_list[:] = [lines(minimum, maximum)]
+            assert [
+                (result.line, result.column)
+                for result in grepper.run()
+            ] == expected(tree, minimum, maximum)
+            grepper.constraint_list.append(call)
+            assert [
+                (result.line, result.column)
+                for result in grepper.run()
+            ] == expected(tree, minimum, maximum, {ast.Call})
+
+
+def test_merged_window():
+    columns = Properties()
+    columns.Positional.Column_Numbers.maximum = 8
+    negated = Properties()
+    negated.Positional.Line_Numbers.minimum = 2
+    negated.Positional.Line_Numbers.consideration = False
+    specs = [
+        specs
+        for constraint_specs in validator_specs_deriver(
+            [lines(2, 30), lines(5, 40), columns, negated]
+        )
+        for specs in constraint_specs
+    ]
+    window, merged, others = positional_window(specs)
+    assert window == Positional_window(5, 30, None, 8)
+    assert len(merged) == 3
+    assert [specs.kwargs for specs in others] == [
+        {'consideration': False, 'minimum': 2}
+    ]
+    plan = compile_plan([lines(2, 30), lines(5, 40), columns])
+    assert plan_window(plan) == window
+    assert len(plan.predicates) == 1
+    assert plan_window(compile_plan([lines(None, None)])) is None
+
+
+def test_spans_cover_their_subtrees():
+    tree = ast.parse(
+        "@decorator\n"
+        "def f(\n"
+        "        a):\n"
+        "    return [a\n"
+        "            for _ in a]\n"
+        "x = 1\n"
+    )
+    spans = subtree_spans(list(ast.walk(tree)))
+    assert spans[tree] == (1, 6)
+    assert spans[tree.body[0]] == (1, 5)
+    assert spans[tree.body[0].args] == (3, 3)
+    assert spans[tree.body[0].body[0]] == (4, 5)
+    for node, (first, last) in spans.items():
+        for descendant in ast.walk(node):
+            if hasattr(descendant, 'lineno'):
+                assert first <= descendant.lineno <= last
+    assert not any(type(node) is ast.Load for node in spans)
@@ -0,0 +1,124 @@
+from arep.constraints import Action, Kind, Properties
+from arep.plan import (
+    compile_plan, validator_class, evaluator, adaptive_evaluator
+)
+from arep.utils import (
+    establish_parent_link, Knowledge_template, update_knowledge_template
+)
+from arep.Validators.forms import ValidatorForm, CompiledValidatorForm
+from .utils import data_files
+import arep
+import ast
+import pytest
+
+
+def outcome(predicate):
+    try:
+        return predicate()
+    except KeyError:
+        return KeyError
+
+
+@pytest.mark.parametrize(('source'), data_files)
+@pytest.mark.parametrize(('address', 'kwargs'), [
+    (['Action', 'Raising', 'Error'], {'type_': TypeError}),
+    (['Action', 'Raising', 'Cause'], {'name': 'e', 'consideration': None}),
+    (['Action', 'Looping'], {'with_break': True, 'for_': False}),
+    (['Action', 'Conditional'], {'else_': True, 'consideration': True}),
+    (['Action', 'Trying', 'Except'], {'as_': 'e', 'type_': None}),
+    (['Action', 'Import', 'As'], {'name': 'np', 'consideration': True}),
+    (['Kind', 'Functions'], {'is_builtin': False, 'consideration': None}),
+    (['Kind', 'Variables'], {'name': 'x', 'consideration': True}),
+    (['Kind', 'Operations'], {'symbol': '+', 'is_binary': True}),
+    (['Properties', 'Positional', 'Line_Numbers'],
+     {'minimum': 2, 'maximum': 10, 'consideration': True}),
+    (['Action', 'Call'], {'not_a_specification': True}),
+])
+def test_compiled_validator_matches_ValidatorForm(source, address, kwargs):
+    with open(source) as f:
+        tree = establish_parent_link(ast.parse(f.read()))
+    knowledge = update_knowledge_template(tree, Knowledge_template())
+    cls = validator_class(address)
+    compiled = CompiledValidatorForm(cls, **kwargs)
+    for node in ast.walk(tree):
+        assert outcome(lambda: compiled(node, knowledge)) == outcome(
+            lambda: ValidatorForm(cls, node=node, knowledge=knowledge,
+                                  **kwargs)
+        )
+
+
+def test_plan_is_reusable_across_files():
+    action = Action()
+    action.Raising.consideration = True
+    plan = compile_plan([action])
+    for source in data_files:
+        grepper = arep.Grepper(source)
+        grepper.constraint_list.append(action)
+        assert grepper.all_results(plan) == grepper.all_results()
+
+
+def test_plan_of_no_constraints_matches_everything():
+    grepper = arep.Grepper(data_files[0])
+    plan = compile_plan([Kind(), Properties()])
+    assert plan.predicates == []
+    assert plan.node_types is None
+    assert grepper.all_results(plan) == grepper.all_results()
+
+
+def test_expensive_predicates_are_evaluated_last():
+    action = Action()
+    action.Looping.with_break = True
+    properties = Properties()
+    properties.Positional.Line_Numbers.minimum = 3
+    plan = compile_plan([action, properties])
+    assert [predicate.specs.address for predicate in plan.predicates] == [
+        ['Properties', 'Positional', 'Line_Numbers'], ['Action', 'Looping']
+    ]
+
+
+def test_evaluation_stops_at_first_rejection():
+    calls = []
+
+    def predicate(accepts):
+        def wrapped(node, knowledge):
+            calls.append(accepts)
+            return accepts
+        wrapped.cost = 1
+        return wrapped
+
+    predicates = [predicate(True), predicate(False), predicate(True)]
+    assert evaluator(predicates)(None, None) is False
+    assert calls == [True, False]
+
+
+def test_adaptive_evaluator_moves_selective_predicates_first():
+    evaluated = []
+
+    def predicate(name, accepts):
+        def wrapped(node, knowledge):
+            evaluated.append(name)
+            return accepts(node)
+        wrapped.cost = 1
+        return wrapped
+
+    evaluate = adaptive_evaluator([
+        predicate('lenient', lambda node: True),
+        predicate('strict', lambda node: node % 10 == 0),
+    ], reordering_period=16)
+    for node in range(64):
+        evaluate(node, None)
+    del evaluated[:]
+    evaluate(1, None)
+    assert evaluated == ['strict']
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_adaptive_run_matches_static_run(source):
+    action = Action()
+    action.Looping.with_break = False
+    action.Conditional.else_ = False
+    properties = Properties()
+    properties.Positional.Column_Numbers.maximum = 20
+    grepper = arep.Grepper(source)
+    grepper.constraint_list.extend([action, properties])
+    assert grepper.all_results(adaptive=True) == grepper.all_results()
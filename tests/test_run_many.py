@@ -0,0 +1,79 @@
+from arep.constraints import Action, Kind, Properties
+from arep.plan import Query_plan, compile_plans, shared_evaluator
+from .utils import data_files
+import arep
+import os
+import pytest
+
+
+def queries():
+    calls = Action()
+    calls.Call.consideration = True
+    late_calls = Action()
+    late_calls.Call.consideration = True
+    late_lines = Properties()
+    late_lines.Positional.Line_Numbers.minimum = 5
+    loops = Action()
+    loops.Looping.with_break = False
+    functions = Kind()
+    functions.Functions.consideration = True
+    named_variables = Kind()
+    named_variables.Variables.name = 'x'
+    additions = Kind()
+    additions.Operations.symbol = '+'
+    not_conditionals = Action()
+    not_conditionals.Conditional.consideration = False
+    return [
+        [calls], [late_calls, late_lines], [loops], [functions],
+        [named_variables], [additions], [not_conditionals, late_lines],
+        [Kind()],
+    ]
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_run_many_matches_separate_runs(source):
+    grepper = arep.Grepper(source)
+    expected = dict()
+    for tag, query in enumerate(queries()):
+        grepper.constraint_list = query
+        expected[tag] = grepper.all_results()
+    assert grepper.all_results_many(queries()) == expected
+
+
+def test_run_many_tags_by_key():
+    grepper = arep.Grepper(os.path.abspath('tests/data/Action/Call.py'))
+    calls, late_calls = queries()[:2]
+    results = grepper.all_results_many({'calls': calls, 'late': late_calls})
+    assert set(results) == {'calls', 'late'}
+    assert results['calls']
+    assert set(results['late']) < set(results['calls'])
+    assert [tag for tag, _ in grepper.run_many({'calls': calls})] == (
+        ['calls'] * len(results['calls'])
+    )
+
+
+def test_equal_constraints_share_predicates():
+    plans = compile_plans(queries()[:2])
+    assert plans[0].predicates[0] in plans[1].predicates
+    assert len(plans[1].predicates) == 2
+
+
+def test_shared_predicates_are_evaluated_once_per_node():
+    calls = []
+
+    def predicate(name, accepts):
+        def wrapped(node, knowledge):
+            calls.append(name)
+            return accepts
+        wrapped.cost = 1
+        return wrapped
+
+    shared = predicate('shared', True)
+    rejecting = predicate('rejecting', False)
+    plans = [
+        Query_plan([shared], None, frozenset()),
+        Query_plan([shared, rejecting], None, frozenset()),
+        Query_plan([rejecting, shared], None, frozenset()),
+    ]
+    assert shared_evaluator(plans)(None, None, [0, 1, 2]) == [0]
+    assert sorted(calls) == ['rejecting', 'shared']
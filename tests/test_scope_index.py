@@ -0,0 +1,107 @@
+from arep.utils import (
+    annotate_tree, establish_parent_link, Knowledge_template, Lazy_knowledge,
+    scope_index, update_knowledge_template
+)
+from .utils import data_files
+import ast
+import pytest
+
+program = """
+class A(object):
+    def f(self):
+        g = lambda x: x + 1
+        return g
+
+    class B(object):
+        y = 2
+
+def h():
+    class C(object):
+        pass
+"""
+
+
+def recursive_scope(node):
+    scope_types = {ast.FunctionDef, ast.Lambda, ast.ClassDef, ast.Module}
+    current = node
+    while hasattr(current, '_parent'):
+        current = current._parent
+        if type(current) in scope_types:
+            return current
+    return None
+
+
+def test_scope_index():
+    tree = ast.parse(program)
+    scopes = scope_index(list(ast.walk(tree)))
+    class_A, function_h = tree.body
+    function_f, class_B = class_A.body
+    g = function_f.body[0]
+    assert scopes[tree] == (None, None, None, None)
+    assert scopes[class_A] == (None, None, tree, tree)
+    assert scopes[function_f].innermost is class_A
+    assert scopes[g.value.body].function is g.value
+    assert scopes[g.value.body].class_ is class_A
+    assert scopes[class_B.body[0]].innermost is class_B
+    assert scopes[function_h.body[0]].innermost is function_h
+    assert scopes[function_h.body[0].body[0]].class_ is function_h.body[0]
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_scope_index_matches_climbing_parents(source):
+    with open(source) as f:
+        tree = establish_parent_link(ast.parse(f.read()))
+    nodes = list(ast.walk(tree))
+    scopes = scope_index(nodes)
+    for node in nodes:
+        assert scopes[node].innermost is recursive_scope(node)
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_annotate_tree_and_lazy_knowledge_share_scopes(source):
+    with open(source) as f:
+        program = f.read()
+    nodes = list(ast.walk(establish_parent_link(ast.parse(program))))
+    lazy = Lazy_knowledge(nodes)
+    eager = update_knowledge_template(
+        establish_parent_link(ast.parse(program)), Knowledge_template()
+    )
+    annotated = annotate_tree(ast.parse(program), Knowledge_template())[1]
+    assert (
+        [tuple(map(type, scope)) for scope in lazy['scopes'].values()] ==
+        [tuple(map(type, scope)) for scope in eager['scopes'].values()] ==
+        [tuple(map(type, scope)) for scope in annotated['scopes'].values()]
+    )
+
+
+def test_methods_of_deeply_nested_classes():
+    # The parser allows at most 100 levels of indentation.
+    depth = 95
+    program = "".join(
+        "{}class C{}(object):\n".format("    " * level, level)
+        for level in range(depth)
+    ) + "{}def m(self):\n{}pass\n".format("    " * depth,
+                                          "    " * (depth + 1))
+    knowledge = annotate_tree(ast.parse(program), Knowledge_template())[1]
+    assert set(knowledge['Method']) == {'m'}
+
+
+def test_scopes_are_only_made_when_needed():
+    knowledge_flags = dict(
+        _with_classes=False, _with_funcs=False, _with_decorators=False,
+        _with_class_methods=False, _with_summaries=False
+    )
+    tree, knowledge, nodes, _ = annotate_tree(
+        ast.parse(program), Knowledge_template(), _with_scopes=False,
+        **knowledge_flags
+    )
+    assert 'scopes' not in knowledge
+    lazy = Lazy_knowledge(nodes, knowledge)
+    assert lazy['scopes'] == scope_index(nodes)
+    knowledge_flags['_with_class_methods'] = True
+    knowledge = annotate_tree(
+        ast.parse(program), Knowledge_template(), _with_scopes=False,
+        **knowledge_flags
+    )[1]
+    assert 'scopes' in knowledge
+    assert set(knowledge['Method']) == {'f'}
@@ -0,0 +1,81 @@
+from arep.constraints import Action, Kind, Properties
+from arep.stats import to_prometheus
+from .utils import data_files
+import arep
+import pytest
+
+
+def constraint_lists():
+    action = Action()
+    action.Call.consideration = True
+    properties = Properties()
+    properties.Positional.Line_Numbers.minimum = 2
+    functions = Kind()
+    functions.Functions.consideration = True
+    return {
+        'call': [action, properties],
+        'expression': [(action | functions) & ~properties],
+    }
+
+
+def grepper(source, profile):
+    try:
+        return arep.Grepper(source, profile=profile)
+    except SyntaxError:
+        pytest.skip("Not parsable by this version of Python")
+
+
+@pytest.mark.parametrize('source', data_files)
+def test_profiling_keeps_the_results(source):
+    plain, profiled = grepper(source, False), grepper(source, True)
+    for constraint_list in constraint_lists().values():
+        plain.constraint_list[:] = constraint_list
+        profiled.constraint_list[:] = constraint_list
+        assert profiled.all_results() == plain.all_results()
+    assert plain.stats() is None
+    assert (profiled.all_results_many(constraint_lists()) ==
+            plain.all_results_many(constraint_lists()))
+
+
+@pytest.mark.parametrize('source', data_files)
+def test_counters(source):
+    profiled = grepper(source, True)
+    profiled.constraint_list.extend(constraint_lists()['call'])
+    results = profiled.all_results()
+    stats = profiled.stats()
+    assert stats['results'] == len(results)
+    for validator in stats['validators']:
+        assert validator['calls'] == (
+            validator['accepts'] + validator['rejects']
+        )
+        assert validator['calls'] <= stats['nodes_visited']
+        assert validator['seconds'] >= 0
+    if stats['validators']:
+        # All of the nodes are checked by the first predicate.
+        assert max(
+            validator['calls'] for validator in stats['validators']
+        ) == stats['nodes_visited']
+        # Every result has been accepted by all of the predicates.
+        assert min(
+            validator['accepts'] for validator in stats['validators']
+        ) >= len(results)
+
+
+def test_prometheus_text():
+    stats = {
+        'nodes_visited': 10,
+        'results': 2,
+        'validators': [{
+            'validator': 'Action.Import',
+            'specification': 'consideration=True, name="a\\b"',
+            'calls': 3, 'accepts': 2, 'rejects': 1, 'seconds': 0.5,
+        }],
+    }
+    lines = to_prometheus(stats).splitlines()
+    assert 'arep_nodes_visited_total 10' in lines
+    assert 'arep_results_total 2' in lines
+    assert '# TYPE arep_validator_calls_total counter' in lines
+    assert (
+        'arep_validator_seconds_total{validator="Action.Import",'
+        'specification="consideration=True, name=\\"a\\\\b\\""} 0.5'
+    ) in lines
@@ -0,0 +1,173 @@
+from arep.constraints import Action, Kind, Properties
+from arep.index import required_terms
+from arep.plan import compile_plan, validator_specs_deriver
+from arep.query import constraints_from_query
+from arep.utils import establish_parent_link, euler_tour
+from .utils import data_files, parsed
+import arep
+import ast
+import pytest
+
+# What `Action.Looping` matches.
+loop_types = {
+    ast.For, ast.While, ast.ListComp, ast.SetComp, ast.DictComp,
+    ast.GeneratorExp
+}
+
+program = """
+def handler(x):
+    for i in x:
+        print(i)
+        if i:
+            break
+    print(x)
+
+
+def other(x):
+    for i in x:
+        print(i)
+    while x:
+        x = f(x)
+"""
+
+
+def ancestors(node):
+    while hasattr(node, '_parent'):
+        node = node._parent
+        yield node
+
+
+def positioned_tree(source):
+    return establish_parent_link(parsed(source))
+
+
+def structural(relation, value):
+    properties = Properties()
+    setattr(properties.Structural, relation, value)
+    return properties
+
+
+def call():
+    action = Action()
+    action.Call.consideration = True
+    return action
+
+
+def looping():
+    action = Action()
+    action.Looping.consideration = True
+    return action
+
+
+def coordinates(nodes):
+    return sorted(
+        (node.lineno, node.col_offset) for node in nodes
+        if hasattr(node, 'lineno')
+    )
+
+
+@pytest.mark.parametrize('source', data_files)
+def test_euler_tour(source):
+    tree = positioned_tree(source)
+    nodes = list(ast.walk(tree))
+    tours = euler_tour(nodes)
+    shared = {node for node in nodes if nodes.count(node) > 1}
+    assert set(tours) == set(nodes) - shared
+    for node, (pre, post) in tours.items():
+        assert pre < post
+        for ancestor in ancestors(node):
+            ancestor_pre, ancestor_post = tours[ancestor]
+            assert ancestor_pre < pre and post < ancestor_post
+        for child in ast.iter_child_nodes(node):
+            if child in tours:
+                assert pre < tours[child][0] < post
+
+
+@pytest.mark.parametrize('source', data_files)
+@pytest.mark.parametrize('lazy_knowledge', [True, False])
+@pytest.mark.parametrize('relation', ['inside', 'contains',
+                                      'direct_child_of'])
+def test_relations(source, lazy_knowledge, relation):
+    tree = positioned_tree(source)
+    grepper = arep.Grepper(source, lazy_knowledge=lazy_knowledge)
+    calls = {
+        node for node in ast.walk(tree) if type(node) is ast.Call
+    }
+    loops = {
+        node for node in ast.walk(tree) if type(node) in loop_types
+    }
+    if relation == 'inside':
+        matches = [
+            node for node in calls
+            if any(ancestor in loops for ancestor in ancestors(node))
+        ]
+    elif relation == 'contains':
+        matches = [
+            node for node in calls
+            if any(descendant in loops for descendant in ast.walk(node))
+        ]
+    else:
+        matches = [
+            node for node in calls
+            if getattr(node, '_parent', None) in loops
+        ]
+    grepper.constraint_list[:] = [call(), structural(relation, looping())]
+    assert sorted(
+        (result.line, result.column) for result in grepper.all_results()
+    ) == coordinates(matches)
+    # Negated by an expression.
+    grepper.constraint_list[:] = [call(), ~structural(relation, looping())]
+    assert sorted(
+        (result.line, result.column) for result in grepper.all_results()
+    ) == coordinates(calls - set(matches))
+
+
+def test_nested_relations(tmp_path):
+    path = tmp_path / 'program.py'
+    path.write_text(program)
+    handler = Kind()
+    handler.Functions.name = 'handler'
+    grepper = arep.Grepper(str(path))
+    grepper.constraint_list[:] = [
+        call(), structural('inside', [
+            looping(), structural('inside', handler)
+        ])
+    ]
+    assert [(result.line, result.column)
+            for result in grepper.all_results()] == [(4, 8)]
+    grepper.constraint_list[:] = [
+        looping(), structural('contains', call()),
+        ~structural('inside', handler)
+    ]
+    assert [(result.line, result.column)
+            for result in grepper.all_results()] == [(11, 4), (13, 4)]
+    grepper.constraint_list[:] = constraints_from_query({
+        "Action": {"Call": {}},
+        "Properties": {"Structural": {"inside": [
+            {"Action": {"Looping": {}}},
+            {"Properties": {"Structural": {
+                "inside": {"Kind": {"Functions": {"name": "handler"}}}
+            }}},
+        ]}},
+    })
+    assert [(result.line, result.column)
+            for result in grepper.all_results()] == [(4, 8)]
+
+
+def test_specifications():
+    handler = Kind()
+    handler.Functions.name = 'handler'
+    inside_handler = structural('inside', handler)
+    validator_specs = validator_specs_deriver([call(), inside_handler])
+    structural_specs = validator_specs[1][0]
+    assert structural_specs.address == ['Properties', 'Structural']
+    assert structural_specs.kwargs['inside'] == tuple(
+        validator_specs_deriver([handler])
+    )
+    assert 'Decorator' in compile_plan([inside_handler]).knowledge_keys
+    assert 'tours' in compile_plan([inside_handler]).knowledge_keys
+    assert {'identifier:handler'} in required_terms(validator_specs)
+    # Resetting doesn't reach into the constraints of a relation.
+    inside_handler.reset()
+    assert inside_handler.Structural.inside is None
+    assert handler.Functions.name == 'handler'
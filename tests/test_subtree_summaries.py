@@ -0,0 +1,133 @@
+from arep.constraints import Action
+from arep.utils import (
+    annotate_tree, Knowledge_template, Lazy_knowledge, subtree_summaries
+)
+from .utils import data_files
+import arep
+import ast
+import pytest
+
+program = """
+while a:
+    for i in x:
+        if i:
+            break
+    else:
+        break
+
+for i in x:
+    if i:
+        for j in i:
+            break
+
+while b:
+    pass
+else:
+    break_outside = True
+
+if a:
+    pass
+elif b:
+    pass
+elif c:
+    pass
+else:
+    pass
+
+if a:
+    pass
+elif b:
+    pass
+"""
+
+
+def test_subtree_summaries():
+    tree = ast.parse(program)
+    summaries = subtree_summaries(list(ast.walk(tree)))
+    while_a, for_i, while_b, if_else, if_elif = tree.body
+    assert summaries[while_a].with_break
+    assert summaries[while_a.body[0]].with_break
+    assert not summaries[for_i].with_break
+    assert summaries[for_i.body[0].body[0]].with_break
+    assert not summaries[while_b].with_break
+    assert summaries[if_else].elif_chain_length == 2
+    assert summaries[if_else].terminal_else
+    assert summaries[if_else.orelse[0]].elif_chain_length == 1
+    assert summaries[if_elif].elif_chain_length == 1
+    assert not summaries[if_elif].terminal_else
+
+
+def walked_with_break(node):
+    # Finds the breaks that belong to the loop by walking its body.
+    def walked(nodes):
+        for sub_node in nodes:
+            if type(sub_node) is ast.Break:
+                return True
+            if type(sub_node) in {ast.For, ast.While}:
+                if walked(sub_node.orelse):
+                    return True
+            elif walked(ast.iter_child_nodes(sub_node)):
+                return True
+        return False
+    return walked(node.body)
+
+
+def followed_terminal_else(node):
+    while type(node) is ast.If:
+        if len(node.orelse) == 0:
+            return False
+        node = node.orelse[0]
+    return True
+
+
+@pytest.mark.parametrize(('source'), data_files)
+def test_subtree_summaries_match_walking(source):
+    with open(source) as f:
+        tree = ast.parse(f.read())
+    summaries = subtree_summaries(list(ast.walk(tree)))
+    for node in ast.walk(tree):
+        if type(node) in {ast.For, ast.While}:
+            assert summaries[node].with_break is walked_with_break(node)
+        elif type(node) is ast.If:
+            assert (summaries[node].terminal_else is
+                    followed_terminal_else(node))
+
+
+def test_long_elif_ladder():
+    arms = 200
+    program = "if x == 0:\n    pass\n" + "".join(
+        "elif x == {}:\n    pass\n".format(arm) for arm in range(1, arms)
+    ) + "else:\n    pass\n"
+    tree, knowledge, nodes, _ = annotate_tree(
+        ast.parse(program), Knowledge_template()
+    )
+    summaries = knowledge['summaries']
+    assert summaries[tree.body[0]].elif_chain_length == arms - 1
+    assert all(summaries[node].terminal_else
+               for node in nodes if type(node) is ast.If)
+
+
+def test_summaries_are_made_on_demand():
+    nodes = list(ast.walk(ast.parse(program)))
+    knowledge = Lazy_knowledge(nodes)
+    knowledge.learn({'summaries', 'scopes'})
+    assert set(knowledge.maps[0]) == {'summaries', 'scopes'}
+    assert knowledge['summaries'] == subtree_summaries(nodes)
+
+
+@pytest.mark.parametrize(('lazy_knowledge'), [True, False])
+@pytest.mark.parametrize(('single_pass'), [True, False])
+def test_grepper_with_summaries(tmpdir, single_pass, lazy_knowledge):
+    source = tmpdir.join('program.py')
+    source.write(program)
+    grepper = arep.Grepper(str(source), single_pass=single_pass,
+                           lazy_knowledge=lazy_knowledge)
+    action = Action()
+    action.Looping.with_break = True
+    grepper.constraint_list.append(action)
+    assert {(result.line, result.column)
+            for result in grepper.run()} == {(2, 0), (3, 4), (11, 8)}
+    action.reset()
+    action.Conditional.else_ = True
+    assert {(result.line, result.column)
+            for result in grepper.run()} == {(19, 0)}
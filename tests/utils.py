@@ -1,8 +1,20 @@
 from arep.utils import Result
-from arep.constraints import Action, Kind, Properties
+from arep.constraints import (
+    Action, Kind, Properties, _Action_Node_Types, _Kind_Node_Types
+)
 import ast
+import glob
+import os
 import pytest
 
+data_files = sorted(glob.glob(os.path.abspath('tests/data/*/*.py')))
+
+# The address of every anchored constraint of each category.
+addresses = (
+    [('Action', address) for address in _Action_Node_Types()] +
+    [('Kind', address) for address in _Kind_Node_Types()]
+)
+
 
 def results_formatter(coordinates, name):
     results = set([])
@@ -25,6 +37,14 @@ def coordinate_of_all_nodes(program):
     return results
 
 
+def parsed(source):
+    try:
+        with open(source, 'r') as f:
+            return ast.parse(f.read())
+    except SyntaxError:
+        pytest.skip("Not parsable by this version of Python")
+
+
 @pytest.fixture
 def action():
     instance = Action()